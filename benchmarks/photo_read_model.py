@@ -0,0 +1,128 @@
+"""
+Time of building a page of photo responses from loaded ORM objects
+and from column projection of the read model.
+
+Run from `src` directory:
+
+    python ../benchmarks/photo_read_model.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+TMP = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_URL"] = f"sqlite+aiosqlite:///{TMP}/bench.sqlite"
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_LOCAL_ROOT"] = f"{TMP}/media"
+sys.path.insert(0, str(SRC))
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+# PhotoORM.comments refers to CommentORM by name, its module must be
+# imported before mappers are configured
+import comment.orm  # noqa: E402, F401
+from database import Base, sessionmanager  # noqa: E402
+from photo.model import PhotoResponse  # noqa: E402
+from photo.orm import PhotoORM, PhotoVariantORM  # noqa: E402
+from photo.queries import photo_response, photo_rows  # noqa: E402
+from photo.variants import (normalize_spec,  # noqa: E402
+                            responsive_images,
+                            responsive_widths)
+from tags.orm import TagORM  # noqa: E402
+from userprofile.orm import ProfileORM, UserORM  # noqa: E402
+from workers.process_pool import percentile  # noqa: E402
+
+PHOTOS = 1000
+TAGS = 50
+TAGS_PER_PHOTO = 3
+PAGE_SIZES = (10, 100, 1000)
+REPEATS = 30
+
+
+async def prepare_db() -> None:
+    async with sessionmanager._engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmanager.session() as db:
+        user = UserORM(email="bench@example.com", username="bench",
+                       password="-", loggedin=True)
+        db.add(user)
+        await db.flush()
+        profile = ProfileORM(first_name="bench", user_id=user.id)
+        db.add(profile)
+        tags = [TagORM(tag=f"tag{index}") for index in range(TAGS)]
+        db.add_all(tags)
+        await db.flush()
+        for index in range(PHOTOS):
+            db.add(PhotoORM(
+                description=f"photo {index}",
+                url=f"/media/{index}.png",
+                public_id=f"{index}.png",
+                author_fk=profile.id,
+                tags=[tags[(index + shift) % TAGS]
+                      for shift in range(TAGS_PER_PHOTO)],
+                variants=[PhotoVariantORM(spec=normalize_spec({"width": width}),
+                                          url=f"/media/{index}/w{width}.png")
+                          for width in responsive_widths()]
+            ))
+        await db.commit()
+
+
+async def orm_page(limit: int) -> list[PhotoResponse]:
+    async with sessionmanager.session() as db:
+        stmnt = (
+            select(PhotoORM)
+            .order_by(PhotoORM.id.desc())
+            .limit(limit)
+            .options(selectinload(PhotoORM.tags),
+                     selectinload(PhotoORM.variants),
+                     selectinload(PhotoORM.author).selectinload(ProfileORM.user))
+        )
+        photos = (await db.execute(stmnt)).scalars().all()
+        responses = []
+        for photo in photos:
+            response = PhotoResponse.from_orm(photo)
+            response.tags = [tag.tag for tag in photo.tags]
+            response.author = photo.author.user.username
+            response.thumbnail_url, response.srcset = \
+                responsive_images(photo.variants, photo.url)
+            responses.append(response)
+        return responses
+
+
+async def projection_page(limit: int) -> list[PhotoResponse]:
+    async with sessionmanager.session() as db:
+        stmnt = photo_rows().order_by(PhotoORM.id.desc()).limit(limit)
+        return [photo_response(row) for row in await db.execute(stmnt)]
+
+
+async def measure(page, limit: int) -> list[float]:
+    await page(limit)
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        responses = await page(limit)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert len(responses) == limit
+    return sorted(timings)
+
+
+async def main() -> None:
+    await prepare_db()
+    assert await orm_page(PHOTOS) == await projection_page(PHOTOS)
+
+    print(f"{'page':>6}{'mode':>12}{'p50, ms':>10}{'mean, ms':>10}")
+    for limit in PAGE_SIZES:
+        for name, page in (("orm", orm_page), ("projection", projection_page)):
+            timings = await measure(page, limit)
+            print(f"{limit:>6}{name:>12}"
+                  f"{percentile(timings, 0.5):>10.1f}"
+                  f"{sum(timings) / len(timings):>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
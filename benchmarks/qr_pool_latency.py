@@ -0,0 +1,115 @@
+"""
+Latency of GET /photos/ while QR codes are rendered concurrently,
+with rendering done inline in the event loop and on the process pool.
+
+Run from `src` directory:
+
+    python ../benchmarks/qr_pool_latency.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+TMP = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_URL"] = f"sqlite+aiosqlite:///{TMP}/bench.sqlite"
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_LOCAL_ROOT"] = f"{TMP}/media"
+sys.path.insert(0, str(SRC))
+
+import httpx  # noqa: E402
+
+from database import Base, sessionmanager  # noqa: E402
+from main import app  # noqa: E402
+from photo.orm import PhotoORM  # noqa: E402
+from photo.qr import render_qr_svg  # noqa: E402
+from userprofile.orm import ProfileORM, UserORM  # noqa: E402
+from workers.process_pool import percentile, process_pool  # noqa: E402
+
+PHOTOS = 50
+# number of clients requesting QR codes and pause between their requests
+QR_CLIENTS = 4
+QR_PAUSE = 0.05
+REQUESTS = 50
+# longer urls make QR codes of higher versions, that are slower to render
+QR_DATA = "https://example.com/photos/" + "x" * 200
+
+
+async def prepare_db() -> None:
+    async with sessionmanager._engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmanager.session() as db:
+        user = UserORM(email="bench@example.com", username="bench",
+                       password="-", loggedin=True)
+        db.add(user)
+        await db.flush()
+        profile = ProfileORM(first_name="bench", user_id=user.id)
+        db.add(profile)
+        await db.flush()
+        db.add_all(PhotoORM(description=f"photo {index}",
+                            url=f"/media/{index}.png",
+                            public_id=f"{index}.png",
+                            author_fk=profile.id)
+                   for index in range(PHOTOS))
+        await db.commit()
+
+
+async def render_inline() -> None:
+    render_qr_svg(QR_DATA)
+
+
+async def render_on_pool() -> None:
+    await process_pool.submit(render_qr_svg, QR_DATA)
+
+
+async def qr_load(render) -> None:
+    """Keeps QR_CLIENTS rendering QR codes until cancelled"""
+    async def client():
+        while True:
+            await render()
+            await asyncio.sleep(QR_PAUSE)
+
+    await asyncio.gather(*(client() for _ in range(QR_CLIENTS)))
+
+
+async def measure(client: httpx.AsyncClient, render=None) -> list[float]:
+    load = asyncio.create_task(qr_load(render)) if render else None
+    latencies = []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        response = await client.get("/photos/")
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    if load:
+        load.cancel()
+        await asyncio.gather(load, return_exceptions=True)
+    return sorted(latencies)
+
+
+async def main() -> None:
+    await prepare_db()
+    # start workers before measuring
+    await process_pool.submit(render_qr_svg, "warm up")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport,
+                                 base_url="http://bench",
+                                 headers={"user-agent": "bench"}) as client:
+        baseline = await measure(client)
+        inline = await measure(client, render_inline)
+        pooled = await measure(client, render_on_pool)
+
+    print(f"{'mode':<10}{'requests':>10}{'p50, ms':>10}{'p99, ms':>10}")
+    for name, latencies in (("idle", baseline),
+                            ("inline", inline),
+                            ("pool", pooled)):
+        print(f"{name:<10}{len(latencies):>10}"
+              f"{percentile(latencies, 0.5):>10.1f}"
+              f"{percentile(latencies, 0.99):>10.1f}")
+    process_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
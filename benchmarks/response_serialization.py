@@ -0,0 +1,119 @@
+"""
+Time of requests to list endpoints: models validated and encoded by
+FastAPI `response_model`, and models serialized by `dumped_response`.
+Payloads have shapes of `get_photos`, `read_comments_about_photo` and
+`get_all_profiles` responses. Only public FastAPI and pydantic APIs
+are used, requests are served in process.
+
+Run from `src` directory:
+
+    python ../benchmarks/response_serialization.py
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Response  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from comment.model import CommentModel  # noqa: E402
+from photo.model import PhotoResponse  # noqa: E402
+from userprofile.model import UserPublicProfileModel  # noqa: E402
+from utils.responses import FastJSONResponse, dumped_response  # noqa: E402
+from workers.process_pool import percentile  # noqa: E402
+
+PAGE_SIZES = (10, 100, 1000)
+REPEATS = 50
+NOW = datetime.now(timezone.utc)
+
+
+def photos(count: int) -> list[PhotoResponse]:
+    return [PhotoResponse(id=index,
+                          description=f"photo {index} of the sea at sunset",
+                          author="author",
+                          url=f"https://cdn.example.com/photos/{index}.png",
+                          author_fk=1,
+                          public_id=f"photos/{index}.png",
+                          qrcode_url=f"https://cdn.example.com/qr/{index}.svg",
+                          comments_num=index % 7,
+                          tags=["sea", "sunset", "travel"],
+                          thumbnail_url=f"https://cdn.example.com/{index}/w300.png",
+                          srcset=f"https://cdn.example.com/{index}/w640.png 640w")
+            for index in range(count)]
+
+
+def comments(count: int) -> list[CommentModel]:
+    return [CommentModel(id=index + 1,
+                         text=f"comment {index} about the photo",
+                         created_at=NOW,
+                         author_name="author",
+                         author_fk=1,
+                         photo_fk=1)
+            for index in range(count)]
+
+
+def profiles(count: int) -> list[UserPublicProfileModel]:
+    return [UserPublicProfileModel(username=f"user{index}",
+                                   first_name="First",
+                                   last_name="Last",
+                                   registered_at=NOW,
+                                   photos=index,
+                                   comments=index * 2)
+            for index in range(count)]
+
+
+def create_app(model, content) -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    adapter = TypeAdapter(List[model])
+
+    @app.get("/default", response_model=List[model])
+    async def default():
+        return content
+
+    @app.get("/fast", response_model=List[model])
+    async def fast(response: Response):
+        return dumped_response(content, adapter, response)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str) -> list[float]:
+    await client.get(path)
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)
+
+
+async def main() -> None:
+    payloads = (("get_photos", PhotoResponse, photos),
+                ("comments", CommentModel, comments),
+                ("profiles", UserPublicProfileModel, profiles))
+
+    print(f"{'payload':>10}{'items':>7}{'mode':>9}{'p50, ms':>10}{'mean, ms':>10}")
+    for name, model, build in payloads:
+        for count in PAGE_SIZES:
+            app = create_app(model, build(count))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport,
+                                         base_url="http://bench") as client:
+                assert ((await client.get("/default")).json()
+                        == (await client.get("/fast")).json())
+                for mode in ("default", "fast"):
+                    timings = await measure(client, f"/{mode}")
+                    print(f"{name:>10}{count:>7}{mode:>9}"
+                          f"{percentile(timings, 0.5):>10.2f}"
+                          f"{sum(timings) / len(timings):>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,8 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import Integer, String, DateTime, ForeignKey
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
 
 from database import Base
 
@@ -13,10 +12,15 @@ class CommentORM(Base):
     ORM mapping for Comment
     """
     __tablename__ = "comments"
+    # comments of a photo in order of creation, see read_comments_about_photo
+    __table_args__ = (Index("ix_comments_photo_fk_created_at_id",
+                            "photo_fk", "created_at", "id"),)
     # columns
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     text: Mapped[str] = mapped_column(String, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now())
+    # set by application, so SQLite stores it in the format of cursor values
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     author_fk: Mapped[int] = mapped_column(Integer, ForeignKey('profiles.id', ondelete='CASCADE'))
     photo_fk: Mapped[int] = mapped_column(Integer, ForeignKey('photos.id', ondelete='CASCADE'))
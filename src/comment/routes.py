@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, Form
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Annotated, Any
+from sqlalchemy import delete, select
+from pydantic import TypeAdapter
+from typing import List, Annotated, Any, Optional
 from datetime import datetime, timezone
 
-from sqlalchemy.orm import selectinload
-
 from database import get_db
 from comment.model import CommentModel, CommentCreate, CommentUpdate, CommentBase
 from comment.orm import CommentORM
+from comment.service import change_comments_count
+from photo.cache import photo_cache
 from photo.orm import PhotoORM
 from userprofile.orm import ProfileORM, UserORM
 from auth.service import auth as auth_service
 from auth.require_role import require_role
+from settings import settings
+from utils.etag import make_etag, not_modified
+from utils.pagination import chronological_page, split_page
+from utils.responses import dumped_response
+from versions.service import COMMENTS, bump_versions, touch_photos
 
 
 router = APIRouter(
@@ -21,6 +27,10 @@ router = APIRouter(
     tags=["comments"]
 )
 
+# pages of comments, see utils.responses.dumped_response
+COMMENT_LIST = TypeAdapter(List[CommentModel])
+
+
 @router.get("/",
             response_model=List[CommentModel])
 async def read_comments(
@@ -66,36 +76,63 @@ async def get_comment(
 @router.get("/photo/{photo_id:int}",
             response_model=List[CommentModel])
 async def read_comments_about_photo(
+        request: Request,
+        response: Response,
         db: AsyncSession = Depends(get_db),
-        skip: int = 0,
-        limit: int = 10,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(10, ge=1, le=settings.page_size_max),
+        cursor: Optional[str] = None,
         photo_id: int = None):
     """
-    Read a list of comments.
-    - **skip**: Number of records to skip for pagination.
+    Read a list of comments about photo, oldest first.
+    - **skip**: Number of records to skip, kept for backward compatibility.
     - **limit**: Maximum number of records to return.
+    - **cursor**: Cursor of the page returned with the previous page.
+
+    Comments are paged by (photo_fk, created_at, id) index and selected
+    together with the photo, so there is no separate check that photo
+    exists. Cursor of the next page is returned in `X-Next-Cursor`
+    header. Comments are revalidated with ETag of photo version.
     """
-    query = select(PhotoORM).filter_by(id=photo_id)
-    result = await db.execute(query)
-    db_photo = result.scalars().first()
-    if not db_photo:
+    page = chronological_page(
+        select(CommentORM.id,
+               CommentORM.text,
+               CommentORM.created_at,
+               CommentORM.updated_at,
+               CommentORM.author_fk,
+               CommentORM.photo_fk)
+        .where(CommentORM.photo_fk == photo_id),
+        CommentORM.created_at, CommentORM.id, limit, skip, cursor
+    ).subquery()
+    # photo row is selected even if it has no comments on the page
+    stmt = (
+        select(PhotoORM.version,
+               *page.c,
+               UserORM.username.label("author_name"))
+        .select_from(PhotoORM)
+        .outerjoin(page, page.c.photo_fk == PhotoORM.id)
+        .outerjoin(ProfileORM, ProfileORM.id == page.c.author_fk)
+        .outerjoin(UserORM, UserORM.id == ProfileORM.user_id)
+        .where(PhotoORM.id == photo_id)
+        .order_by(page.c.created_at, page.c.id)
+    )
+    rows = (await db.execute(stmt)).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Photo not found")
-    stmt = (select(CommentORM)
-            .where(CommentORM.photo_fk == db_photo.id)
-            .offset(skip).limit(limit)
-            .options(selectinload(CommentORM.author),
-                     selectinload(CommentORM.author).selectinload(ProfileORM.user)
-                     )
-            )
-    result = await db.execute(stmt)
-    comments = result.scalars().all()
-    result = []
-    for comment in comments:
-        _ = CommentModel.from_orm(comment)
-        _.author_name = comment.author.user.username
-        result.append(_)
+    etag = make_etag(request, "comments", photo_id, rows[0].version,
+                     skip, limit, cursor)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    rows = split_page([row for row in rows if row.id is not None],
+                      limit, response,
+                      key=lambda row: {"created_at": row.created_at,
+                                       "id": row.id})
 
-    return result
+    return dumped_response([CommentModel.model_validate(row._mapping)
+                            for row in rows],
+                           COMMENT_LIST, response)
 
 
 @router.post("/add/{photo_id}",
@@ -151,7 +188,11 @@ async def create_comment(
     )
 
     db.add(db_comment)
+    await change_comments_count(photo_id, 1, db)
+    await touch_photos(db, [photo_id])
+    await bump_versions(db, COMMENTS)
     await db.commit()
+    photo_cache.invalidate(photo_id)
     await db.refresh(db_comment)
 
     return CommentModel.from_orm(db_comment)
@@ -206,6 +247,8 @@ async def update_comment(
     if comment.text:
         db_comment.text = comment.text
         db_comment.updated_at = datetime.now(timezone.utc)
+        await touch_photos(db, [db_comment.photo_fk])
+        await bump_versions(db, COMMENTS)
 
     await db.commit()
     await db.refresh(db_comment)
@@ -236,6 +279,12 @@ async def delete_comment(
     if user.role not in ["moderator", "admin"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    await db.delete(db_comment)
+    photo_id = db_comment.photo_fk
+    await change_comments_count(photo_id, -1, db)
+    # plain DELETE, ORM cascade of CommentORM.photo would remove the photo
+    await db.execute(delete(CommentORM).where(CommentORM.id == comment_id))
+    await touch_photos(db, [photo_id])
+    await bump_versions(db, COMMENTS)
     await db.commit()
+    photo_cache.invalidate(photo_id)
     return None
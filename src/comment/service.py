@@ -0,0 +1,55 @@
+"""Module provides maintenance of comment counters of photos"""
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from comment.orm import CommentORM
+from photo.orm import PhotoORM
+from versions.service import PHOTOS, bump_versions
+
+
+async def change_comments_count(photo_id: int,
+                                delta: int,
+                                db: AsyncSession) -> None:
+    """
+    Atomically changes comment counter of photo in the current transaction
+
+        Args:
+            photo_id (int): id of photo
+            delta (int): number of added, or removed if negative, comments
+            db (AsyncSession): The database session.
+    """
+    await db.execute(
+        update(PhotoORM)
+        .where(PhotoORM.id == photo_id)
+        .values(comments_count=PhotoORM.comments_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def repair_comment_counts(db: AsyncSession) -> int:
+    """
+    Recounts comments of photos which counters do not match actual
+    number of comments, e.g. after comments were removed by cascade
+
+        Args:
+            db (AsyncSession): The database session.
+
+        Returns:
+            int: number of repaired photos
+    """
+    actual = (
+        select(func.count(CommentORM.id))
+        .where(CommentORM.photo_fk == PhotoORM.id)
+        .correlate(PhotoORM)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(PhotoORM)
+        .where(PhotoORM.comments_count != actual)
+        .values(comments_count=actual, version=PhotoORM.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        await bump_versions(db, PHOTOS)
+    await db.commit()
+    return result.rowcount
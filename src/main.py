@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -13,13 +14,37 @@ from photo.routes import router as photo_router
 from userprofile.routes import router as user_router
 from frontend.routes import router as frontend_router
 from tags.routes import router as tags_router
+from metrics.routes import router as metrics_router
+from photo.trending import trending_worker
+from settings import settings
+from storage.outbox import outbox_worker
+from storage.service import storage
+from utils.responses import FastJSONResponse
+from workers.process_pool import process_pool
 
 import middlewares.crutches as crutches
+import photo.ingest as ingest
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    outbox_worker.start()
+    trending_worker.start()
+    yield
+    await trending_worker.stop()
+    await outbox_worker.stop()
+    process_pool.shutdown()
+    storage.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 static_path = Path(__file__).parent / 'frontend' / 'static'
 app.mount("/static", StaticFiles(directory=static_path), name='static')
+if settings.storage_backend == "local":
+    app.mount(settings.storage_local_url,
+              StaticFiles(directory=settings.storage_local_root),
+              name='media')
 
 app.include_router(auth_router)
 app.include_router(email_router)
@@ -28,6 +53,7 @@ app.include_router(photo_router)
 app.include_router(user_router)
 app.include_router(frontend_router)
 app.include_router(tags_router)
+app.include_router(metrics_router)
 
 
 # origins = [
@@ -53,6 +79,11 @@ async def call_response_modificator(request, call_next):
     return await crutches.modify_json_response(request, call_next)
 
 
+@app.middleware('http')
+async def call_upload_size_guard(request, call_next):
+    return await ingest.reject_oversized_upload(request, call_next)
+
+
 if __name__ == "__main__":
     uvicorn.run(app=app,
                 host="0.0.0.0",
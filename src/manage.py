@@ -0,0 +1,38 @@
+"""
+Maintenance commands. Run from `src` directory:
+
+    python manage.py repair-comment-counts
+"""
+import argparse
+import asyncio
+
+from comment.service import repair_comment_counts
+from database import sessionmanager
+# all models have to be mapped before the first query
+from comment import orm
+from photo import orm
+from storage import orm
+from tags import orm
+from userprofile import orm
+
+
+async def repair_comment_counts_command(args: argparse.Namespace) -> None:
+    async with sessionmanager.session() as db:
+        repaired = await repair_comment_counts(db)
+    print(f"Comment counters repaired for {repaired} photos")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PhotoShare maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "repair-comment-counts",
+        help="recount comments of photos with inconsistent counters"
+    ).set_defaults(handler=repair_comment_counts_command)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends
+
+from auth.require_role import require_role
+from photo.cache import photo_cache
+from userprofile.orm import UserORM
+from workers.process_pool import process_pool
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/")
+async def get_metrics(
+        user: Annotated[UserORM, Depends(require_role(["admin"]))]
+) -> Any:
+    """
+    Returns runtime metrics of the application services
+
+        Args:
+            user (UserORM): authenticated admin
+
+        Returns:
+            dict: metrics grouped by service
+    """
+    return {
+        "process_pool": process_pool.metrics(),
+        "photo_cache": photo_cache.metrics(),
+    }
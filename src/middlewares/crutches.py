@@ -9,7 +9,7 @@ import re
 import urllib.parse
 
 from fastapi import Request
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse
 
 from middlewares import response_handlers
 from middlewares.registrator import RESPONSE_MODDERS
@@ -57,6 +57,8 @@ async def modify_json_response(request: Request,
     if swagger_static_match == False:
         if browser_match:
             response_type = "html"
+    # representation is part of ETags, see utils.etag
+    request.state.response_type = response_type
 
     try:
         response = await call_next(request)
@@ -79,22 +81,20 @@ async def modify_json_response(request: Request,
     if all([response_type == "html",
             content_json]):
         endpoint = request.scope['endpoint'].__name__
-        response_b = b""
-        async for chunk in response.body_iterator:
-            response_b += chunk
-        response_dict = json.loads(response_b)
         modder = RESPONSE_MODDERS.get(endpoint)
+        # body is parsed only to be modded, otherwise it is passed as is
         if modder is not None:
+            response_b = b""
+            async for chunk in response.body_iterator:
+                response_b += chunk
+            response_dict = json.loads(response_b)
             return_response = await modder(
                 request=request,
                 response=response,
                 data=response_dict)
+            etag = response.headers.get('etag')
+            if etag and return_response.status_code == 200:
+                return_response.headers['etag'] = etag
             return return_response
-        return_response = Response(content=response_b,
-                                   status_code=response.status_code,
-                                   headers=dict(response.headers),
-                                   media_type=response.media_type)
-
-        return return_response
 
     return response
@@ -14,6 +14,7 @@ from auth.service import auth as auth_service
 from database import sessionmanager
 from settings import settings
 from userprofile.orm import ProfileORM
+from utils.pagination import NEXT_CURSOR_HEADER
 
 
 async def get_user_from_request(
@@ -168,9 +169,13 @@ async def html_get_photos(request: Request,
         return templates.TemplateResponse('photo/photo_list.html',
                                           {'request': request,
                                            'photo_list': None})
+    next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    next_url = (str(request.url.include_query_params(cursor=next_cursor))
+                if next_cursor else None)
     return templates.TemplateResponse('photo/photo_list.html',
                                       {'request': request,
-                                       'photo_list': data})
+                                       'photo_list': data,
+                                       'next_url': next_url})
 
 
 @register_modder('create_photo')
@@ -211,18 +216,18 @@ async def html_get_photo_id(
         if not editable:
             commentable = True
 
-    async with sessionmanager.session() as db:
-        stmnt = (
-            select(CommentORM)
-            .where(and_(
-                CommentORM.photo_fk == data['id'],
-                CommentORM.author_fk == user.profile_id
-            ))
-        )
-        db_comment = await db.execute(stmnt)
-        db_comment = db_comment.scalars().first()
-        if db_comment:
-            commentable = False
+    if commentable and response.status_code < 400:
+        async with sessionmanager.session() as db:
+            stmnt = (
+                select(CommentORM.id)
+                .where(and_(
+                    CommentORM.photo_fk == data['id'],
+                    CommentORM.author_fk == user.profile_id
+                ))
+                .limit(1)
+            )
+            if await db.scalar(stmnt) is not None:
+                commentable = False
 
     if response.status_code >= 400:
         error_message = data.get('detail').get('msg')
@@ -275,11 +280,15 @@ async def html_read_comments_about_photo(
              'comment_disabled': comment_disabled}
         )
 
+    next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    next_url = (str(request.url.include_query_params(cursor=next_cursor))
+                if next_cursor else None)
     return templates.TemplateResponse(
         'comments/detailed.html',
         {'request': request,
          'error': None,
          'comments': data,
+         'next_url': next_url,
          'user': user,
          'comment_disabled': comment_disabled}
     )
@@ -299,12 +308,15 @@ async def html_get_photos_by_tag(
                                            'user': user,
                                            'photo_list': None,
                                            'tag': tag})
-
+    next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    next_url = (str(request.url.include_query_params(cursor=next_cursor))
+                if next_cursor else None)
     return templates.TemplateResponse('photo/photos_by_tag.html',
                                       {'request': request,
                                        'user': user,
                                        'photo_list': data,
-                                       'tag': tag})
+                                       'tag': tag,
+                                       'next_url': next_url})
 
 
 @register_modder('create_qr_code')
@@ -27,12 +27,23 @@ if config.config_file_name is not None:
 
 from comment import orm
 from photo import orm
+from storage import orm
 from tags import orm
 from userprofile import orm
+from versions import orm
 from database import Base
 
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skips full-text index objects, see photo.orm.FULLTEXT_DDL"""
+    if type_ == "table" and name.startswith("photos_fts"):
+        return False
+    if name in ("search_vector", "ix_photos_search_vector"):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -55,6 +66,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -64,7 +76,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection,
+                      target_metadata=target_metadata,
+                      include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
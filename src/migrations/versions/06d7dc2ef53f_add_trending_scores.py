@@ -0,0 +1,50 @@
+"""add trending scores
+
+Revision ID: 06d7dc2ef53f
+Revises: 1ea6709690d8
+Create Date: 2026-10-18 19:48:22.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '06d7dc2ef53f'
+down_revision: Union[str, None] = '1ea6709690d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('trending_scores',
+    sa.Column('photo_fk', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['photo_fk'], ['photos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('photo_fk')
+    )
+    op.create_index(op.f('ix_trending_scores_score'), 'trending_scores', ['score'], unique=False)
+    op.create_table('trending_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('epoch', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_comment_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_comment_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('trending_comments',
+    sa.Column('comment_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('comment_id')
+    )
+    op.create_index(op.f('ix_trending_comments_created_at'), 'trending_comments', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_trending_comments_created_at'), table_name='trending_comments')
+    op.drop_table('trending_comments')
+    op.drop_table('trending_state')
+    op.drop_index(op.f('ix_trending_scores_score'), table_name='trending_scores')
+    op.drop_table('trending_scores')
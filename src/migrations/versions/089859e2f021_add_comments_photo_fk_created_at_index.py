@@ -0,0 +1,33 @@
+"""add comments (photo_fk, created_at, id) index
+
+Revision ID: 089859e2f021
+Revises: 06d7dc2ef53f
+Create Date: 2026-10-18 21:12:40.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '089859e2f021'
+down_revision: Union[str, None] = '06d7dc2ef53f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        # CURRENT_TIMESTAMP has no fraction of second, timestamps set by
+        # application have microseconds; stored as text they must have
+        # the same format to be compared with cursor values
+        op.execute("UPDATE comments SET created_at = created_at || '.000000' "
+                   "WHERE length(created_at) = 19")
+    op.create_index('ix_comments_photo_fk_created_at_id', 'comments',
+                    ['photo_fk', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_photo_fk_created_at_id', table_name='comments')
@@ -0,0 +1,68 @@
+"""add full-text index of photo descriptions
+
+Revision ID: 1ea6709690d8
+Revises: 4a40397f3e9e
+Create Date: 2026-10-18 19:03:41.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from settings import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1ea6709690d8'
+down_revision: Union[str, None] = '4a40397f3e9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# NOTE: on SQLite batch_alter_table('photos') recreates the table and
+# drops photos_fts_* triggers, later migrations doing so must recreate them
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "ALTER TABLE photos ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector("
+            f"'{settings.fulltext_config}', coalesce(description, ''))) STORED"
+        )
+        op.execute("CREATE INDEX ix_photos_search_vector ON photos USING gin (search_vector)")
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE photos_fts USING fts5("
+        "description, content='photos', content_rowid='id')"
+    )
+    op.execute(
+        "CREATE TRIGGER photos_fts_ai AFTER INSERT ON photos BEGIN "
+        "INSERT INTO photos_fts(rowid, description) "
+        "VALUES (new.id, new.description); END"
+    )
+    op.execute(
+        "CREATE TRIGGER photos_fts_ad AFTER DELETE ON photos BEGIN "
+        "INSERT INTO photos_fts(photos_fts, rowid, description) "
+        "VALUES ('delete', old.id, old.description); END"
+    )
+    op.execute(
+        "CREATE TRIGGER photos_fts_au AFTER UPDATE OF description ON photos BEGIN "
+        "INSERT INTO photos_fts(photos_fts, rowid, description) "
+        "VALUES ('delete', old.id, old.description); "
+        "INSERT INTO photos_fts(rowid, description) "
+        "VALUES (new.id, new.description); END"
+    )
+    # index descriptions of existing photos
+    op.execute("INSERT INTO photos_fts(photos_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_photos_search_vector', table_name='photos')
+        op.drop_column('photos', 'search_vector')
+        return
+    op.execute("DROP TRIGGER photos_fts_au")
+    op.execute("DROP TRIGGER photos_fts_ad")
+    op.execute("DROP TRIGGER photos_fts_ai")
+    op.execute("DROP TABLE photos_fts")
@@ -0,0 +1,26 @@
+"""add photos (author_fk, id) index
+
+Revision ID: 3ff33e632b17
+Revises: e349e399b625
+Create Date: 2026-10-18 16:04:50.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3ff33e632b17'
+down_revision: Union[str, None] = 'e349e399b625'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_photos_author_fk_id', 'photos', ['author_fk', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_photos_author_fk_id', table_name='photos')
@@ -0,0 +1,34 @@
+"""add photo and resource versions
+
+Revision ID: 4a40397f3e9e
+Revises: 3ff33e632b17
+Create Date: 2026-10-18 18:12:07.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a40397f3e9e'
+down_revision: Union[str, None] = '3ff33e632b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('resource_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('version')
+    op.drop_table('resource_versions')
@@ -0,0 +1,34 @@
+"""add photo variants
+
+Revision ID: 8f4ba6550e87
+Revises: 8619a81a5cf1
+Create Date: 2026-10-18 10:12:41.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f4ba6550e87'
+down_revision: Union[str, None] = '8619a81a5cf1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('photo_variants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('photo_fk', sa.Integer(), nullable=False),
+    sa.Column('spec', sa.String(), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['photo_fk'], ['photos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('photo_fk', 'spec')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('photo_variants')
@@ -0,0 +1,33 @@
+"""add photo comments count
+
+Revision ID: a65453b2d3fe
+Revises: a772ec3c509b
+Create Date: 2026-10-18 14:41:36.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a65453b2d3fe'
+down_revision: Union[str, None] = 'a772ec3c509b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.add_column(sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+    # backfill counters of existing photos
+    op.execute(
+        "UPDATE photos SET comments_count = "
+        "(SELECT count(*) FROM comments WHERE comments.photo_fk = photos.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('comments_count')
@@ -0,0 +1,41 @@
+"""add stored assets and photo content hash
+
+Revision ID: a772ec3c509b
+Revises: c2733181da2a
+Create Date: 2026-10-18 12:20:05.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a772ec3c509b'
+down_revision: Union[str, None] = 'c2733181da2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stored_assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('public_id', sa.String(), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('content_hash'),
+    sa.UniqueConstraint('public_id')
+    )
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_photos_content_hash'), ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_photos_content_hash'))
+        batch_op.drop_column('content_hash')
+    op.drop_table('stored_assets')
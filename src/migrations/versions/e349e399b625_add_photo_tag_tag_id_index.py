@@ -0,0 +1,26 @@
+"""add photo_tag (tag_id, photo_id) index
+
+Revision ID: e349e399b625
+Revises: a65453b2d3fe
+Create Date: 2026-10-18 15:30:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e349e399b625'
+down_revision: Union[str, None] = 'a65453b2d3fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_photo_tag_tag_id_photo_id', 'photo_tag', ['tag_id', 'photo_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_photo_tag_tag_id_photo_id', table_name='photo_tag')
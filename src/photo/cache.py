@@ -0,0 +1,137 @@
+"""Module provides in-process cache of serialized photo details"""
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Iterable, Optional
+
+from pydantic import BaseModel
+
+from settings import settings
+
+
+class CacheMetrics(BaseModel):
+    """
+    Model that holds snapshot of cache metrics
+    """
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    expired: int
+    evicted: int
+    invalidated: int
+    hit_ratio: float
+
+
+class PayloadCache:
+    """
+    TTL and LRU bounded cache of serialized payloads.
+
+    Entries are invalidated explicitly by write paths, TTL bounds
+    staleness of entries changed by other application processes.
+    Payload loaded while any entry was invalidated is returned but
+    not stored, so a slow read can not put back stale data. Entries
+    stored with a version are served only for the same version.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable,
+                                   tuple[float, Hashable, bytes]] = OrderedDict()
+        # incremented by every invalidation
+        self._generation = 0
+        self._counters = {"hits": 0,
+                          "misses": 0,
+                          "expired": 0,
+                          "evicted": 0,
+                          "invalidated": 0}
+
+    def get(self, key: Hashable, version: Hashable = None) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, entry_version, payload = entry
+            if expires_at > time.monotonic() and entry_version == version:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return payload
+            del self._entries[key]
+            self._counters["expired"] += 1
+        self._counters["misses"] += 1
+        return None
+
+    def put(self,
+            key: Hashable,
+            payload: bytes,
+            version: Hashable = None) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, version, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counters["evicted"] += 1
+
+    async def get_or_load(
+            self,
+            key: Hashable,
+            load: Callable[[], Awaitable[Optional[bytes]]],
+            version: Hashable = None
+    ) -> Optional[bytes]:
+        """
+        Returns cached payload or loads and caches it
+
+            Args:
+                key (Hashable): key of payload
+                load (Callable): coroutine function returning payload,
+                    None is returned as is and is not cached
+                version (Hashable): version of payload, if known
+
+            Returns:
+                bytes | None: payload
+        """
+        payload = self.get(key, version)
+        if payload is not None:
+            return payload
+        generation = self._generation
+        payload = await load()
+        if payload is not None and generation == self._generation:
+            self.put(key, payload, version)
+        return payload
+
+    def invalidate(self, *keys: Hashable) -> None:
+        self.invalidate_many(keys)
+
+    def invalidate_many(self, keys: Iterable[Hashable]) -> None:
+        """
+        Removes entries, must be called after changes are committed
+
+            Args:
+                keys (Iterable[Hashable]): keys of changed payloads
+        """
+        self._generation += 1
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self._counters["invalidated"] += 1
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._counters["invalidated"] += len(self._entries)
+        self._entries.clear()
+
+    def metrics(self) -> CacheMetrics:
+        """
+        Returns snapshot of cache metrics
+
+            Returns:
+                CacheMetrics: size, counters and hit ratio
+        """
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return CacheMetrics(size=len(self._entries),
+                            max_size=self.max_size,
+                            hit_ratio=(self._counters["hits"] / lookups
+                                       if lookups else 0.0),
+                            **self._counters)
+
+
+photo_cache = PayloadCache(max_size=settings.photo_cache_size,
+                           ttl=settings.photo_cache_ttl)
@@ -0,0 +1,58 @@
+"""Module provides streaming export of photo catalog as NDJSON"""
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from photo.orm import PhotoORM
+from photo.queries import authored_by, photo_response, photo_rows
+from settings import settings
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def export_rows(id_from: Optional[int] = None,
+                id_to: Optional[int] = None,
+                author: Optional[str] = None) -> Select:
+    """
+    Selects photos to export in ascending order of ids, so an
+    interrupted export is resumed from the last exported id
+
+        Args:
+            id_from (int | None): the least id to export
+            id_to (int | None): the greatest id to export
+            author (str | None): username of photos author
+
+        Returns:
+            Select: statement selecting rows of `photo_rows`
+    """
+    stmnt = photo_rows()
+    if id_from is not None:
+        stmnt = stmnt.where(PhotoORM.id >= id_from)
+    if id_to is not None:
+        stmnt = stmnt.where(PhotoORM.id <= id_to)
+    if author is not None:
+        stmnt = stmnt.where(authored_by(author))
+    return stmnt.order_by(PhotoORM.id)
+
+
+async def export_ndjson(db: AsyncSession,
+                        stmnt: Select,
+                        chunk_size: int = settings.export_chunk_size
+                        ) -> AsyncIterator[bytes]:
+    """
+    Streams photos as lines of JSON. Rows are fetched from cursor by
+    chunks, so memory does not grow with the size of catalog.
+
+        Args:
+            db (AsyncSession): The database session, kept open while streaming.
+            stmnt (Select): statement created by `export_rows`
+            chunk_size (int): number of rows fetched and sent at once
+
+        Returns:
+            AsyncIterator[bytes]: chunks of NDJSON lines
+    """
+    result = await db.stream(stmnt.execution_options(yield_per=chunk_size))
+    async for rows in result.partitions():
+        yield b"".join(photo_response(row).model_dump_json().encode() + b"\n"
+                       for row in rows)
@@ -0,0 +1,102 @@
+"""Module provides streaming ingestion of uploaded photos"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, UploadFile, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from settings import settings
+
+CHUNK_SIZE = 64 * 1024
+# room for multipart boundaries and the rest of form fields
+FORM_OVERHEAD = 64 * 1024
+
+# request paths with file uploads and their Content-Length limits
+UPLOAD_LIMITS = {
+    "/photos/add": settings.max_upload_size + FORM_OVERHEAD,
+    "/photos/add/batch": (settings.max_upload_size
+                          * settings.batch_upload_max_files
+                          + FORM_OVERHEAD),
+}
+
+
+class IngestedUpload(BaseModel):
+    """
+    Model that holds uploaded file checked against size limit
+    """
+    # binary file object, rewound to the start
+    file: Any
+    size: int
+    content_hash: str
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+def size_exceeded(max_size: int) -> HTTPException:
+    megabytes = max_size / (1024 * 1024)
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail={"msg": f"File size exceeds the limit of {megabytes:g} megabytes"}
+    )
+
+
+async def ingest_upload(
+        file: UploadFile,
+        max_size: int = settings.max_upload_size,
+        chunk_size: int = CHUNK_SIZE
+) -> IngestedUpload:
+    """
+    Reads uploaded file chunk by chunk, counting and hashing its content.
+
+    Upload is rejected as soon as its size passes the limit, so only
+    one chunk of the file is held in memory at a time.
+
+        Args:
+            file (UploadFile): uploaded file
+            max_size (int): size limit in bytes
+            chunk_size (int): size of a chunk to read
+
+        Returns:
+            IngestedUpload: file object rewound to the start,
+                its size and sha256 hex digest
+
+        Raises:
+            HTTPException: 413 if file is larger than max_size
+    """
+    if file.size is not None and file.size > max_size:
+        raise size_exceeded(max_size)
+
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    while chunk := await file.read(chunk_size):
+        size += len(chunk)
+        if size > max_size:
+            raise size_exceeded(max_size)
+        digest.update(chunk)
+    await file.seek(0)
+
+    return IngestedUpload(file=file.file,
+                          size=size,
+                          content_hash=digest.hexdigest(),
+                          filename=file.filename,
+                          content_type=file.content_type)
+
+
+async def reject_oversized_upload(request: Request,
+                                  call_next):
+    """
+    Rejects upload requests which Content-Length is already over
+    the limit, before the multipart body is read
+    """
+    limit = UPLOAD_LIMITS.get(request.url.path)
+    content_length = request.headers.get('content-length')
+    if all([request.method == "POST",
+            limit is not None,
+            content_length is not None]):
+        if content_length.isdigit() and int(content_length) > limit:
+            error = size_exceeded(limit - FORM_OVERHEAD)
+            return JSONResponse(status_code=error.status_code,
+                                content={"detail": error.detail})
+    return await call_next(request)
@@ -1,5 +1,5 @@
 from typing import Optional, List, Any
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 #from comment.model import CommentModel
 #from tags.model import TagModel
 
@@ -20,6 +20,15 @@ class TransformRequest(BaseModel):
     color: Optional[str] = None
 
 
+class PhotoVariantModel(BaseModel):
+    id: int
+    photo_id: int = Field(validation_alias="photo_fk")
+    spec: str
+    url: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class PhotoCreateQR(BaseModel):
     qrcode_url: Optional[str] = None
 
@@ -35,12 +44,30 @@ class PhotoResponse(PhotoModel):
     author_fk: int
     public_id: str
     qrcode_url: Optional[str]
-    comments_num: int = Field(ge=0, default=0)
+    comments_num: int = Field(ge=0, default=0,
+                              validation_alias=AliasChoices("comments_num",
+                                                            "comments_count"))
     tags: list[Any] = Field(default_factory=list)
+    # prepared in background after upload, None until ready
+    thumbnail_url: Optional[str] = None
+    srcset: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class BatchPhotoResult(BaseModel):
+    index: int
+    filename: Optional[str] = None
+    photo: Optional[PhotoResponse] = None
+    error: Optional[str] = None
+
+
+class PhotoBatchResponse(BaseModel):
+    # in order of requested ids
+    photos: List[PhotoResponse]
+    missing: List[int]
+
+
 class QRCodeModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,22 +1,28 @@
+from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey, Table, Column
+from sqlalchemy import DDL, DateTime, Float, ForeignKey, Table, Column, Index, UniqueConstraint, event
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy import String
 
 
 from database import Base
+from settings import settings
 
 photo_tag_association_table = Table(
     "photo_tag",
     Base.metadata,
     Column("photo_id", ForeignKey("photos.id", ondelete="CASCADE"), primary_key=True),
-    Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    # photos of a tag in order of photo ids
+    Index("ix_photo_tag_tag_id_photo_id", "tag_id", "photo_id")
 )
 
 
 class PhotoORM(Base):
     __tablename__ = "photos"
+    # photos of an author in order of ids
+    __table_args__ = (Index("ix_photos_author_fk_id", "author_fk", "id"),)
 
     # columns
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -25,9 +31,101 @@ class PhotoORM(Base):
     public_id: Mapped[str] = mapped_column(String, nullable=False)
     qrcode_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     qrcode_public_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    # maintained by comment routes, see comment.service.repair_comment_counts
+    comments_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    # incremented by every change of details or comments, see versions.service
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
     author_fk: Mapped[int] = mapped_column(ForeignKey("profiles.id", ondelete="CASCADE"))
     # relations
     author: Mapped["ProfileORM"] = relationship("ProfileORM", back_populates="photos")
     comments: Mapped[List["CommentORM"]] = relationship(back_populates="photo")
     tags: Mapped[List["TagORM"]] = relationship(secondary=photo_tag_association_table, back_populates="photos")
+    variants: Mapped[List["PhotoVariantORM"]] = relationship(back_populates="photo",
+                                                             cascade="all, delete-orphan",
+                                                             passive_deletes=True)
 
+
+class PhotoVariantORM(Base):
+    __tablename__ = "photo_variants"
+    __table_args__ = (UniqueConstraint("photo_fk", "spec"),)
+
+    # columns
+    id: Mapped[int] = mapped_column(primary_key=True)
+    photo_fk: Mapped[int] = mapped_column(ForeignKey("photos.id", ondelete="CASCADE"))
+    # normalized transformation spec, e.g. "crop=fill,width=300"
+    spec: Mapped[str] = mapped_column(String, nullable=False)
+    url: Mapped[str] = mapped_column(String, nullable=False)
+    # relations
+    photo: Mapped["PhotoORM"] = relationship(back_populates="variants")
+
+
+class TrendingScoreORM(Base):
+    __tablename__ = "trending_scores"
+    # columns
+    photo_fk: Mapped[int] = mapped_column(ForeignKey("photos.id", ondelete="CASCADE"),
+                                          primary_key=True)
+    # activity weighted by 2 ** ((time - epoch) / half life),
+    # see photo.trending and TrendingStateORM.epoch
+    score: Mapped[float] = mapped_column(Float, index=True)
+
+
+class TrendingStateORM(Base):
+    __tablename__ = "trending_state"
+    # columns
+    # the only row has id 1
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # reference time of scores
+    epoch: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # (created_at, id) of the latest comment added to scores
+    last_comment_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_comment_id: Mapped[int] = mapped_column(default=0)
+    # incremented by every refresh that changed scores
+    version: Mapped[int] = mapped_column(default=0)
+
+
+class TrendingCommentORM(Base):
+    __tablename__ = "trending_comments"
+    # comments added to scores within grace window before the latest
+    # one, so comments committed late are added once
+    comment_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
+
+# Full-text index of photo descriptions, see photo.queries.search_hits.
+# SQLite keeps external content FTS5 table in sync with triggers,
+# PostgreSQL keeps generated tsvector column with GIN index.
+# Neither is mapped, both are created with photos table and by migration.
+FULLTEXT_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE photos_fts USING fts5("
+        "description, content='photos', content_rowid='id')",
+        "CREATE TRIGGER photos_fts_ai AFTER INSERT ON photos BEGIN "
+        "INSERT INTO photos_fts(rowid, description) "
+        "VALUES (new.id, new.description); END",
+        "CREATE TRIGGER photos_fts_ad AFTER DELETE ON photos BEGIN "
+        "INSERT INTO photos_fts(photos_fts, rowid, description) "
+        "VALUES ('delete', old.id, old.description); END",
+        "CREATE TRIGGER photos_fts_au AFTER UPDATE OF description ON photos BEGIN "
+        "INSERT INTO photos_fts(photos_fts, rowid, description) "
+        "VALUES ('delete', old.id, old.description); "
+        "INSERT INTO photos_fts(rowid, description) "
+        "VALUES (new.id, new.description); END",
+    ],
+    "postgresql": [
+        "ALTER TABLE photos ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector("
+        f"'{settings.fulltext_config}', coalesce(description, ''))) STORED",
+        "CREATE INDEX ix_photos_search_vector ON photos "
+        "USING gin (search_vector)",
+    ],
+}
+
+for dialect, statements in FULLTEXT_DDL.items():
+    for statement in statements:
+        event.listen(PhotoORM.__table__, "after_create",
+                     DDL(statement).execute_if(dialect=dialect))
+# triggers and generated column are dropped with photos table
+event.listen(PhotoORM.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS photos_fts").execute_if(dialect="sqlite"))
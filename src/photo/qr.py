@@ -0,0 +1,140 @@
+"""Module provides content-addressed QR codes for photo urls"""
+import hashlib
+import io
+import logging
+
+import qrcode
+import qrcode.image.svg
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import sessionmanager
+from photo.cache import photo_cache
+from photo.orm import PhotoORM
+from storage.assets import find_asset, register_asset, release_assets
+from storage.model import StoredAsset
+from storage.service import storage
+from versions.service import touch_photos
+from workers.process_pool import process_pool
+
+logger = logging.getLogger(__name__)
+
+QR_FOLDER = "qrcode"
+QR_BOX_SIZE = 10
+QR_BORDER = 4
+
+
+def qr_key(data: str,
+           box_size: int = QR_BOX_SIZE,
+           border: int = QR_BORDER) -> str:
+    """
+    Builds key of QR code from encoded data and rendering parameters
+
+        Args:
+            data (str): data encoded in QR code
+            box_size (int): size of QR code box
+            border (int): width of QR code border in boxes
+
+        Returns:
+            str: sha256 hex digest identifying QR code image
+    """
+    params = f"svg:{box_size}:{border}:{data}"
+    return hashlib.sha256(params.encode()).hexdigest()
+
+
+def render_qr_svg(data: str,
+                  box_size: int = QR_BOX_SIZE,
+                  border: int = QR_BORDER) -> bytes:
+    """
+    Renders QR code as SVG document
+
+        Args:
+            data (str): data to encode
+            box_size (int): size of QR code box
+            border (int): width of QR code border in boxes
+
+        Returns:
+            bytes: SVG image
+    """
+    qr_code = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=box_size,
+        border=border,
+        image_factory=qrcode.image.svg.SvgPathImage
+    )
+    qr_code.add_data(data)
+    qr_code.make(fit=True)
+    img_bytes = io.BytesIO()
+    qr_code.make_image().save(img_bytes)
+    return img_bytes.getvalue()
+
+
+async def get_or_create_qr(data: str, db: AsyncSession) -> StoredAsset:
+    """
+    Returns stored QR code for data and adds a reference to it,
+    generating QR code only if there is no stored QR code with
+    the same key yet
+
+        Args:
+            data (str): data to encode
+            db (AsyncSession): The database session.
+
+        Returns:
+            StoredAsset: public id and url of QR code image
+    """
+    key = qr_key(data)
+    stored = await find_asset(db, key)
+    if stored is None:
+        svg = await process_pool.submit(render_qr_svg, data)
+        stored = await storage.upload(svg, folder=QR_FOLDER, public_id=key)
+    return await register_asset(db, key, stored)
+
+
+async def ensure_photo_qr(photo: PhotoORM, db: AsyncSession) -> PhotoORM:
+    """
+    Sets QR code of photo url if photo has no QR code yet
+
+        Args:
+            photo (PhotoORM): photo to set QR code to
+            db (AsyncSession): The database session.
+
+        Returns:
+            PhotoORM: photo with QR code
+    """
+    if photo.qrcode_url:
+        return photo
+    photo_id = photo.id
+    stored = await get_or_create_qr(photo.url, db)
+    stmnt = (
+        update(PhotoORM)
+        .where(PhotoORM.id == photo_id, PhotoORM.qrcode_url.is_(None))
+        .values(qrcode_url=stored.url, qrcode_public_id=stored.public_id)
+    )
+    result = await db.execute(stmnt)
+    if result.rowcount == 0:
+        # QR code was set concurrently
+        await release_assets(db, [stored.public_id])
+    else:
+        await touch_photos(db, [photo_id])
+    await db.commit()
+    photo_cache.invalidate(photo_id)
+    await db.refresh(photo)
+    return photo
+
+
+async def pregenerate_photo_qr(photo_id: int) -> None:
+    """
+    Background task that generates QR code right after photo is stored,
+    so the first view of photo QR code does not need to render it
+
+        Args:
+            photo_id (int): id of photo
+    """
+    async with sessionmanager.session() as db:
+        try:
+            photo = await db.get(PhotoORM, photo_id)
+            if photo is not None:
+                await ensure_photo_qr(photo, db)
+        except Exception as e:
+            logger.error(f"QR code for photo {photo_id} is not generated: {e}")
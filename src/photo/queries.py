@@ -0,0 +1,301 @@
+"""Module provides read model of photos: responses built from column
+projections, without loading ORM objects"""
+import re
+from typing import Any, Collection, NamedTuple, Optional, Sequence
+
+from sqlalchemy import (ColumnElement, Float, Row, Select, String, cast,
+                        column, func, literal_column, select, table)
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+from photo.model import PhotoResponse
+from photo.orm import PhotoORM, PhotoVariantORM, photo_tag_association_table
+from photo.variants import normalize_spec, responsive_images, responsive_widths
+from settings import settings
+from tags.orm import TagORM
+from userprofile.orm import ProfileORM, UserORM
+
+
+# join aggregated values, can not be part of a tag, spec or url
+TAG_SEPARATOR = "\x1f"
+VARIANT_SEPARATOR = "\x1f"
+SPEC_SEPARATOR = "\x1e"
+
+
+class VariantUrl(NamedTuple):
+    spec: str
+    url: str
+
+
+class joined_strings(GenericFunction):
+    """
+    Aggregate function that concatenates strings with separator:
+    string_agg on PostgreSQL, group_concat on SQLite. Optional third
+    argument orders strings on PostgreSQL, SQLite concatenates them
+    in order of rows, so they are ordered by a subquery.
+    """
+    type = String()
+    inherit_cache = True
+
+
+@compiles(joined_strings)
+def compile_group_concat(element, compiler, **kw):
+    value, separator = list(element.clauses)[:2]
+    return (f"group_concat({compiler.process(value, **kw)}, "
+            f"{compiler.process(separator, **kw)})")
+
+
+@compiles(joined_strings, "postgresql")
+def compile_string_agg(element, compiler, **kw):
+    value, separator, *order_by = element.clauses
+    order = "".join(f" ORDER BY {compiler.process(key, **kw)}"
+                    for key in order_by)
+    return (f"string_agg({compiler.process(value, **kw)}, "
+            f"{compiler.process(separator, **kw)}{order})")
+
+
+def tag_list():
+    """
+    Correlated subquery aggregating tag names of photo into one string,
+    in order of tag ids
+
+        Returns:
+            Label: tag names joined with TAG_SEPARATOR, NULL if no tags
+    """
+    tags = (
+        select(TagORM.id, TagORM.tag)
+        .select_from(photo_tag_association_table)
+        .join(TagORM, TagORM.id == photo_tag_association_table.c.tag_id)
+        .where(photo_tag_association_table.c.photo_id == PhotoORM.id)
+        .order_by(TagORM.id)
+        .correlate(PhotoORM)
+        .subquery()
+    )
+    return (
+        select(joined_strings(tags.c.tag, TAG_SEPARATOR, tags.c.id))
+        .scalar_subquery()
+        .label("tag_list")
+    )
+
+
+def split_tags(value: Optional[str]) -> list[str]:
+    return value.split(TAG_SEPARATOR) if value else []
+
+
+def variant_list():
+    """
+    Correlated subquery aggregating thumbnail and responsive variants
+    of photo into one string
+
+        Returns:
+            Label: "spec url" pairs joined with separators, NULL if no variants
+    """
+    specs = [normalize_spec({"width": width}) for width in responsive_widths()]
+    return (
+        select(joined_strings(PhotoVariantORM.spec
+                              + SPEC_SEPARATOR
+                              + PhotoVariantORM.url,
+                              VARIANT_SEPARATOR))
+        .where(PhotoVariantORM.photo_fk == PhotoORM.id,
+               PhotoVariantORM.spec.in_(specs))
+        .correlate(PhotoORM)
+        .scalar_subquery()
+        .label("variant_list")
+    )
+
+
+def split_variants(value: Optional[str]) -> list[VariantUrl]:
+    if not value:
+        return []
+    return [VariantUrl(*item.split(SPEC_SEPARATOR, 1))
+            for item in value.split(VARIANT_SEPARATOR)]
+
+
+def photo_rows(fields: Optional[Collection[str]] = None) -> Select:
+    """
+    Selects only the columns `PhotoResponse` is built from, with
+    username of photo author, aggregated tag names and variant urls,
+    so a page of responses is built from one statement. Joins and
+    subqueries of fields that are not requested are left out.
+
+        Args:
+            fields (Collection[str] | None): fields of `PhotoResponse`
+                to select, all fields if None; `id` is always selected
+
+        Returns:
+            Select: statement to add filtering and pagination to
+    """
+    if fields is None:
+        fields = PhotoResponse.model_fields
+    variants = "thumbnail_url" in fields or "srcset" in fields
+    columns = [PhotoORM.id]
+    columns.extend(getattr(PhotoORM, field)
+                   for field in ("description", "url", "public_id",
+                                 "qrcode_url", "author_fk")
+                   # srcset leaves out variants that are the original
+                   if field in fields or (field == "url" and variants))
+    if "comments_num" in fields:
+        columns.append(PhotoORM.comments_count)
+    if "author" in fields:
+        columns.append(UserORM.username.label("author"))
+    if "tags" in fields:
+        columns.append(tag_list())
+    if variants:
+        columns.append(variant_list())
+    stmnt = select(*columns)
+    if "author" in fields:
+        stmnt = (
+            stmnt
+            .join(ProfileORM, ProfileORM.id == PhotoORM.author_fk)
+            .join(UserORM, UserORM.id == ProfileORM.user_id)
+        )
+    return stmnt
+
+
+def authored_by(username: str) -> ColumnElement[bool]:
+    """
+    Filters photos by username of author, without joining users
+    to statement of `photo_rows`
+
+        Args:
+            username (str): username of author
+
+        Returns:
+            ColumnElement[bool]: condition to add to statement
+    """
+    return PhotoORM.author_fk.in_(
+        select(ProfileORM.id)
+        .join(UserORM, UserORM.id == ProfileORM.user_id)
+        .where(UserORM.username == username)
+    )
+
+
+def tagged_photo_ids(tag_ids: Sequence[int], match_all: bool) -> Select:
+    """
+    Selects ids of photos tagged with given tags, grouped on
+    ix_photo_tag_tag_id_photo_id index, so nothing is filtered in Python
+
+        Args:
+            tag_ids (Sequence[int]): ids of distinct tags
+            match_all (bool): photo must have all tags if True, any otherwise
+
+        Returns:
+            Select: statement selecting `photo_id` column
+    """
+    photo_id = photo_tag_association_table.c.photo_id
+    stmnt = (
+        select(photo_id)
+        .where(photo_tag_association_table.c.tag_id.in_(tag_ids))
+        .group_by(photo_id)
+    )
+    if match_all:
+        stmnt = stmnt.having(func.count() == len(tag_ids))
+    return stmnt
+
+
+def search_words(text: str) -> list[str]:
+    """Splits search text into words, dropping query syntax characters"""
+    return re.findall(r"\w+", text)
+
+
+def search_hits(dialect: str, words: Sequence[str]) -> Select:
+    """
+    Selects ids of photos which descriptions contain all words,
+    using full-text index of the dialect, see photo.orm.FULLTEXT_DDL
+
+        Args:
+            dialect (str): name of database dialect
+            words (Sequence[str]): words to search, see `search_words`
+
+        Returns:
+            Select: statement selecting `photo_id` and `score` columns,
+                lower score is better match
+    """
+    if dialect == "postgresql":
+        search_vector = literal_column("photos.search_vector", TSVECTOR)
+        query = func.plainto_tsquery(
+            cast(settings.fulltext_config, REGCONFIG), " ".join(words)
+        )
+        return (
+            select(PhotoORM.id.label("photo_id"),
+                   (-func.ts_rank(search_vector, query)).label("score"))
+            .where(search_vector.bool_op("@@")(query))
+        )
+    # every word is quoted, so it is matched as a string, not as syntax
+    query = " ".join(f'"{word}"' for word in words)
+    # hidden column named after FTS5 table matches all its columns
+    fts = table("photos_fts", column("rowid"), column("photos_fts"))
+    return (
+        select(fts.c.rowid.label("photo_id"),
+               func.bm25(literal_column("photos_fts"), type_=Float)
+               .label("score"))
+        .where(fts.c.photos_fts.op("MATCH")(query))
+    )
+
+
+def photo_response(row: Row,
+                   fields: Optional[Sequence[str]] = None
+                   ) -> PhotoResponse | dict[str, Any]:
+    """
+    Builds response from row selected by `photo_rows`
+
+        Args:
+            row (Row): selected photo row
+            fields (Sequence[str] | None): fields the row was selected with
+
+        Returns:
+            PhotoResponse: photo response, if all fields are selected
+            dict: requested fields of photo response otherwise
+    """
+    data = dict(row._mapping)
+    if "comments_count" in data:
+        data["comments_num"] = data.pop("comments_count")
+    if "tag_list" in data:
+        data["tags"] = split_tags(data.pop("tag_list"))
+    if "variant_list" in data:
+        data["thumbnail_url"], data["srcset"] = \
+            responsive_images(split_variants(data.pop("variant_list")),
+                              data.get("url"))
+    if fields is None:
+        return PhotoResponse.model_validate(data)
+    return {field: data[field] for field in fields}
+
+
+async def get_photo_responses(db: AsyncSession,
+                              photo_ids: Sequence[int],
+                              fields: Optional[Sequence[str]] = None
+                              ) -> dict[int, PhotoResponse | dict[str, Any]]:
+    """
+    Selects responses of several photos with one statement
+
+        Args:
+            db (AsyncSession): The database session.
+            photo_ids (Sequence[int]): ids of photos
+            fields (Sequence[str] | None): fields to select, all if None
+
+        Returns:
+            dict[int, PhotoResponse | dict]: responses by photo id,
+                missing photos are omitted
+    """
+    if not photo_ids:
+        return {}
+    stmnt = photo_rows(fields).where(PhotoORM.id.in_(photo_ids))
+    return {row.id: photo_response(row, fields)
+            for row in await db.execute(stmnt)}
+
+
+async def get_photo_response(db: AsyncSession,
+                             photo_id: int) -> Optional[PhotoResponse]:
+    """
+    Selects response of one photo
+
+        Args:
+            db (AsyncSession): The database session.
+            photo_id (int): id of photo
+
+        Returns:
+            PhotoResponse | None: photo response, None if there is no photo
+    """
+    return (await get_photo_responses(db, [photo_id])).get(photo_id)
@@ -1,42 +1,74 @@
-from typing import List, Optional, Annotated, Any
-import io
+from typing import List, Literal, Optional, Annotated, Any
+import asyncio
 
-from fastapi import (Depends,
+from fastapi import (BackgroundTasks,
+                     Depends,
                      HTTPException,
                      UploadFile,
                      File,
                      APIRouter,
                      status,
                      Form,
-                     Query)
+                     Query,
+                     Request)
 # from requests import HTTPError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import and_
-import cloudinary
-from cloudinary.uploader import upload, destroy
 from sqlalchemy.orm import selectinload
-from fastapi.responses import Response, JSONResponse
-import qrcode
-from database import get_db
-from photo.model import PhotoResponse, PhotoModel, QRCodeModel
-from photo.orm import PhotoORM
+from fastapi.responses import Response, JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from database import get_db, sessionmanager
+from photo.model import (PhotoResponse,
+                         PhotoModel,
+                         QRCodeModel,
+                         BatchPhotoResult,
+                         PhotoBatchResponse,
+                         PhotoVariantModel,
+                         TransformRequest)
+from photo.orm import (PhotoORM,
+                       TrendingScoreORM,
+                       TrendingStateORM,
+                       photo_tag_association_table)
+from photo.cache import photo_cache
+from photo.export import NDJSON_MEDIA_TYPE, export_ndjson, export_rows
+from photo.ingest import IngestedUpload, ingest_upload
+from photo.qr import ensure_photo_qr, pregenerate_photo_qr
+from photo.queries import (authored_by,
+                           get_photo_response,
+                           get_photo_responses,
+                           photo_response,
+                           photo_rows,
+                           search_hits,
+                           search_words,
+                           tagged_photo_ids)
+from photo.trending import view_counter
+from photo.variants import get_or_create_variant, pregenerate_photo_variants
 from tags.orm import TagORM
+from tags.service import resolve_tags
 from settings import settings
-import qrcode.image.svg
 from userprofile.orm import ProfileORM, UserORM
+from auth.require_role import require_role
 from auth.service import auth as auth_service
+from storage.model import StoredAsset
+from storage.assets import find_asset, find_assets, register_asset, release_assets
+from storage.outbox import outbox_worker
+from storage.service import storage
+from workers.process_pool import PoolSaturatedError
+from utils.etag import make_etag, not_modified
+from utils.fieldsets import (Fieldset,
+                             fieldset,
+                             sparse_payload,
+                             sparse_response)
+from utils.pagination import keyset_page, ranked_page, split_page
+from versions.service import PHOTOS, get_versions, touch_photos
 
 
 router = APIRouter(prefix='/photos', tags=["photos"])
 
-
-cloudinary.config(
-        cloud_name=settings.cloudinary_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True
-    )
+# `fields` query parameter of photo read endpoints
+photo_fields = fieldset(PhotoResponse)
+PHOTO_LIST = TypeAdapter(List[PhotoResponse])
 
 
 async def get_profile(user_id: int, db: AsyncSession):
@@ -59,77 +91,208 @@ async def get_profile(user_id: int, db: AsyncSession):
     return profile
 
 
+def parse_tags(tags: str | None) -> List[str]:
+    """
+        Splits space separated tags string into list of unique tags.
+
+        Args:
+            tags (str | None): space separated tags
+
+        Returns:
+            List[str]: tags in order of appearance without duplicates
+    """
+    return list(dict.fromkeys(tags.split())) if tags else []
+
+
 @router.post("/add",
              response_model=PhotoResponse
              )
 async def create_photo(
         db: Annotated[AsyncSession, Depends(get_db)],
         user: Annotated[UserORM, Depends(auth_service.get_access_user)],
+        background_tasks: BackgroundTasks,
         description: str = Form(),
         file: UploadFile = File(),
         tags: Annotated[str | None, Form()] = None
 ) -> Any:
     profile = await get_profile(user.id, db)
-    tags_list = tags.split(' ') if tags else []
-    tags_photo = []
-    for tag in tags_list:
-        tag_exists = await db.execute(select(TagORM).where(TagORM.tag == tag))
-        tag_exists = tag_exists.scalars().first()
-        if not tag_exists:
-            new_tag = TagORM(tag=tag)
-            db.add(new_tag)
-            # await db.commit()
-            #
-            # from_db = await db.execute(select(TagORM).where(TagORM.tag == tag))
-            # from_db = from_db.scalars().first()
-            # tags_photo.append(from_db)
-            tags_photo.append(new_tag)
-        else:
-            tags_photo.append(tag_exists)
-
-    max_file_size = 3 * 1024 * 1024  # 3 megabytes
-    file_content = await file.read()
-    file_size = len(file_content)
-    if file_size > max_file_size:
-        raise HTTPException(status_code=413,
-                            detail="File size exceeds the limit of 3 megabytes")
-    await file.seek(0)
-    try:
-        cloudinary_result = upload(file.file, folder=settings.cloudinary_folder)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    upload = await ingest_upload(file)
+    # the same content is uploaded only once
+    stored = await find_asset(db, upload.content_hash)
+    if stored is None:
+        try:
+            stored = await storage.upload(upload.file,
+                                          folder=settings.cloudinary_folder)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    stored = await register_asset(db, upload.content_hash, stored)
     photo = PhotoModel(description=description)
-    db_photo = PhotoORM(url=cloudinary_result['secure_url'],
-                        public_id=cloudinary_result['public_id'],
+    tags_list = parse_tags(tags)
+    tags_map = await resolve_tags(tags_list, db)
+    tags_photo = [tags_map[tag] for tag in tags_list]
+    db_photo = PhotoORM(url=stored.url,
+                        public_id=stored.public_id,
+                        content_hash=upload.content_hash,
                         description=photo.description,
                         author_fk=profile.id,
                         tags=tags_photo)
     db.add(db_photo)
+    await db.flush()
+    photo_id = db_photo.id
+    await touch_photos(db, [])
     await db.commit()
-    await db.refresh(db_photo)
 
-    stmnt = (
-        select(PhotoORM)
-        .where(PhotoORM.public_id == db_photo.public_id)
-        .options(
-            selectinload(PhotoORM.tags),
-            selectinload(PhotoORM.author),
-            selectinload(PhotoORM.author).selectinload(ProfileORM.user),
-            selectinload(PhotoORM.comments))
-    )
+    background_tasks.add_task(pregenerate_photo_qr, photo_id)
+    background_tasks.add_task(pregenerate_photo_variants, photo_id)
+
+    return await get_photo_response(db, photo_id)
 
-    db_resp = await db.execute(stmnt)
-    db_photo = db_resp.scalars().first()
 
-    ret_photo = PhotoResponse.from_orm(db_photo)
-    ret_photo.comments_num = len(db_photo.comments)
-    ret_photo.tags = [tag.tag for tag in db_photo.tags]
-    ret_photo.author = db_photo.author.user.username
+@router.post("/add/batch",
+             response_model=List[BatchPhotoResult])
+async def create_photos_batch(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        user: Annotated[UserORM, Depends(auth_service.get_access_user)],
+        background_tasks: BackgroundTasks,
+        files: List[UploadFile] = File(),
+        descriptions: List[str] = Form(),
+        tags: List[str] = Form(default=[])
+) -> Any:
+    """
+        Uploads several photos in one request.
 
-    return ret_photo
+        Files are uploaded concurrently, at most `batch_upload_parallelism`
+        at a time, and all photos are stored in one transaction. A file that
+        fails validation or upload is reported with an error and does not
+        prevent other photos from being added. Files with the same content
+        are uploaded once, content that is already stored is reused.
 
+        Args:
+            db (AsyncSession): The database session.
+            user (UserORM): The authenticated user.
+            files (List[UploadFile]): photos to upload.
+            descriptions (List[str]): description for every file.
+            tags (List[str]): space separated tags for every file, optional.
 
-@router.post("/{transform}", response_model=PhotoResponse, status_code=status.HTTP_200_OK)
+        Returns:
+            List[BatchPhotoResult]: result for every file in the order of upload.
+
+        Raises:
+            HTTPException: If there are too many files, if number of descriptions
+                or tags does not match number of files or if photos could not
+                be stored.
+    """
+    if len(files) > settings.batch_upload_max_files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"msg": ("Batch is limited to "
+                            f"{settings.batch_upload_max_files} files")}
+        )
+    tags = tags or [''] * len(files)
+    if not len(files) == len(descriptions) == len(tags):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"msg": ("Number of descriptions and tags must match "
+                            "number of files")}
+        )
+    profile = await get_profile(user.id, db)
+    results = [BatchPhotoResult(index=index, filename=file.filename)
+               for index, file in enumerate(files)]
+    semaphore = asyncio.Semaphore(settings.batch_upload_parallelism)
+
+    async def ingest_file(index: int) -> IngestedUpload | None:
+        try:
+            PhotoModel(description=descriptions[index])
+            return await ingest_upload(files[index])
+        except ValidationError as e:
+            results[index].error = e.errors()[0]['msg']
+        except HTTPException as e:
+            results[index].error = e.detail.get('msg')
+        except Exception as e:
+            results[index].error = str(e)
+        return None
+
+    uploads = await asyncio.gather(*(ingest_file(index)
+                                     for index in range(len(files))))
+    # files with the same content are uploaded once, already stored
+    # content is not uploaded at all
+    by_hash = {}
+    for index, upload in enumerate(uploads):
+        if upload is not None:
+            by_hash.setdefault(upload.content_hash, []).append(index)
+    existing = await find_assets(db, by_hash)
+
+    async def store_file(content_hash: str) -> StoredAsset | None:
+        index = by_hash[content_hash][0]
+        try:
+            async with semaphore:
+                return await storage.upload(uploads[index].file,
+                                            folder=settings.cloudinary_folder)
+        except Exception as e:
+            for index in by_hash[content_hash]:
+                results[index].error = str(e)
+        return None
+
+    new_hashes = [content_hash for content_hash in by_hash
+                  if content_hash not in existing]
+    uploaded = dict(zip(new_hashes,
+                        await asyncio.gather(*(store_file(content_hash)
+                                               for content_hash in new_hashes))))
+    stored = {content_hash: asset
+              for content_hash, asset in (existing | uploaded).items()
+              if asset is not None}
+    if not stored:
+        return results
+
+    tags_lists = [parse_tags(item) for item in tags]
+    db_photos = {}
+    try:
+        for content_hash, asset in stored.items():
+            stored[content_hash] = await register_asset(
+                db, content_hash, asset, references=len(by_hash[content_hash])
+            )
+        tags_map = await resolve_tags(
+            (tag for index, upload in enumerate(uploads)
+             if upload and upload.content_hash in stored
+             for tag in tags_lists[index]),
+            db
+        )
+        for content_hash, asset in stored.items():
+            for index in by_hash[content_hash]:
+                db_photos[index] = PhotoORM(
+                    url=asset.url,
+                    public_id=asset.public_id,
+                    content_hash=content_hash,
+                    description=descriptions[index],
+                    author_fk=profile.id,
+                    tags=[tags_map[tag] for tag in tags_lists[index]]
+                )
+        db.add_all(db_photos.values())
+        await db.flush()
+        photo_ids = {index: photo.id
+                     for index, photo in sorted(db_photos.items())}
+        await touch_photos(db, [])
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        await asyncio.gather(*(storage.delete(asset.public_id)
+                               for asset in uploaded.values() if asset),
+                             return_exceptions=True)
+        raise HTTPException(status_code=400, detail={"msg": str(e)})
+
+    photos = await get_photo_responses(db, list(photo_ids.values()))
+
+    for index, photo_id in photo_ids.items():
+        results[index].photo = photos[photo_id]
+        background_tasks.add_task(pregenerate_photo_qr, photo_id)
+        background_tasks.add_task(pregenerate_photo_variants, photo_id)
+
+    return results
+
+
+@router.post("/{transform}",
+             response_model=PhotoResponse,
+             status_code=status.HTTP_200_OK)
 async def transform_photo(
     db: Annotated[AsyncSession, Depends(get_db)],
     user: Annotated[UserORM, Depends(auth_service.get_access_user)],
@@ -145,7 +308,11 @@ async def transform_photo(
     color: Optional[str] = Form(None),
 ):
     """
-        Transforms a photo with the specified transformations and updates the database with the new photo details.
+        Creates a variant of the photo with the specified transformations.
+        Variant url is derived from the original photo, which stays
+        untouched, so nothing is uploaded. Equal transformations of the
+        same photo share one variant. Variants of the photo are listed
+        by `GET /photos/variants/{photo_id}`.
 
         Args:
             db (AsyncSession): The database session.
@@ -165,23 +332,26 @@ async def transform_photo(
             color (Optional[str]): The color adjustment for the photo.
 
         Returns:
-            PhotoResponse: The updated photo details.
+            PhotoResponse: The photo the variant is created for.
 
         Raises:
-            HTTPException: If the photo is not found or if there is an
-                error during the transformation process.
+            HTTPException: If the photo is not found, no transformations
+                are given, they are invalid or storage can not apply them.
     """
+    try:
+        transform = TransformRequest(width=width, height=height, crop=crop,
+                                     gravity=gravity, radius=radius,
+                                     effect=effect, quality=quality,
+                                     brightness=brightness, color=color)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    transformations = transform.model_dump(exclude_none=True)
+    if not transformations:
+        raise HTTPException(status_code=400,
+                            detail={"msg": "No transformations are given."})
+
     profile = await get_profile(user.id, db)
-    query = (
-        select(PhotoORM).where(PhotoORM.id == photo_id)
-        .options(
-            selectinload(PhotoORM.tags),
-            selectinload(PhotoORM.author),
-            selectinload(PhotoORM.author).selectinload(ProfileORM.user),
-            selectinload(PhotoORM.comments))
-    )
-    result = await db.execute(query)
-    db_photo = result.scalars().first()
+    db_photo = await db.get(PhotoORM, photo_id)
     if not db_photo:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -196,44 +366,44 @@ async def transform_photo(
                 "msg": "Only author of the photo can transform it."
             }}
         )
-    transformations = {key: value for key, value in locals().items()
-                       if key != 'db'
-                       and key != 'photo_id'
-                       and value is not None}
-    try:
-        transformed_url = upload(db_photo.url, **transformations)
-        destroy(db_photo.public_id)
-        if db_photo.qrcode_url not in [None, '']:
-            destroy(db_photo.qrcode_public_id)
-        db_photo.url = transformed_url['secure_url']
-        db_photo.public_id = transformed_url['public_id']
-        db_photo.qrcode_url = None
-        db.add(db_photo)
-        await db.commit()
-        await db.refresh(db_photo)
+    variant = await get_or_create_variant(db_photo, transformations, db)
+    if variant is None:
+        raise HTTPException(status_code=400, detail={
+            "msg": "Storage can not prepare photo with these transformations."
+        })
+    await touch_photos(db, [photo_id])
+    await db.commit()
+    photo_cache.invalidate(photo_id)
+    return await get_photo_response(db, photo_id)
 
-        stmnt = (
-            select(PhotoORM)
-            .where(PhotoORM.public_id == db_photo.public_id)
-            .options(
-                selectinload(PhotoORM.tags),
-                selectinload(PhotoORM.author),
-                selectinload(PhotoORM.author).selectinload(ProfileORM.user),
-                selectinload(PhotoORM.comments))
-        )
 
-        db_resp = await db.execute(stmnt)
-        db_photo = db_resp.scalars().first()
+@router.get("/variants/{photo_id:int}",
+            response_model=List[PhotoVariantModel])
+async def get_photo_variants(photo_id: int,
+                             db: AsyncSession = Depends(get_db)):
+    """
+        Retrieves all variants of the photo.
 
-        ret_photo = PhotoResponse.from_orm(db_photo)
-        ret_photo.comments_num = len(db_photo.comments)
-        ret_photo.tags = [tag.tag for tag in db_photo.tags]
-        ret_photo.author = db_photo.author.user.username
+        Args:
+            photo_id (int): The ID of the photo.
+            db (AsyncSession): The database session.
 
-        return ret_photo
+        Returns:
+            List[PhotoVariantModel]: The variants of the photo.
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        Raises:
+            HTTPException: If the photo is not found.
+    """
+    stmnt = (
+        select(PhotoORM)
+        .where(PhotoORM.id == photo_id)
+        .options(selectinload(PhotoORM.variants))
+    )
+    db_photo = (await db.execute(stmnt)).scalars().first()
+    if not db_photo:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return [PhotoVariantModel.model_validate(variant)
+            for variant in db_photo.variants]
 
 
 @router.post("/{tags}", status_code=status.HTTP_201_CREATED)
@@ -262,18 +432,25 @@ async def add_tags_to_photo(
                        or if adding the tags would exceed the limit of 5 tags per photo.
     """
     profile = await get_profile(user.id, db)
-    query = select(PhotoORM).where(and_(PhotoORM.id == photo_id, PhotoORM.author_fk == profile.id))
+    query = (
+        select(PhotoORM)
+        .where(and_(PhotoORM.id == photo_id, PhotoORM.author_fk == profile.id))
+        .options(selectinload(PhotoORM.tags))
+    )
     result = await db.execute(query)
     photo = result.scalars().first()
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
+    photo_tags = {tag.tag for tag in photo.tags}
+    new_tags = [tag for tag in dict.fromkeys(tag_names) if tag not in photo_tags]
     # Check the current number of tags and limit to 5
-    if len(photo.tags) + len(tag_names) > 5:
+    if len(photo.tags) + len(new_tags) > 5:
         raise HTTPException(status_code=400, detail="Adding these tags would exceed the limit of 5 tags per photo")
-    tags_to_add = await db.scalars(select(TagORM).where(TagORM.tag.in_(tag_names)))
-    tags_to_add = tags_to_add.all()
-    photo.tags.extend(tags_to_add)
+    tags_to_add = await resolve_tags(new_tags, db)
+    photo.tags.extend(tags_to_add.values())
+    await touch_photos(db, [photo_id])
     await db.commit()
+    photo_cache.invalidate(photo_id)
 
     return Response(status_code=status.HTTP_201_CREATED)
 
@@ -284,14 +461,25 @@ async def create_qr_code(
         photo_id: int,
         db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Any:
+    """
+        Returns QR code of the photo url.
+
+        QR code is normally generated in background right after photo
+        upload or transformation, so it is only generated here if
+        that did not happen yet.
+
+        Args:
+            photo_id (int): The ID of the photo.
+            db (AsyncSession): The database session.
+
+        Returns:
+            QRCodeModel: urls of the photo and its QR code.
+    """
     photo_db = await db.execute(
         select(PhotoORM).where(PhotoORM.id == photo_id)
     )
     photo_db = photo_db.scalars().first()
 
-    if photo_db.qrcode_url:
-        return QRCodeModel.from_orm(photo_db)
-
     if photo_db is None:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -299,25 +487,19 @@ async def create_qr_code(
                          {"msg": f"Photo with id: {photo_id} is not found."}
                      }
         )
-    qr_code = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr_code.add_data(photo_db.url)
-    qr_code.make(fit=True)
-    img = qr_code.make_image(fill_color="black", back_color="white")
-    img_bytes = io.BytesIO()
-    img.save(img_bytes)
-    img_bytes.seek(0)
-    # Upload the image to Cloudinary
-    cloudinary_result = upload(img_bytes.read(), folder="qrcode/")
-    photo_db.qrcode_url = cloudinary_result['secure_url']
-    photo_db.qrcode_public_id = cloudinary_result['public_id']
-    await db.commit()
-    await db.refresh(photo_db)
 
+    if photo_db.qrcode_url:
+        return QRCodeModel.from_orm(photo_db)
+
+    try:
+        photo_db = await ensure_photo_qr(photo_db, db)
+    except (PoolSaturatedError, asyncio.TimeoutError):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail":
+                         {"msg": "QR code is being generated, try again later."}
+                     }
+        )
     return QRCodeModel.from_orm(photo_db)
 
 
@@ -344,104 +526,126 @@ async def create_photo_link_and_qrcode(db: Annotated[AsyncSession, Depends(get_d
     db_photo = result.scalars().first()
     if not db_photo:
         raise HTTPException(status_code=404, detail="Photo not found")
-    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=5)
-    qr.add_data(db_photo.url)
-    qr.make(fit=True)
-    img = qr.make_image(fill='black', back_color='white')
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
-    # Upload the image to Cloudinary
-    cloudinary_result = upload(img_bytes.read(), folder="qrcode/")
-    db_photo.qrcode_url = cloudinary_result['secure_url']
-    db_photo.qrcode_public_id = cloudinary_result['public_id']
-    await db.commit()
-    await db.refresh(db_photo)
-    return PhotoResponse.from_orm(db_photo)
+    await ensure_photo_qr(db_photo, db)
+    return await get_photo_response(db, photo_id)
 
 
 @router.get("/", response_model=List[PhotoResponse])
-async def get_photos(limit: int = Query(10, ge=1, le=10), offset: int = Query(0, ge=0),
+async def get_photos(request: Request,
+                     response: Response,
+                     limit: int = Query(10, ge=1, le=settings.page_size_max),
+                     offset: int = Query(0, ge=0),
+                     cursor: Optional[str] = Query(None),
+                     fields: Fieldset = Depends(photo_fields),
                      db: AsyncSession = Depends(get_db)):
     """
-        Retrieves a list of photos with pagination.
+        Retrieves a list of photos with pagination, newest first.
+
+        Pages are selected by cursor: cursor of the next page is returned
+        in `X-Next-Cursor` header and is absent on the last page.
+        Pages are revalidated with ETag of photo collection version.
 
         Args:
-            limit (int): The maximum number of photos to return. Must be between 1 and 10.
+            request (Request): The request, checked for `If-None-Match`.
+            response (Response): The response to set headers to.
+            limit (int): The maximum number of photos to return. Must be between 1 and `page_size_max`.
             offset (int): The number of photos to skip before starting to collect the result set. Must be greater than or equal to 0.
+            cursor (Optional[str]): Cursor of the page returned with the previous page.
+            fields (Fieldset): Fields of photos to return, all if not given.
             db (AsyncSession): The database session.
 
         Returns:
             List[PhotoResponse]: A list of photo details, limited by the `limit` and offset by the `offset`.
         """
-    query = (
-        select(PhotoORM).offset(offset).limit(limit).order_by(PhotoORM.id.desc())
-        .options(
-            selectinload(PhotoORM.comments),
-            selectinload(PhotoORM.tags),
-            selectinload(PhotoORM.author),
-            selectinload(PhotoORM.author).selectinload(ProfileORM.user))
-    )
+    etag = make_etag(request, PHOTOS, *await get_versions(db, PHOTOS),
+                     limit, offset, cursor, fields)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    query = keyset_page(photo_rows(fields), PhotoORM.id, limit, offset, cursor)
     result = await db.execute(query)
-    photos = result.scalars().all()
-    return_list = []
-    for photo in photos:
-        _ = PhotoResponse.from_orm(photo)
-        _.comments_num = len(photo.comments)
-        _.tags = [tag.tag for tag in photo.tags]
-        _.author = photo.author.user.username
-        return_list.append(_)
+    response.headers["ETag"] = etag
+    rows = split_page(result.all(), limit, response, key=lambda row: row.id)
 
-    return return_list
+    return sparse_response([photo_response(row, fields) for row in rows],
+                           fields, response, PHOTO_LIST)
 
 
 @router.get("/detail/{photo_id:int}", response_model=PhotoResponse)
-async def get_photo_id(photo_id: int, db: AsyncSession = Depends(get_db)):
+async def get_photo_id(photo_id: int,
+                       request: Request,
+                       fields: Fieldset = Depends(photo_fields),
+                       db: AsyncSession = Depends(get_db)):
     """
-        Retrieves a single photo by its ID, including its comments and tags.
+        Retrieves a single photo by its ID, including number of its comments and its tags.
+
+        Serialized details are served from `photo_cache`, write paths
+        of photo invalidate its entry. Details are revalidated with
+        ETag of photo version. Requested fields are trimmed from cached
+        details, so they do not need a query.
 
         Args:
             photo_id (int): The ID of the photo to retrieve.
+            request (Request): The request, checked for `If-None-Match`.
+            fields (Fieldset): Fields of photo to return, all if not given.
             db (AsyncSession): The database session.
 
         Returns:
-            PhotoResponse: The photo details, including its comments and tags.
+            PhotoResponse: The photo details, including number of its comments and its tags.
 
         Raises:
             HTTPException: If the photo is not found.
     """
-    query = select(PhotoORM).filter_by(id=photo_id)\
-        .options(
-        selectinload(PhotoORM.comments),
-        selectinload(PhotoORM.author),
-        selectinload(PhotoORM.author).selectinload(ProfileORM.user),
-        selectinload(PhotoORM.tags)
+    version = await db.scalar(
+        select(PhotoORM.version).where(PhotoORM.id == photo_id)
     )
-    result = await db.execute(query)
-    db_photo = result.scalars().first()
-    if not db_photo:
+    if version is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    view_counter.record(photo_id)
+    etag = make_etag(request, "photo", photo_id, version, fields)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    async def load() -> Optional[bytes]:
+        ret_photo = await get_photo_response(db, photo_id)
+        return ret_photo.model_dump_json().encode() if ret_photo else None
+
+    payload = await photo_cache.get_or_load(photo_id, load, version)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Photo not found")
-    ret_photo = PhotoResponse.from_orm(db_photo)
-    ret_photo.comments_num = len(db_photo.comments)
-    ret_photo.tags = [tag.tag for tag in db_photo.tags]
-    ret_photo.author = db_photo.author.user.username
 
-    return ret_photo
+    return Response(content=sparse_payload(payload, fields),
+                    media_type="application/json",
+                    headers={"ETag": etag})
 
 
 @router.get("/tag/{tag_name:str}", response_model=List[PhotoResponse])
 async def get_photos_by_tag(
     tag_name: str,
-    db: Annotated[AsyncSession, Depends(get_db)]
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    fields: Annotated[Fieldset, Depends(photo_fields)],
+    limit: int = Query(10, ge=1, le=settings.page_size_max),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None)
 ):
     """
-    Get all photos associated with a tag.
+    Get photos associated with a tag, newest first.
 
     This endpoint allows the user to retrieve a list of photos associated with a tag specified by its name.
+    Cursor of the next page is returned in `X-Next-Cursor` header.
+    Pages are revalidated with ETag of photo collection version.
 
     Args:
         tag_name (str): The name of the tag.
+        request (Request): The request, checked for `If-None-Match`.
+        response (Response): The response to set headers to.
         db (AsyncSession): The database session.
+        fields (Fieldset): Fields of photos to return, all if not given.
+        limit (int): The maximum number of photos to return.
+        offset (int): The number of photos to skip.
+        cursor (Optional[str]): Cursor of the page returned with the previous page.
 
     Returns:
         List[PhotoResponse]: A list of photos associated with the tag.
@@ -449,76 +653,329 @@ async def get_photos_by_tag(
     Raises:
         HTTPException: If the tag is not found.
     """
+    etag = make_etag(request, PHOTOS, *await get_versions(db, PHOTOS),
+                     tag_name, limit, offset, cursor, fields)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    tag_id = await db.scalar(select(TagORM.id).where(TagORM.tag == tag_name))
+    if tag_id is None:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    response.headers["ETag"] = etag
+
+    # photos are paged by ix_photo_tag_tag_id_photo_id index
+    photo_fk = photo_tag_association_table.c.photo_id
     stmnt = (
-        select(TagORM)
-        .where(TagORM.tag == tag_name)
-        .options(
-            selectinload(TagORM.photos),
-            selectinload(TagORM.photos).selectinload(PhotoORM.author),
-            selectinload(TagORM.photos).selectinload(PhotoORM.comments),
-            selectinload(TagORM.photos).selectinload(PhotoORM.tags),
-            selectinload(TagORM.photos)
-            .selectinload(PhotoORM.author)
-            .selectinload(ProfileORM.user),
-        )
+        photo_rows(fields)
+        .join(photo_tag_association_table, photo_fk == PhotoORM.id)
+        .where(photo_tag_association_table.c.tag_id == tag_id)
     )
+    stmnt = keyset_page(stmnt, photo_fk, limit, offset, cursor)
 
     db_resp = await db.execute(stmnt)
-    tag = db_resp.scalars().first()
+    rows = split_page(db_resp.all(), limit, response, key=lambda row: row.id)
 
-    if not tag:
-        raise HTTPException(status_code=404, detail="Tag not found")
-    photos = tag.photos
+    return sparse_response([photo_response(row, fields) for row in rows],
+                           fields, response, PHOTO_LIST)
 
-    return_list = []
-    for photo in photos:
-        _ = PhotoResponse.from_orm(photo)
-        _.comments_num = len(photo.comments)
-        _.tags = [tag.tag for tag in photo.tags]
-        _.author = photo.author.user.username
-        return_list.append(_)
 
-    return return_list
+@router.get("/search/tags", response_model=List[PhotoResponse])
+async def search_photos_by_tags(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    fields: Annotated[Fieldset, Depends(photo_fields)],
+    tags: List[str] = Query(..., min_length=1, max_length=20),
+    match: Literal["all", "any"] = Query("all"),
+    limit: int = Query(10, ge=1, le=settings.page_size_max),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None)
+):
+    """
+    Search photos tagged with several tags, newest first.
+
+    Photos are matched and paginated in the database by grouping
+    `photo_tag` rows of requested tags. Cursor of the next page is
+    returned in `X-Next-Cursor` header.
+
+    Args:
+        request (Request): The request, checked for `If-None-Match`.
+        response (Response): The response to set headers to.
+        db (AsyncSession): The database session.
+        fields (Fieldset): Fields of photos to return, all if not given.
+        tags (List[str]): Names of tags, `tags` query parameter is repeated for each tag.
+        match (str): `all` to find photos having every tag, `any` to find photos having at least one of them.
+        limit (int): The maximum number of photos to return.
+        offset (int): The number of photos to skip.
+        cursor (Optional[str]): Cursor of the page returned with the previous page.
 
+    Returns:
+        List[PhotoResponse]: A list of matching photos, empty if no photo matches.
+    """
+    tag_names = sorted(set(tags))
+    etag = make_etag(request, PHOTOS, *await get_versions(db, PHOTOS),
+                     tag_names, match, limit, offset, cursor, fields)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    tag_ids = (await db.scalars(
+        select(TagORM.id).where(TagORM.tag.in_(tag_names))
+    )).all()
+    if not tag_ids or (match == "all" and len(tag_ids) < len(tag_names)):
+        return []
+
+    matched = tagged_photo_ids(tag_ids, match_all=match == "all")
+    photo_fk = photo_tag_association_table.c.photo_id
+    page = keyset_page(matched, photo_fk, limit, offset, cursor).subquery()
+    stmnt = (
+        photo_rows(fields)
+        .join(page, page.c.photo_id == PhotoORM.id)
+        .order_by(PhotoORM.id.desc())
+    )
+    db_resp = await db.execute(stmnt)
+    rows = split_page(db_resp.all(), limit, response, key=lambda row: row.id)
 
-@router.get("/user/{author_username: str}",
+    return sparse_response([photo_response(row, fields) for row in rows],
+                           fields, response, PHOTO_LIST)
+
+
+@router.get("/search", response_model=List[PhotoResponse])
+async def search_photos(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    fields: Annotated[Fieldset, Depends(photo_fields)],
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=settings.page_size_max),
+    cursor: Optional[str] = Query(None)
+):
+    """
+    Full-text search of photos by description, best matches first.
+
+    Photos containing all words of the query are found with full-text
+    index of the database and ranked by relevance. Cursor of the next
+    page is returned in `X-Next-Cursor` header.
+
+    Args:
+        request (Request): The request, checked for `If-None-Match`.
+        response (Response): The response to set headers to.
+        db (AsyncSession): The database session.
+        fields (Fieldset): Fields of photos to return, all if not given.
+        q (str): The search query.
+        limit (int): The maximum number of photos to return.
+        cursor (Optional[str]): Cursor of the page returned with the previous page.
+
+    Returns:
+        List[PhotoResponse]: A list of matching photos, empty if no photo matches.
+    """
+    etag = make_etag(request, PHOTOS, *await get_versions(db, PHOTOS),
+                     q, limit, cursor, fields)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    words = search_words(q)
+    if not words:
+        return []
+    hits = search_hits(db.bind.dialect.name, words).subquery()
+    stmnt = (
+        photo_rows(fields)
+        .add_columns(hits.c.score)
+        .join(hits, hits.c.photo_id == PhotoORM.id)
+    )
+    stmnt = ranked_page(stmnt, hits.c.score, PhotoORM.id, limit, cursor)
+    db_resp = await db.execute(stmnt)
+    rows = split_page(db_resp.all(), limit, response,
+                      key=lambda row: {"score": row.score, "id": row.id})
+
+    return sparse_response([photo_response(row, fields) for row in rows],
+                           fields, response, PHOTO_LIST)
+
+
+@router.get("/batch", response_model=PhotoBatchResponse)
+async def get_photos_batch(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    fields: Annotated[Fieldset, Depends(photo_fields)],
+    ids: List[int] = Query(..., min_length=1,
+                           max_length=settings.batch_fetch_max_ids)
+):
+    """
+    Get several photos by their ids with one request.
+
+    Photos are selected with one statement, so a gallery does not need
+    a request per photo.
+
+    Args:
+        request (Request): The request, checked for `If-None-Match`.
+        response (Response): The response to set headers to.
+        db (AsyncSession): The database session.
+        fields (Fieldset): Fields of photos to return, all if not given.
+        ids (List[int]): Ids of photos, `ids` query parameter is repeated for each id.
+
+    Returns:
+        PhotoBatchResponse: Found photos and ids of missing photos,
+            both in order of requested ids, repeated ids are returned once.
+    """
+    photo_ids = list(dict.fromkeys(ids))
+    etag = make_etag(request, PHOTOS, *await get_versions(db, PHOTOS),
+                     fields, *photo_ids)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    photos = await get_photo_responses(db, photo_ids, fields)
+    batch = dict(
+        photos=[photos[photo_id] for photo_id in photo_ids
+                if photo_id in photos],
+        missing=[photo_id for photo_id in photo_ids
+                 if photo_id not in photos]
+    )
+    return sparse_response(batch, fields, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_photos(
+    user: Annotated[UserORM, Depends(require_role(["admin"]))],
+    id_from: Optional[int] = Query(None, ge=1),
+    id_to: Optional[int] = Query(None, ge=1),
+    author: Optional[str] = Query(None, min_length=1)
+):
+    """
+    Export photo catalog as NDJSON, one `PhotoResponse` per line in
+    ascending order of ids.
+
+    Photos are streamed from database cursor with a session of the
+    export, so the whole catalog is exported with one request in
+    constant memory.
+
+    Args:
+        user (UserORM): The authenticated admin.
+        id_from (Optional[int]): The least id of exported photos.
+        id_to (Optional[int]): The greatest id of exported photos.
+        author (Optional[str]): Username of the author of exported photos.
+
+    Returns:
+        StreamingResponse: NDJSON stream of photos.
+    """
+    stmnt = export_rows(id_from, id_to, author)
+
+    async def stream():
+        # session of the request is closed before response is streamed
+        async with sessionmanager.session() as db:
+            async for chunk in export_ndjson(db, stmnt):
+                yield chunk
+
+    return StreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/trending", response_model=List[PhotoResponse])
+async def get_trending_photos(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    fields: Annotated[Fieldset, Depends(photo_fields)],
+    limit: int = Query(10, ge=1, le=settings.page_size_max),
+    cursor: Optional[str] = Query(None)
+):
+    """
+    Photos with the most recent comments and views first.
+
+    Scores are precomputed by background refresh, see photo.trending,
+    so comments and views are not aggregated per request. Cursor of the next page is
+    returned in `X-Next-Cursor` header.
+
+    Args:
+        request (Request): The request, checked for `If-None-Match`.
+        response (Response): The response to set headers to.
+        db (AsyncSession): The database session.
+        fields (Fieldset): Fields of photos to return, all if not given.
+        limit (int): The maximum number of photos to return.
+        cursor (Optional[str]): Cursor of the page returned with the previous page.
+
+    Returns:
+        List[PhotoResponse]: A list of trending photos.
+    """
+    state_version = await db.scalar(
+        select(TrendingStateORM.version).where(TrendingStateORM.id == 1)
+    )
+    etag = make_etag(request, "trending", state_version or 0,
+                     *await get_versions(db, PHOTOS), limit, cursor, fields)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    stmnt = (
+        photo_rows(fields)
+        .add_columns(TrendingScoreORM.score)
+        .join(TrendingScoreORM, TrendingScoreORM.photo_fk == PhotoORM.id)
+    )
+    # highest score first, ranked_page orders ascending
+    stmnt = ranked_page(stmnt, -TrendingScoreORM.score, PhotoORM.id,
+                        limit, cursor)
+    db_resp = await db.execute(stmnt)
+    rows = split_page(db_resp.all(), limit, response,
+                      key=lambda row: {"score": -row.score, "id": row.id})
+
+    return sparse_response([photo_response(row, fields) for row in rows],
+                           fields, response, PHOTO_LIST)
+
+
+@router.get("/user/{author_username:str}",
             response_model=List[PhotoResponse])
 async def get_photos_by_author(
         author_username: str,
-        db: Annotated[AsyncSession, Depends(get_db)]
+        response: Response,
+        db: Annotated[AsyncSession, Depends(get_db)],
+        fields: Annotated[Fieldset, Depends(photo_fields)],
+        limit: int = Query(10, ge=1, le=settings.page_size_max),
+        offset: int = Query(0, ge=0),
+        cursor: Optional[str] = Query(None)
 ) -> Any:
     """
-        Retrieves a list of photos by the author's username, including their comments and tags.
+        Retrieves a list of photos by the author's username, including number of their comments and their tags, newest first.
+
+        Cursor of the next page is returned in `X-Next-Cursor` header.
 
         Args:
             author_username (str): The username of the author whose photos to retrieve.
             db (AsyncSession): The database session.
+            fields (Fieldset): Fields of photos to return, all if not given.
+            limit (int): The maximum number of photos to return.
+            offset (int): The number of photos to skip.
+            cursor (Optional[str]): Cursor of the page returned with the previous page.
 
         Returns:
-            List[PhotoResponse]: A list of photo details, including their comments and tags, authored by the specified user.
+            List[PhotoResponse]: A list of photo details, including number of their comments and their tags, authored by the specified user.
 
         Raises:
             HTTPException: If the user or profile is not found.
     """
-    query1 = select(UserORM).where(UserORM.username == author_username)
-    result = await db.execute(query1)
-    user = result.scalars().first()
-    if not user:
-        return JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND,
-            content={"detail": f"User with username: {author_username} not found"}
+    stmnt = photo_rows(fields).where(authored_by(author_username))
+    stmnt = keyset_page(stmnt, PhotoORM.id, limit, offset, cursor)
+    db_resp = await db.execute(stmnt)
+    rows = split_page(db_resp.all(), limit, response, key=lambda row: row.id)
+
+    if not rows:
+        # tell apart unknown author from author without photos
+        stmnt = (
+            select(UserORM.id, ProfileORM.id.label("profile_id"))
+            .outerjoin(ProfileORM, ProfileORM.user_id == UserORM.id)
+            .where(UserORM.username == author_username)
         )
-    query2 = select(ProfileORM).filter_by(user_id=user.id)
-    result = await db.execute(query2)
-    profile = result.scalars().first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    query = select(PhotoORM).where(PhotoORM.author_fk == profile.id)\
-        .options(selectinload(PhotoORM.comments),
-                 selectinload(PhotoORM.tags))
-    result = await db.execute(query)
-    photos = result.scalars().all()
-    return [PhotoResponse.from_orm(photo) for photo in photos]
+        author = (await db.execute(stmnt)).first()
+        if author is None:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"detail": f"User with username: {author_username} not found"}
+            )
+        if author.profile_id is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+
+    return sparse_response([photo_response(row, fields) for row in rows],
+                           fields, response, PHOTO_LIST)
 
 
 @router.put("/{photo_id}", response_model=PhotoResponse)
@@ -553,9 +1010,10 @@ async def update_photo(db: Annotated[AsyncSession, Depends(get_db)],
     if not db_photo:
         raise HTTPException(status_code=404, detail="Photo not found")
     db_photo.description = description
+    await touch_photos(db, [photo_id])
     await db.commit()
-    await db.refresh(db_photo)
-    return PhotoResponse.from_orm(db_photo)
+    photo_cache.invalidate(photo_id)
+    return await get_photo_response(db, photo_id)
 
 
 @router.delete("/{photo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -588,10 +1046,11 @@ async def delete_photo(db: Annotated[AsyncSession, Depends(get_db)],
     photo = result.scalars().first()
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
-    destroy(photo.public_id)
-    if photo.qrcode_url not in [None, '']:
-        destroy(photo.qrcode_public_id)
+    await release_assets(db, [photo.public_id, photo.qrcode_public_id])
     await db.delete(photo)
+    await touch_photos(db, [])
     await db.commit()
+    photo_cache.invalidate(photo_id)
+    outbox_worker.wake_up()
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,251 @@
+"""Module provides trending photos ranked by decayed comment and view activity"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from comment.orm import CommentORM
+from database import sessionmanager
+from photo.orm import (PhotoORM,
+                       TrendingCommentORM,
+                       TrendingScoreORM,
+                       TrendingStateORM)
+from settings import settings
+from utils.db_utilities import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# scores are rebased before their weights grow out of float range
+REBASE_HALF_LIVES = 64
+
+
+def as_utc(moment: datetime) -> datetime:
+    """SQLite returns naive datetimes, they are stored in UTC"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def decay_weight(moment: datetime,
+                 epoch: datetime,
+                 half_life: float = settings.trending_half_life) -> float:
+    """
+    Weight of activity at moment relative to epoch. Scores are sums of
+    such weights, so decay of all scores is the same factor and ranking
+    does not need them to be recomputed.
+
+        Args:
+            moment (datetime): time of activity
+            epoch (datetime): reference time of scores
+            half_life (float): seconds after which activity counts half
+
+        Returns:
+            float: weight of activity
+    """
+    elapsed = (as_utc(moment) - as_utc(epoch)).total_seconds()
+    return 2 ** (elapsed / half_life)
+
+
+class ViewCounter:
+    """
+    Buffers views of photos in memory, so reads do not write to the
+    database. Buffer is drained by `refresh_trending`.
+    """
+
+    def __init__(self):
+        self._views: Counter[int] = Counter()
+
+    def record(self, photo_id: int) -> None:
+        self._views[photo_id] += 1
+
+    def drain(self) -> Counter[int]:
+        views, self._views = self._views, Counter()
+        return views
+
+    def restore(self, views: Counter[int]) -> None:
+        """Returns drained views that were not added to scores"""
+        self._views.update(views)
+
+
+async def load_state(db: AsyncSession, now: datetime) -> TrendingStateORM:
+    # locked, so concurrent refreshes of several processes do not add
+    # the same comments twice
+    state = await db.get(TrendingStateORM, 1, with_for_update=True)
+    if state is None:
+        state = TrendingStateORM(id=1, epoch=now, last_comment_at=None,
+                                 last_comment_id=0, version=0)
+        db.add(state)
+    return state
+
+
+async def new_comments(db: AsyncSession,
+                       state: TrendingStateORM,
+                       batch_size: int) -> list:
+    """
+    Selects comments not added to scores yet in order of creation.
+    Comments committed after the latest added one could be created
+    before it, so comments created within `trending_comment_grace`
+    before it are scanned again and the added ones are skipped by id.
+    """
+    stmnt = (
+        select(CommentORM.id, CommentORM.photo_fk, CommentORM.created_at)
+        .outerjoin(TrendingCommentORM,
+                   TrendingCommentORM.comment_id == CommentORM.id)
+        .where(TrendingCommentORM.comment_id.is_(None))
+        .order_by(CommentORM.created_at, CommentORM.id)
+        .limit(batch_size)
+    )
+    if state.last_comment_at is not None:
+        grace = timedelta(seconds=settings.trending_comment_grace)
+        stmnt = stmnt.where(
+            CommentORM.created_at >= as_utc(state.last_comment_at) - grace
+        )
+    return (await db.execute(stmnt)).all()
+
+
+async def mark_added(db: AsyncSession,
+                     state: TrendingStateORM,
+                     comments: list) -> None:
+    """Moves watermark to the latest added comment and remembers ids
+    of added comments that are within grace window"""
+    db.add_all(TrendingCommentORM(comment_id=comment.id,
+                                  created_at=comment.created_at)
+               for comment in comments)
+    latest = max(comments, key=lambda comment: (as_utc(comment.created_at),
+                                                comment.id))
+    if (state.last_comment_at is None
+            or (as_utc(latest.created_at), latest.id)
+            > (as_utc(state.last_comment_at), state.last_comment_id)):
+        state.last_comment_at = latest.created_at
+        state.last_comment_id = latest.id
+    await db.flush()
+    grace = timedelta(seconds=settings.trending_comment_grace)
+    await db.execute(
+        delete(TrendingCommentORM)
+        .where(TrendingCommentORM.created_at
+               < as_utc(state.last_comment_at) - grace)
+    )
+
+
+async def refresh_trending(db: AsyncSession,
+                           views: Optional[Counter[int]] = None,
+                           now: Optional[datetime] = None,
+                           batch_size: int = settings.trending_batch_size) -> int:
+    """
+    Adds comments not added by previous refreshes and buffered views
+    to trending scores, rebases scores when needed and removes scores
+    decayed below `trending_min_score`.
+
+        Args:
+            db (AsyncSession): The database session.
+            views (Counter[int] | None): views by photo id since the previous refresh
+            now (datetime | None): current time
+            batch_size (int): max number of comments added at once
+
+        Returns:
+            int: number of added comments, `batch_size` if more are pending
+    """
+    now = now or datetime.now(timezone.utc)
+    state = await load_state(db, now)
+    epoch = as_utc(state.epoch)
+
+    if (now - epoch).total_seconds() > REBASE_HALF_LIVES * settings.trending_half_life:
+        await db.execute(
+            update(TrendingScoreORM)
+            .values(score=TrendingScoreORM.score * decay_weight(epoch, now))
+        )
+        state.epoch = epoch = now
+
+    comments = await new_comments(db, state, batch_size)
+
+    increments: Counter[int] = Counter()
+    for comment in comments:
+        increments[comment.photo_fk] += (settings.trending_comment_weight
+                                         * decay_weight(comment.created_at, epoch))
+    view_weight = settings.trending_view_weight * decay_weight(now, epoch)
+    for photo_id, count in (views or {}).items():
+        increments[photo_id] += count * view_weight
+
+    if increments:
+        # photos could be deleted since they were viewed or commented
+        existing = set(await db.scalars(
+            select(PhotoORM.id).where(PhotoORM.id.in_(increments))
+        ))
+        increments = Counter({photo_id: score
+                              for photo_id, score in increments.items()
+                              if photo_id in existing})
+    if increments:
+        stmnt = dialect_insert(db, TrendingScoreORM).values(
+            [{"photo_fk": photo_id, "score": score}
+             for photo_id, score in increments.items()]
+        )
+        stmnt = stmnt.on_conflict_do_update(
+            index_elements=[TrendingScoreORM.photo_fk],
+            set_={"score": TrendingScoreORM.score + stmnt.excluded.score}
+        )
+        await db.execute(stmnt)
+    if comments:
+        await mark_added(db, state, comments)
+
+    threshold = settings.trending_min_score * decay_weight(now, epoch)
+    pruned = await db.execute(
+        delete(TrendingScoreORM).where(TrendingScoreORM.score < threshold)
+    )
+    if increments or pruned.rowcount:
+        state.version += 1
+    await db.commit()
+    return len(comments)
+
+
+class TrendingWorker:
+    """
+    Background task that refreshes trending scores while application is
+    running. Full batches of comments are added back to back, otherwise
+    worker sleeps for refresh interval.
+    """
+
+    def __init__(self,
+                 views: ViewCounter,
+                 interval: float = settings.trending_refresh_interval,
+                 batch_size: int = settings.trending_batch_size):
+        self.views = views
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def refresh(self) -> int:
+        views = self.views.drain()
+        try:
+            async with sessionmanager.session() as db:
+                return await refresh_trending(db, views,
+                                              batch_size=self.batch_size)
+        except Exception as e:
+            logger.error(f"Trending scores are not refreshed: {e}")
+            # views are counted with the next refresh
+            self.views.restore(views)
+            return 0
+
+    async def _run(self) -> None:
+        while True:
+            added = await self.refresh()
+            if added < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+
+view_counter = ViewCounter()
+trending_worker = TrendingWorker(view_counter)
@@ -0,0 +1,137 @@
+"""Module provides photo variants derived from untouched originals"""
+import logging
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import sessionmanager
+from photo.cache import photo_cache
+from photo.orm import PhotoORM, PhotoVariantORM
+from settings import settings
+from storage.service import storage
+from utils.db_utilities import dialect_insert
+from versions.service import touch_photos
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_spec(transformations: dict[str, Any]) -> str:
+    """
+    Builds canonical spec of transformations, so equal sets of
+    transformations give equal specs regardless of their order
+
+        Args:
+            transformations (dict): delivery transformations
+
+        Returns:
+            str: comma separated "key=value" pairs sorted by key
+    """
+    return ",".join(f"{key}={value}"
+                    for key, value in sorted(transformations.items())
+                    if value is not None)
+
+
+async def get_or_create_variant(photo: PhotoORM,
+                                transformations: dict[str, Any],
+                                db: AsyncSession
+                                ) -> Optional[PhotoVariantORM]:
+    """
+    Returns variant of photo with given transformations. Variant is
+    derived from the original, which is never changed or uploaded again.
+    Requests with the same transformations share one variant.
+    Caller is responsible for committing the session.
+
+        Args:
+            photo (PhotoORM): original photo
+            transformations (dict): delivery transformations
+            db (AsyncSession): The database session.
+
+        Returns:
+            PhotoVariantORM | None: stored variant, None if storage
+                can not prepare it
+    """
+    transformations = {key: value for key, value in transformations.items()
+                       if value is not None}
+    spec = normalize_spec(transformations)
+    select_stmnt = select(PhotoVariantORM).where(
+        PhotoVariantORM.photo_fk == photo.id,
+        PhotoVariantORM.spec == spec
+    )
+    variant = (await db.execute(select_stmnt)).scalars().first()
+    if variant is not None:
+        return variant
+
+    url = await storage.derive(photo.public_id, **transformations)
+    if url is None:
+        return None
+    stmnt = (
+        dialect_insert(db, PhotoVariantORM)
+        .values(photo_fk=photo.id, spec=spec, url=url)
+        .on_conflict_do_nothing(index_elements=[PhotoVariantORM.photo_fk,
+                                                PhotoVariantORM.spec])
+        .returning(PhotoVariantORM)
+    )
+    variant = (await db.execute(stmnt)).scalars().first()
+    if variant is None:
+        variant = (await db.execute(select_stmnt)).scalars().one()
+    return variant
+
+
+def responsive_widths() -> list[int]:
+    """
+    Widths of variants prepared for every uploaded photo
+
+        Returns:
+            list[int]: thumbnail and responsive widths in ascending order
+    """
+    return sorted({settings.thumbnail_width, *settings.responsive_widths})
+
+
+def responsive_images(variants: Iterable[PhotoVariantORM],
+                      original_url: Optional[str] = None
+                      ) -> tuple[Optional[str], Optional[str]]:
+    """
+    Picks prepared variants of photo for list views
+
+        Args:
+            variants (Iterable[PhotoVariantORM]): variants of photo
+            original_url (str | None): url of original photo
+
+        Returns:
+            tuple: thumbnail url and `srcset` of responsive widths,
+                None for ones that are not prepared yet
+    """
+    urls = {variant.spec: variant.url for variant in variants}
+    thumbnail = urls.get(normalize_spec({"width": settings.thumbnail_width}))
+    # original narrower than a width is used as is, its width is unknown,
+    # so it is not listed with width it does not have
+    candidates = {}
+    for width in responsive_widths():
+        url = urls.get(normalize_spec({"width": width}))
+        if url is not None and url != original_url:
+            candidates.setdefault(url, width)
+    srcset = ", ".join(f"{url} {width}w" for url, width in candidates.items())
+    return thumbnail, srcset or None
+
+
+async def pregenerate_photo_variants(photo_id: int) -> None:
+    """
+    Background task that prepares thumbnail and responsive variants
+    right after photo is stored
+
+        Args:
+            photo_id (int): id of photo
+    """
+    async with sessionmanager.session() as db:
+        try:
+            photo = await db.get(PhotoORM, photo_id)
+            if photo is None:
+                return
+            for width in responsive_widths():
+                await get_or_create_variant(photo, {"width": width}, db)
+            await touch_photos(db, [photo_id])
+            await db.commit()
+            photo_cache.invalidate(photo_id)
+        except Exception as e:
+            logger.error(f"Variants of photo {photo_id} are not prepared: {e}")
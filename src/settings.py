@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -28,8 +29,52 @@ class EnvSettings(BaseSettings):
     cloudinary_api_secret: str
     refresh_exp: str
     cloudinary_folder: str
+    # storage backend used for photos and QR codes
+    storage_backend: Literal["cloudinary", "local"] = "cloudinary"
+    storage_max_workers: int = 8
+    storage_local_root: str = str(Path(__file__).parent / 'media')
+    storage_local_url: str = '/media'
+    max_upload_size: int = 3 * 1024 * 1024
+    batch_upload_max_files: int = 20
+    batch_upload_parallelism: int = 4
+    # process pool for CPU-bound work
+    process_pool_workers: int = 2
+    process_pool_max_queue: int = 64
+    process_pool_timeout: float = 10.0
+    # largest page of photo listings
+    page_size_max: int = 100
+    # most ids of photos fetched with one batch request
+    batch_fetch_max_ids: int = 200
+    # rows fetched from cursor and sent at once by catalog export
+    export_chunk_size: int = 500
+    # list endpoints serialize models they build with one pydantic-core
+    # call instead of validating them against response_model again
+    dump_list_responses: bool = True
+    # widths of photo variants prepared after upload
+    thumbnail_width: int = 300
+    responsive_widths: list[int] = [640, 1024]
+    # outbox of pending remote asset deletions
+    outbox_batch_size: int = 100
+    outbox_poll_interval: float = 5.0
+    outbox_retry_base: float = 2.0
+    outbox_retry_max: float = 600.0
+    # cache of photo details, TTL in seconds, 0 disables cache
+    photo_cache_size: int = 1024
+    photo_cache_ttl: float = 30.0
+    # PostgreSQL text search configuration of photo descriptions,
+    # fixed when search_vector column is created
+    fulltext_config: str = "simple"
+    # trending photos: weights of activity, decay and refresh of scores
+    trending_comment_weight: float = 3.0
+    trending_view_weight: float = 1.0
+    trending_half_life: float = 6 * 3600.0
+    trending_min_score: float = 0.05
+    trending_refresh_interval: float = 60.0
+    trending_batch_size: int = 1000
+    # comments created this many seconds before the latest added one
+    # are scanned again, they could be committed after it
+    trending_comment_grace: float = 300.0
 
 
 # production environment
 settings = EnvSettings()
-
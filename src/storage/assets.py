@@ -0,0 +1,123 @@
+"""Module provides registry of stored assets shared by content hash"""
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from storage.model import StoredAsset
+from storage.orm import StoredAssetORM
+from storage.outbox import enqueue_deletions
+from utils.db_utilities import dialect_insert
+
+
+async def find_assets(db: AsyncSession,
+                      content_hashes: Iterable[str]) -> dict[str, StoredAsset]:
+    """
+    Looks up already stored assets by their content hashes
+
+        Args:
+            db (AsyncSession): The database session.
+            content_hashes (Iterable[str]): hashes to look up
+
+        Returns:
+            dict[str, StoredAsset]: stored assets by content hash,
+                hashes without stored asset are omitted
+    """
+    content_hashes = list(dict.fromkeys(content_hashes))
+    if not content_hashes:
+        return {}
+    stmnt = select(StoredAssetORM).where(
+        StoredAssetORM.content_hash.in_(content_hashes)
+    )
+    return {asset.content_hash: StoredAsset(public_id=asset.public_id,
+                                            url=asset.url)
+            for asset in (await db.execute(stmnt)).scalars()}
+
+
+async def find_asset(db: AsyncSession,
+                     content_hash: str) -> Optional[StoredAsset]:
+    """
+    Looks up already stored asset by its content hash
+
+        Args:
+            db (AsyncSession): The database session.
+            content_hash (str): hash to look up
+
+        Returns:
+            StoredAsset | None: stored asset if there is one
+    """
+    return (await find_assets(db, [content_hash])).get(content_hash)
+
+
+async def register_asset(db: AsyncSession,
+                         content_hash: str,
+                         asset: StoredAsset,
+                         references: int = 1) -> StoredAsset:
+    """
+    Adds references to asset with given content hash. If the same content
+    was registered concurrently with another public id, references are
+    added to that asset and `asset` is scheduled for deletion.
+
+        Args:
+            db (AsyncSession): The database session.
+            content_hash (str): hash of asset content
+            asset (StoredAsset): stored asset
+            references (int): number of new references
+
+        Returns:
+            StoredAsset: registered asset to reference
+    """
+    stmnt = dialect_insert(db, StoredAssetORM).values(
+        content_hash=content_hash,
+        public_id=asset.public_id,
+        url=asset.url,
+        ref_count=references
+    )
+    stmnt = stmnt.on_conflict_do_update(
+        index_elements=[StoredAssetORM.content_hash],
+        set_={"ref_count": StoredAssetORM.ref_count + references}
+    ).returning(StoredAssetORM.public_id, StoredAssetORM.url)
+    registered = (await db.execute(stmnt)).one()
+    if registered.public_id != asset.public_id:
+        enqueue_deletions(db, [asset.public_id])
+    return StoredAsset(public_id=registered.public_id, url=registered.url)
+
+
+async def release_assets(db: AsyncSession,
+                         public_ids: Iterable[Optional[str]]) -> None:
+    """
+    Removes one reference per given public id. Assets left without
+    references, as well as assets that were never registered, are
+    scheduled for deletion in the same transaction.
+
+        Args:
+            db (AsyncSession): The database session.
+            public_ids (Iterable[str | None]): public ids of released
+                assets, empty ones are skipped
+    """
+    references = Counter(public_id for public_id in public_ids if public_id)
+    by_count: dict[int, list[str]] = {}
+    for public_id, count in references.items():
+        by_count.setdefault(count, []).append(public_id)
+
+    counts = {}
+    for count, ids in by_count.items():
+        stmnt = (
+            update(StoredAssetORM)
+            .where(StoredAssetORM.public_id.in_(ids))
+            .values(ref_count=StoredAssetORM.ref_count - count)
+            .returning(StoredAssetORM.public_id, StoredAssetORM.ref_count)
+        )
+        counts.update((await db.execute(stmnt)).tuples().all())
+
+    unused = [public_id for public_id, count in counts.items() if count <= 0]
+    if unused:
+        await db.execute(
+            delete(StoredAssetORM)
+            .where(StoredAssetORM.public_id.in_(unused),
+                   StoredAssetORM.ref_count <= 0)
+        )
+    unregistered = [public_id for public_id in references
+                    if public_id not in counts]
+    enqueue_deletions(db, unused + unregistered)
@@ -0,0 +1,43 @@
+"""Module provides image resizing run on the process pool"""
+import io
+from typing import Optional
+
+try:
+    from PIL import Image, UnidentifiedImageError
+except ImportError:  # pragma: no cover
+    # Pillow is an optional dependency, without it images are not resized
+    Image = None
+
+JPEG_QUALITY = 85
+
+
+def imaging_available() -> bool:
+    return Image is not None
+
+
+def resize_to_width(data: bytes, width: int) -> Optional[bytes]:
+    """
+    Scales image down to given width keeping its aspect ratio
+
+        Args:
+            data (bytes): encoded image
+            width (int): width of resized image in pixels
+
+        Returns:
+            bytes | None: resized image in the format of original,
+                None if image is not wider than width or is not
+                a raster image
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+    except UnidentifiedImageError:
+        return None
+    with image:
+        if image.width <= width:
+            return None
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        options = {"quality": JPEG_QUALITY} if image.format == "JPEG" else {}
+        resized.save(output, format=image.format, **options)
+    return output.getvalue()
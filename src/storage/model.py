@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class StoredAsset(BaseModel):
+    """
+    Model that describes asset stored by a storage backend
+    """
+    public_id: str
+    url: str
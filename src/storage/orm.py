@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+
+class StorageOutboxORM(Base):
+    __tablename__ = "storage_outbox"
+
+    # columns
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # public id of remote asset pending deletion
+    public_id: Mapped[str] = mapped_column(String, nullable=False)
+    attempts: Mapped[int] = mapped_column(default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                      default=func.now(),
+                                                      index=True)
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                 default=func.now())
+
+
+class StoredAssetORM(Base):
+    __tablename__ = "stored_assets"
+
+    # columns
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # sha256 of asset content, or of QR code rendering parameters
+    content_hash: Mapped[str] = mapped_column(String(64), unique=True)
+    public_id: Mapped[str] = mapped_column(String, unique=True)
+    url: Mapped[str] = mapped_column(String, nullable=False)
+    # number of rows referencing the asset
+    ref_count: Mapped[int] = mapped_column(default=0)
@@ -0,0 +1,153 @@
+"""Module provides transactional outbox of remote asset deletions"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import sessionmanager
+from settings import settings
+from storage.orm import StorageOutboxORM, StoredAssetORM
+from storage.service import StorageBackend, storage
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_deletions(db: AsyncSession,
+                      public_ids: Iterable[Optional[str]]) -> None:
+    """
+    Records remote assets to be deleted. Records are added to the
+    session, so they are committed in the same transaction as the
+    removal of rows referencing the assets.
+
+        Args:
+            db (AsyncSession): The database session.
+            public_ids (Iterable[str | None]): public ids of assets,
+                empty ones are skipped
+    """
+    db.add_all(StorageOutboxORM(public_id=public_id)
+               for public_id in dict.fromkeys(public_ids)
+               if public_id)
+
+
+def retry_delay(attempts: int,
+                base: float = settings.outbox_retry_base,
+                maximum: float = settings.outbox_retry_max) -> timedelta:
+    """
+    Exponential backoff of failed deletion
+
+        Args:
+            attempts (int): number of failed attempts
+            base (float): delay after the first failure, seconds
+            maximum (float): upper bound of delay, seconds
+
+        Returns:
+            timedelta: delay before the next attempt
+    """
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), maximum))
+
+
+async def drain_outbox(db: AsyncSession,
+                       backend: StorageBackend = storage,
+                       batch_size: int = settings.outbox_batch_size) -> int:
+    """
+    Deletes one batch of due assets from the storage with a bulk call.
+    Assets registered again since they were scheduled are kept.
+    Processed records are removed from outbox, on failure the whole
+    batch is rescheduled with backoff.
+
+        Args:
+            db (AsyncSession): The database session.
+            backend (StorageBackend): storage to delete assets from
+            batch_size (int): max number of assets deleted at once
+
+        Returns:
+            int: number of processed records
+    """
+    now = datetime.now(timezone.utc)
+    stmnt = (
+        select(StorageOutboxORM)
+        .where(StorageOutboxORM.next_attempt_at <= now)
+        .order_by(StorageOutboxORM.next_attempt_at, StorageOutboxORM.id)
+        .limit(batch_size)
+    )
+    records = (await db.execute(stmnt)).scalars().all()
+    if not records:
+        return 0
+
+    public_ids = list(dict.fromkeys(record.public_id for record in records))
+    # assets referenced again after being scheduled must be kept
+    stmnt = select(StoredAssetORM.public_id).where(
+        StoredAssetORM.public_id.in_(public_ids)
+    )
+    in_use = set((await db.execute(stmnt)).scalars())
+    try:
+        await backend.delete_many([public_id for public_id in public_ids
+                                   if public_id not in in_use])
+    except Exception as e:
+        logger.warning(f"Deletion of {len(records)} assets failed: {e}")
+        for record in records:
+            record.attempts += 1
+            record.last_error = str(e)
+            record.next_attempt_at = now + retry_delay(record.attempts)
+    else:
+        await db.execute(
+            delete(StorageOutboxORM)
+            .where(StorageOutboxORM.id.in_([record.id for record in records]))
+        )
+    await db.commit()
+    return len(records)
+
+
+class OutboxWorker:
+    """
+    Background task that drains outbox while application is running.
+    Full batches are drained back to back, otherwise worker sleeps
+    for poll interval or until it is woken up.
+    """
+
+    def __init__(self,
+                 poll_interval: float = settings.outbox_poll_interval,
+                 batch_size: int = settings.outbox_batch_size):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def wake_up(self) -> None:
+        """Starts draining without waiting for poll interval"""
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with sessionmanager.session() as db:
+                    processed = await drain_outbox(db,
+                                                   batch_size=self.batch_size)
+            except Exception as e:
+                logger.error(f"Storage outbox is not drained: {e}")
+                processed = 0
+            if processed == self.batch_size:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(),
+                                       timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+outbox_worker = OutboxWorker()
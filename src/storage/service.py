@@ -0,0 +1,293 @@
+"""Module provides pluggable non-blocking storage backends for media assets"""
+import asyncio
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional
+from urllib.parse import urlencode
+
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+
+from settings import settings
+from storage.imaging import imaging_available, resize_to_width
+from storage.model import StoredAsset
+from workers.process_pool import process_pool
+
+UploadSource = bytes | BinaryIO | str
+
+
+class StorageBackend(ABC):
+    """
+    Async interface of the storage used for photos and QR codes
+    """
+
+    @abstractmethod
+    async def upload(self,
+                     source: UploadSource,
+                     folder: str | None = None,
+                     public_id: str | None = None,
+                     **options: Any) -> StoredAsset:
+        """
+        Stores asset and returns its public id and delivery url.
+
+        Args:
+            source (bytes | BinaryIO | str): raw content, file object
+                or url of already stored asset
+            folder (str | None): folder to place asset into
+            public_id (str | None): explicit public id of the asset
+            **options: backend specific upload options
+
+        Returns:
+            StoredAsset: public id and url of stored asset
+        """
+
+    @abstractmethod
+    async def delete(self, public_id: str) -> None:
+        """
+        Removes asset from the storage.
+
+        Args:
+            public_id (str): public id of the asset
+        """
+
+    async def delete_many(self, public_ids: list[str]) -> None:
+        """
+        Removes several assets from the storage.
+
+        Args:
+            public_ids (list[str]): public ids of the assets
+        """
+        for public_id in public_ids:
+            await self.delete(public_id)
+
+    @abstractmethod
+    def url_for(self, public_id: str, **transformations: Any) -> str:
+        """
+        Builds delivery url of the asset without any remote call.
+
+        Args:
+            public_id (str): public id of the asset
+            **transformations: backend specific delivery transformations
+
+        Returns:
+            str: delivery url
+        """
+
+    async def derive(self, public_id: str,
+                     **transformations: Any) -> Optional[str]:
+        """
+        Prepares transformed version of the asset. Backends that
+        transform assets on delivery only build the url.
+
+        Args:
+            public_id (str): public id of the original asset
+            **transformations: delivery transformations
+
+        Returns:
+            str | None: url of transformed asset, None if backend
+                can not prepare it
+        """
+        return self.url_for(public_id, **transformations)
+
+    def shutdown(self) -> None:
+        """Releases resources held by backend"""
+
+
+class CloudinaryStorage(StorageBackend):
+    """
+    Cloudinary storage. Blocking SDK calls are executed on a bounded
+    thread pool, so the event loop keeps serving other requests.
+    """
+
+    # Admin API limit of public ids per delete_resources call
+    DELETE_BATCH_SIZE = 100
+
+    def __init__(self, max_workers: int):
+        cloudinary.config(
+            cloud_name=settings.cloudinary_name,
+            api_key=settings.cloudinary_api_key,
+            api_secret=settings.cloudinary_api_secret,
+            secure=True
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="cloudinary")
+
+    async def _run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor,
+                                          partial(func, *args, **kwargs))
+
+    async def upload(self,
+                     source: UploadSource,
+                     folder: str | None = None,
+                     public_id: str | None = None,
+                     **options: Any) -> StoredAsset:
+        if folder is not None:
+            options['folder'] = folder
+        if public_id is not None:
+            options['public_id'] = public_id
+        result = await self._run(cloudinary.uploader.upload, source, **options)
+        return StoredAsset(public_id=result['public_id'],
+                           url=result['secure_url'])
+
+    async def delete(self, public_id: str) -> None:
+        await self._run(cloudinary.uploader.destroy, public_id)
+
+    async def delete_many(self, public_ids: list[str]) -> None:
+        for start in range(0, len(public_ids), self.DELETE_BATCH_SIZE):
+            chunk = public_ids[start:start + self.DELETE_BATCH_SIZE]
+            await self._run(cloudinary.api.delete_resources, chunk)
+
+    def url_for(self, public_id: str, **transformations: Any) -> str:
+        brightness = transformations.pop('brightness', None)
+        if brightness is not None:
+            # brightness is an effect, applied as separate chained component
+            transformations['transformation'] = [
+                {'effect': f'brightness:{brightness}'}
+            ]
+        url, _ = cloudinary.utils.cloudinary_url(public_id,
+                                                 secure=True,
+                                                 **transformations)
+        return url
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class LocalStorage(StorageBackend):
+    """
+    Filesystem storage for tests and single-node installs.
+    Files are served by StaticFiles mounted at `base_url`.
+    Only resizing to width is derived, with Pillow on the process pool,
+    other delivery transformations are kept in the url query string.
+    """
+
+    DERIVED_FOLDER = "_derived"
+
+    SIGNATURES = {
+        b"\xff\xd8\xff": ".jpg",
+        b"\x89PNG\r\n\x1a\n": ".png",
+        b"GIF87a": ".gif",
+        b"GIF89a": ".gif",
+        b"<svg": ".svg",
+        b"<?xml": ".svg",
+    }
+
+    def __init__(self, root: str | Path, base_url: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url.rstrip('/')
+
+    def _path(self, public_id: str) -> Path:
+        path = (self.root / public_id).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Public id {public_id} is outside of storage")
+        return path
+
+    def _guess_extension(self, head: bytes) -> str:
+        for signature, extension in self.SIGNATURES.items():
+            if head.startswith(signature):
+                return extension
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return ".webp"
+        return ""
+
+    def _write(self, source: UploadSource, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(source, bytes):
+            path.write_bytes(source)
+            return
+        with open(path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+
+    def _read_head(self, source: UploadSource) -> bytes:
+        if isinstance(source, bytes):
+            return source[:16]
+        position = source.tell()
+        head = source.read(16)
+        source.seek(position)
+        return head
+
+    async def upload(self,
+                     source: UploadSource,
+                     folder: str | None = None,
+                     public_id: str | None = None,
+                     **options: Any) -> StoredAsset:
+        if isinstance(source, str):
+            # re-upload of already stored asset
+            prefix = self.base_url + '/'
+            if not source.startswith(prefix):
+                raise ValueError(f"Unable to fetch remote asset {source}")
+            stored = self._path(source[len(prefix):].split('?')[0])
+            with open(stored, 'rb') as src:
+                source = src.read()
+
+        if public_id is None:
+            public_id = uuid.uuid4().hex
+        if not Path(public_id).suffix:
+            public_id += self._guess_extension(self._read_head(source))
+        if folder:
+            public_id = f"{folder.strip('/')}/{public_id}"
+
+        await asyncio.to_thread(self._write, source, self._path(public_id))
+        return StoredAsset(public_id=public_id,
+                           url=self.url_for(public_id))
+
+    async def delete(self, public_id: str) -> None:
+        await asyncio.to_thread(self._path(public_id).unlink, missing_ok=True)
+        await asyncio.to_thread(shutil.rmtree,
+                                self._path(self._derived_id(public_id)),
+                                ignore_errors=True)
+
+    def _derived_id(self, public_id: str, width: int | None = None) -> str:
+        derived_id = f"{self.DERIVED_FOLDER}/{public_id}"
+        if width is None:
+            return derived_id
+        return f"{derived_id}/w{width}{Path(public_id).suffix}"
+
+    async def derive(self, public_id: str,
+                     **transformations: Any) -> Optional[str]:
+        width = transformations.get('width')
+        if set(transformations) != {'width'}:
+            return self.url_for(public_id, **transformations)
+        if not imaging_available():
+            # url of the original would claim a width it does not have
+            return None
+
+        derived_id = self._derived_id(public_id, width)
+        if self._path(derived_id).exists():
+            return self.url_for(derived_id)
+        data = await asyncio.to_thread(self._path(public_id).read_bytes)
+        resized = await process_pool.submit(resize_to_width, data, width)
+        if resized is None:
+            # original is already small enough
+            return self.url_for(public_id)
+        await asyncio.to_thread(self._write, resized, self._path(derived_id))
+        return self.url_for(derived_id)
+
+    def url_for(self, public_id: str, **transformations: Any) -> str:
+        url = f"{self.base_url}/{public_id}"
+        if transformations:
+            url += '?' + urlencode(sorted(transformations.items()))
+        return url
+
+
+def get_storage() -> StorageBackend:
+    """
+    Creates storage backend configured in settings
+
+    Returns:
+        StorageBackend: configured storage backend
+    """
+    if settings.storage_backend == "local":
+        return LocalStorage(root=settings.storage_local_root,
+                            base_url=settings.storage_local_url)
+    return CloudinaryStorage(max_workers=settings.storage_max_workers)
+
+
+storage = get_storage()
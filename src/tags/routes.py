@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
 from database import get_db
-from photo.orm import PhotoORM
+from photo.cache import photo_cache
+from photo.orm import photo_tag_association_table
 from tags.model import TagCreate, TagResponseModel, TagModel
 from tags.orm import TagORM
+from tags.service import resolve_tags
 from typing import Annotated, Any, List
 from auth.service import auth as auth_service
 from auth.require_role import require_role
 from userprofile.orm import UserORM
+from utils.etag import make_etag, not_modified
+from versions.service import TAGS, bump_versions, get_versions, touch_photos
 
 router = APIRouter(
     prefix="/tags",
@@ -21,10 +25,16 @@ router = APIRouter(
 
 @router.get("/", response_model=List[TagModel])
 async def read_tags(
+        request: Request,
+        response: Response,
         db: Annotated[AsyncSession, Depends(get_db)],
         skip: int = 0,
         limit: int = 10,
 ) -> Any:
+    etag = make_etag(request, TAGS, *await get_versions(db, TAGS), skip, limit)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    response.headers["ETag"] = etag
     result = await db.execute(select(TagORM).offset(skip).limit(limit))
     tags = result.scalars().all()
     return [TagModel.from_orm(tag) for tag in tags]
@@ -37,24 +47,17 @@ async def create_or_get_tag(
     user: Annotated[UserORM, Depends(auth_service.get_access_user)]
 ) -> Any:
     try:
-        result = await db.execute(
-            select(TagORM)
-            .where(TagORM.tag == tag.tag)
-            .options(selectinload(TagORM.photos)
-                     .load_only(PhotoORM.public_id))
+        tags_map = await resolve_tags([tag.tag], db)
+        db_tag = tags_map[tag.tag]
+        photos_num = await db.scalar(
+            select(func.count())
+            .select_from(photo_tag_association_table)
+            .where(photo_tag_association_table.c.tag_id == db_tag.id)
         )
-
-        existing_tag = result.scalars().first()
-        if existing_tag:
-            ret_tag = TagModel.from_orm(existing_tag)
-            ret_tag.photos_num = len(existing_tag.photos)
-            return ret_tag
-
-        new_tag = TagORM(tag=tag.tag)
-        db.add(new_tag)
+        ret_tag = TagModel.from_orm(db_tag)
+        ret_tag.photos_num = photos_num
         await db.commit()
-        await db.refresh(new_tag)
-        return TagModel.from_orm(new_tag)
+        return ret_tag
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -85,6 +88,7 @@ async def update_tag(
         raise HTTPException(status_code=404, detail="Tag not found")
     
     db_tag.name = new_tag.tag
+    await bump_versions(db, TAGS)
     await db.commit()
     await db.refresh(db_tag)
     return TagModel.from_orm(db_tag)
@@ -103,14 +107,22 @@ async def delete_tag(
     db_resp = await db.execute(select(TagORM).filter(TagORM.tag == tag))
     db_tag = db_resp.scalars().first()
 
-    if tag is None:
+    if db_tag is None:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"message": "Tag not found"}
         )
 
+    # tag is removed from details of all its photos
+    photo_ids = list(await db.scalars(
+        select(photo_tag_association_table.c.photo_id)
+        .where(photo_tag_association_table.c.tag_id == db_tag.id)
+    ))
+    await touch_photos(db, photo_ids)
+    await bump_versions(db, TAGS)
     await db.delete(db_tag)
     await db.commit()
+    photo_cache.invalidate_many(photo_ids)
 
     return JSONResponse(status_code=status.HTTP_204_NO_CONTENT,
                         content={})
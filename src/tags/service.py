@@ -0,0 +1,54 @@
+"""Module provides set-based resolution of tags by their names"""
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tags.orm import TagORM
+from utils.db_utilities import dialect_insert
+from versions.service import TAGS, bump_versions
+
+
+async def resolve_tags(tag_names: Iterable[str],
+                       db: AsyncSession) -> dict[str, TagORM]:
+    """
+    Returns tags by their names, creating missing ones.
+
+    Existing tags are loaded with a single IN query, missing tags are
+    inserted in bulk. Unique conflicts with tags inserted concurrently
+    by other requests are ignored and such tags are loaded afterwards.
+
+        Args:
+            tag_names (Iterable[str]): names of tags
+            db (AsyncSession): The database session.
+
+        Returns:
+            dict[str, TagORM]: tags mapped by their names
+    """
+    names = list(dict.fromkeys(tag_names))
+    if not names:
+        return {}
+
+    result = await db.scalars(select(TagORM).where(TagORM.tag.in_(names)))
+    tags_map = {tag.tag: tag for tag in result}
+    missing = [name for name in names if name not in tags_map]
+    if not missing:
+        return tags_map
+
+    stmnt = (
+        dialect_insert(db, TagORM)
+        .values([{"tag": name} for name in missing])
+        .on_conflict_do_nothing(index_elements=[TagORM.tag])
+        .returning(TagORM)
+    )
+    result = await db.scalars(stmnt)
+    inserted = {tag.tag: tag for tag in result}
+    if inserted:
+        await bump_versions(db, TAGS)
+    tags_map.update(inserted)
+
+    raced = [name for name in missing if name not in tags_map]
+    if raced:
+        result = await db.scalars(select(TagORM).where(TagORM.tag.in_(raced)))
+        tags_map.update({tag.tag: tag for tag in result})
+    return tags_map
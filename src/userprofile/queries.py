@@ -0,0 +1,79 @@
+"""Module provides read model of public profiles: responses built from
+column projections, without loading ORM objects and their relations"""
+from typing import Any, Collection, Optional, Sequence
+
+from sqlalchemy import Row, Select, func, select
+
+from comment.orm import CommentORM
+from photo.orm import PhotoORM
+from userprofile.model import UserPublicProfileModel
+from userprofile.orm import ProfileORM, UserORM
+from utils.model_utilities import get_model_fields
+
+
+def count_of(orm: type, author_fk) -> Any:
+    """Correlated subquery counting rows authored by profile"""
+    return (
+        select(func.count(orm.id))
+        .where(author_fk == ProfileORM.id)
+        .correlate(ProfileORM)
+        .scalar_subquery()
+    )
+
+
+def profile_rows(fields: Optional[Collection[str]] = None) -> Select:
+    """
+    Selects only the columns `UserPublicProfileModel` is built from.
+    Numbers of photos and comments are counted by subqueries, only if
+    they are requested.
+
+        Args:
+            fields (Collection[str] | None): fields of `UserPublicProfileModel`
+                to select, all fields if None; `username` is always selected
+
+        Returns:
+            Select: statement to add filtering and pagination to
+    """
+    if fields is None:
+        fields = get_model_fields(UserPublicProfileModel)
+    columns = [UserORM.username]
+    if "first_name" in fields or "full_name" in fields:
+        columns.append(ProfileORM.first_name)
+    if "last_name" in fields or "full_name" in fields:
+        columns.append(ProfileORM.last_name)
+    if "registered_at" in fields:
+        columns.append(UserORM.registered_at)
+    if "role" in fields:
+        columns.append(UserORM.role)
+    if "photos" in fields:
+        columns.append(count_of(PhotoORM, PhotoORM.author_fk).label("photos"))
+    if "comments" in fields:
+        columns.append(count_of(CommentORM, CommentORM.author_fk)
+                       .label("comments"))
+    return (
+        select(*columns)
+        .select_from(ProfileORM)
+        .join(UserORM, UserORM.id == ProfileORM.user_id)
+    )
+
+
+def public_profile(row: Row,
+                   fields: Optional[Sequence[str]] = None
+                   ) -> UserPublicProfileModel | dict[str, Any]:
+    """
+    Builds response from row selected by `profile_rows`
+
+        Args:
+            row (Row): selected profile row
+            fields (Sequence[str] | None): fields the row was selected with
+
+        Returns:
+            UserPublicProfileModel: public profile, if all fields are selected
+            dict: requested fields of public profile otherwise
+    """
+    data = dict(row._mapping)
+    if fields is None:
+        return UserPublicProfileModel.model_validate(data)
+    if "full_name" in fields:
+        data["full_name"] = UserPublicProfileModel.model_construct(**data).full_name
+    return {field: data[field] for field in fields}
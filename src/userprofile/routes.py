@@ -1,11 +1,12 @@
 from typing import List, Annotated, Any, TypeAlias, Literal
 
-from fastapi import Depends, status, Form
+from fastapi import Depends, Request, Response, status, Form
 from fastapi.routing import APIRouter
 from sqlalchemy import select, update, Column
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import selectinload
+from pydantic import TypeAdapter
 
 from database import get_db
 from auth.service import auth as auth_service
@@ -16,12 +17,29 @@ from userprofile.model import (UserPublicProfileModel,
                                UserEditableProfileModel)
 
 from userprofile.orm import ProfileORM, UserORM, Role
+from userprofile.queries import profile_rows, public_profile
+from photo.cache import photo_cache
+from photo.orm import PhotoORM
+from storage.assets import release_assets
+from storage.outbox import outbox_worker
 
 import utils.model_utilities as model_util
+from utils.etag import make_etag, not_modified
+from utils.fieldsets import Fieldset, fieldset, sparse_response
+from versions.service import (COMMENTS,
+                              PHOTOS,
+                              PROFILES,
+                              bump_versions,
+                              get_versions,
+                              touch_photos)
 
 
 router = APIRouter(prefix="/user", tags=["user profile"])
 
+# `fields` query parameter of public profile read endpoints
+profile_fields = fieldset(UserPublicProfileModel)
+PROFILE_LIST = TypeAdapter(List[UserPublicProfileModel])
+
 
 ProfileEditField: TypeAlias = Literal[
     *model_util.get_model_fields(UserEditableProfileModel)
@@ -46,7 +64,9 @@ def get_orm_by_field(field: ProfileEditField) -> Any:
 @router.get("/profiles",
             response_model=List[UserPublicProfileModel])
 async def get_all_profiles(
+        response: Response,
         db: Annotated[AsyncSession, Depends(get_db)],
+        fields: Annotated[Fieldset, Depends(profile_fields)],
         offset: int = 0,
         limit: int = 10
 ) -> Any:
@@ -54,78 +74,68 @@ async def get_all_profiles(
     Returns list of public profiles
 
         Args:
+            response (Response): response to copy headers from
+            db (AsyncSession): session object used for database operations
+            fields (Fieldset): fields of profiles to return, all if not given
             offset (int): start index for pagination
             limit (in): quantity of profiles to return
-            db (AsyncSession): session object used for database operations
 
         Returns:
             List[UserPublicProfileModel]: list of public profiles
             JSONResponse: error message if no profiles found
     """
-    stmnt = select(ProfileORM).offset(offset).limit(limit).options(
-        selectinload(ProfileORM.user),
-        selectinload(ProfileORM.comments),
-        selectinload(ProfileORM.photos)
-    )
-    res = await db.execute(stmnt)
-    res = res.scalars().all()
+    stmnt = profile_rows(fields).offset(offset).limit(limit)
+    res = (await db.execute(stmnt)).all()
     if len(res) == 0:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"detail": "No profiles found"}
         )
-    return_res = []
-    for profile in res:
-        profile_dump = dict(**profile.__dict__)
-        profile_dump['role'] = profile.user.role
-        profile_dump['photos'] = len(profile.photos)
-        profile_dump['comments'] = len(profile.comments)
-        profile_dump['username'] = profile.user.username
-        profile_dump['email'] = profile.user.email
-        public_profile = UserPublicProfileModel(
-            **profile_dump
-        )
-        return_res.append(public_profile)
-    return return_res
+    return sparse_response([public_profile(row, fields) for row in res],
+                           fields, response, PROFILE_LIST)
 
 
 @router.get("/profile/{username: str}",
             response_model=UserPublicProfileModel)
 async def get_user_profile(
         username: str,
-        db: Annotated[AsyncSession, Depends(get_db)]
+        request: Request,
+        response: Response,
+        db: Annotated[AsyncSession, Depends(get_db)],
+        fields: Annotated[Fieldset, Depends(profile_fields)]
 ) -> Any:
     """
-    Retrieves public profile by username
+    Retrieves public profile by username. Profile includes numbers of
+    photos and comments, so it is revalidated with ETag of profile,
+    photo and comment collection versions.
 
         Args:
             username (int): start index for pagination
+            request (Request): request, checked for `If-None-Match`
+            response (Response): response to set headers to
             db (AsyncSession): session object used for database operations
+            fields (Fieldset): fields of profile to return, all if not given
 
         Returns:
             UserPublicProfileModel: public accessible profile of user
             JSONResponse: error message if no profiles found
     """
-    stmnt = select(ProfileORM)\
-        .join(UserORM).filter(UserORM.username == username)\
-        .options(selectinload(ProfileORM.comments),
-                 selectinload(ProfileORM.photos),
-                 selectinload(ProfileORM.user))
-    res = await db.execute(stmnt)
-    profile = res.scalars().first()
-    if res is None:
+    etag = make_etag(request, username,
+                     *await get_versions(db, PROFILES, PHOTOS, COMMENTS),
+                     fields)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    stmnt = profile_rows(fields).where(UserORM.username == username)
+    profile = (await db.execute(stmnt)).first()
+    if profile is None:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"detail": f"Profile with username {username} not found"}
         )
-    profile_dump = dict(**profile.__dict__)
-    profile_dump['role'] = profile.user.role
-    profile_dump['photos'] = len(profile.photos)
-    profile_dump['comments'] = len(profile.comments)
-    profile_dump['username'] = profile.user.username
-    profile_dump['email'] = profile.user.email
+    response.headers["ETag"] = etag
 
-    return UserPublicProfileModel(**profile_dump)
+    return sparse_response(public_profile(profile, fields), fields, response)
 
 
 @router.get("/profile/me",
@@ -224,6 +234,7 @@ async def create_my_profile(
         )
     profile_orm.user_id = user.id
     db.add(profile_orm)
+    await bump_versions(db, PROFILES)
     await db.commit()
     await db.refresh(profile_orm)
 
@@ -596,8 +607,22 @@ async def delete_profile(
             }
         )
 
+    stmnt = select(PhotoORM.id,
+                   PhotoORM.public_id,
+                   PhotoORM.qrcode_public_id).where(
+        PhotoORM.author_fk == db_profile.id
+    )
+    photos = (await db.execute(stmnt)).all()
+    await release_assets(db, [public_id
+                              for photo in photos
+                              for public_id in (photo.public_id,
+                                                photo.qrcode_public_id)])
     await db.delete(db_profile)
+    await touch_photos(db, [])
+    await bump_versions(db, PROFILES, COMMENTS)
     await db.commit()
+    photo_cache.invalidate_many(photo.id for photo in photos)
+    outbox_worker.wake_up()
 
     return JSONResponse(
         status_code=status.HTTP_204_NO_CONTENT,
@@ -741,6 +766,7 @@ async def grant_role(
         )
 
     db_user.role = role
+    await bump_versions(db, PROFILES)
     await db.commit()
 
     return JSONResponse(
@@ -0,0 +1,20 @@
+"""Module provides utilitary functions for dialect specific statements"""
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(db: AsyncSession, entity: Any) -> Any:
+    """Creates INSERT that supports ON CONFLICT clauses of session dialect
+
+    Args:
+        db (AsyncSession): session statement will be executed with
+        entity (Any): ORM class or table to insert into
+
+    Returns:
+        postgresql or sqlite Insert construct
+    """
+    if db.bind.dialect.name == "postgresql":
+        return postgresql.insert(entity)
+    return sqlite.insert(entity)
@@ -0,0 +1,60 @@
+"""Module provides strong ETags and conditional GET of versioned resources"""
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(request: Request, *parts: Any) -> str:
+    """
+    Builds strong ETag of resource representation. HTML pages depend
+    on the authenticated user, so their ETags include the credentials.
+
+        Args:
+            request (Request): request of the resource
+            *parts: versions and parameters that identify representation
+
+        Returns:
+            str: quoted ETag
+    """
+    if getattr(request.state, "response_type", "api") == "html":
+        parts = ("html", request.headers.get("authorization", "")) + parts
+    raw = json.dumps(parts, separators=(',', ':'), default=str)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks If-None-Match header against ETag with weak comparison
+
+        Args:
+            if_none_match (str | None): value of If-None-Match header
+            etag (str): current ETag of resource
+
+        Returns:
+            bool: True if client has current representation
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag
+               for candidate in if_none_match.split(","))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Returns 304 response if client has current representation
+
+        Args:
+            request (Request): conditional request
+            etag (str): current ETag of resource
+
+        Returns:
+            Response | None: 304 response, None if resource must be sent
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                        headers={"ETag": etag})
+    return None
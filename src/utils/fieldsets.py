@@ -0,0 +1,95 @@
+"""Module provides sparse fieldsets: `fields` query parameter selecting
+fields of response model to return"""
+import json
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from utils.model_utilities import get_model_fields
+from utils.responses import dumped_response
+
+Fieldset = Optional[tuple[str, ...]]
+
+
+def fieldset(model: type[BaseModel]) -> Callable:
+    """
+    Creates dependency parsing comma separated `fields` query parameter
+
+        Args:
+            model (type[BaseModel]): response model fields are selected from
+
+        Returns:
+            Callable: dependency returning names of requested fields in
+                order of model fields, None if all fields are requested
+    """
+    model_fields = get_model_fields(model)
+
+    async def fields_dependency(
+            request: Request,
+            fields: Optional[str] = Query(
+                None,
+                description="Comma separated fields to return: "
+                            + ", ".join(model_fields)
+            )
+    ) -> Fieldset:
+        # html templates are rendered from full responses
+        if (fields is None
+                or getattr(request.state, "response_type", None) == "html"):
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(model_fields)
+        if not requested or unknown:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail={"msg": "Invalid fields",
+                                        "unknown": sorted(unknown)})
+        return tuple(name for name in model_fields if name in requested)
+
+    return fields_dependency
+
+
+def sparse_response(content: Any,
+                    fields: Fieldset,
+                    response: Response,
+                    adapter: Optional[TypeAdapter] = None) -> Any:
+    """
+    Returns content trimmed to requested fields as is, so it is not
+    validated by full response model
+
+        Args:
+            content (Any): content returned by endpoint
+            fields (Fieldset): requested fields, see `fieldset`
+            response (Response): response headers are copied from
+            adapter (TypeAdapter | None): adapter of response model to
+                serialize full content with, see `dumped_response`
+
+        Returns:
+            Any: content or its `dumped_response` if all fields are
+                requested, JSONResponse otherwise
+    """
+    if fields is None:
+        if adapter is not None:
+            return dumped_response(content, adapter, response)
+        return content
+    return JSONResponse(content=jsonable_encoder(content),
+                        headers=dict(response.headers))
+
+
+def sparse_payload(payload: bytes, fields: Fieldset) -> bytes:
+    """
+    Trims serialized JSON object to requested fields
+
+        Args:
+            payload (bytes): serialized JSON object
+            fields (Fieldset): requested fields, see `fieldset`
+
+        Returns:
+            bytes: serialized object with requested fields only
+    """
+    if fields is None:
+        return payload
+    data = json.loads(payload)
+    return json.dumps({name: data[name] for name in fields},
+                      separators=(",", ":")).encode()
@@ -0,0 +1,179 @@
+"""Module provides keyset pagination with opaque cursors"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import ColumnElement, Select, and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(**position: Any) -> str:
+    """
+    Encodes position of the last seen row as opaque cursor
+
+        Args:
+            **position: values of ordering columns of the last seen row
+
+        Returns:
+            str: url safe cursor
+    """
+    raw = json.dumps(position, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, *keys: str) -> dict[str, Any]:
+    """
+    Decodes cursor created by `encode_cursor`
+
+        Args:
+            cursor (str): cursor received from client
+            *keys: names of values cursor must contain
+
+        Returns:
+            dict: position of the last seen row
+
+        Raises:
+            HTTPException: 400 if cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(position, dict) or any(key not in position
+                                                 for key in keys):
+            raise ValueError
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail={"msg": "Invalid cursor"})
+    return position
+
+
+def keyset_page(stmnt: Select,
+                key: ColumnElement[int],
+                limit: int,
+                offset: int = 0,
+                cursor: Optional[str] = None) -> Select:
+    """
+    Applies descending keyset pagination by integer key to statement.
+    One extra row is selected to find out if there is a next page.
+
+        Args:
+            stmnt (Select): statement to paginate
+            key (ColumnElement[int]): unique column to order by
+            limit (int): page size
+            offset (int): rows to skip, kept for backward compatibility
+            cursor (str | None): cursor of the previous page
+
+        Returns:
+            Select: paginated statement
+    """
+    if cursor is not None:
+        last_id = decode_cursor(cursor, "id")["id"]
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail={"msg": "Invalid cursor"})
+        stmnt = stmnt.where(key < last_id)
+    return stmnt.order_by(key.desc()).offset(offset).limit(limit + 1)
+
+
+def ranked_page(stmnt: Select,
+                score: ColumnElement[float],
+                key: ColumnElement[int],
+                limit: int,
+                cursor: Optional[str] = None) -> Select:
+    """
+    Applies keyset pagination by ascending score, ties are ordered by
+    descending integer key. One extra row is selected to find out if
+    there is a next page.
+
+        Args:
+            stmnt (Select): statement to paginate
+            score (ColumnElement[float]): score to order by, lower is first
+            key (ColumnElement[int]): unique column to break ties
+            limit (int): page size
+            cursor (str | None): cursor of the previous page
+
+        Returns:
+            Select: paginated statement
+    """
+    if cursor is not None:
+        position = decode_cursor(cursor, "score", "id")
+        if (not isinstance(position["score"], (int, float))
+                or not isinstance(position["id"], int)):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail={"msg": "Invalid cursor"})
+        stmnt = stmnt.where(or_(
+            score > position["score"],
+            and_(score == position["score"], key < position["id"])
+        ))
+    return stmnt.order_by(score, key.desc()).limit(limit + 1)
+
+
+def chronological_page(stmnt: Select,
+                       created_at: ColumnElement[datetime],
+                       key: ColumnElement[int],
+                       limit: int,
+                       offset: int = 0,
+                       cursor: Optional[str] = None) -> Select:
+    """
+    Applies keyset pagination by ascending creation time, ties are
+    ordered by ascending integer key. One extra row is selected to find
+    out if there is a next page.
+
+        Args:
+            stmnt (Select): statement to paginate
+            created_at (ColumnElement[datetime]): creation time to order by
+            key (ColumnElement[int]): unique column to break ties
+            limit (int): page size
+            offset (int): rows to skip, kept for backward compatibility
+            cursor (str | None): cursor of the previous page
+
+        Returns:
+            Select: paginated statement
+    """
+    if cursor is not None:
+        position = decode_cursor(cursor, "created_at", "id")
+        try:
+            last_created_at = datetime.fromisoformat(position["created_at"])
+            if not isinstance(position["id"], int):
+                raise ValueError
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail={"msg": "Invalid cursor"})
+        stmnt = stmnt.where(or_(
+            created_at > last_created_at,
+            and_(created_at == last_created_at, key > position["id"])
+        ))
+    return stmnt.order_by(created_at, key).offset(offset).limit(limit + 1)
+
+
+def split_page(rows: Sequence,
+               limit: int,
+               response: Response,
+               key: Callable[[Any], int | dict[str, Any]]) -> Sequence:
+    """
+    Cuts the extra row selected by `keyset_page`, `ranked_page` or
+    `chronological_page` and sets cursor of the next page to response
+    header, if there is a next page
+
+        Args:
+            rows (Sequence): rows selected by paginated statement
+            limit (int): page size
+            response (Response): response to set header to
+            key (Callable): returns key of a row, or position of a row
+                for cursors of several values
+
+        Returns:
+            Sequence: rows of the page
+    """
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    position = key(rows[-1])
+    if not isinstance(position, dict):
+        position = {"id": position}
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(**position)
+    return rows
@@ -0,0 +1,41 @@
+"""Module provides fast JSON responses rendered by pydantic-core"""
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from settings import settings
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core instead of stdlib `json`
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def dumped_response(content: Any,
+                    adapter: TypeAdapter,
+                    response: Response) -> Any:
+    """
+    Serializes models built by endpoint with one pydantic-core call,
+    so they are not validated and encoded again by `response_model`
+
+        Args:
+            content (Any): models returned by endpoint
+            adapter (TypeAdapter): adapter of endpoint response model
+            response (Response): response headers are copied from
+
+        Returns:
+            Any: Response with serialized content if `dump_list_responses`
+                is set, content as is otherwise
+    """
+    if not settings.dump_list_responses:
+        return content
+    return Response(content=adapter.dump_json(content),
+                    media_type="application/json",
+                    headers=dict(response.headers))
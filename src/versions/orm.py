@@ -0,0 +1,13 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+
+class ResourceVersionORM(Base):
+    __tablename__ = "resource_versions"
+    # columns
+    # name of resource collection, e.g. "photos"
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # incremented by every change of the collection
+    version: Mapped[int] = mapped_column(default=1)
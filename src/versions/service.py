@@ -0,0 +1,73 @@
+"""Module provides version counters of resource collections"""
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from photo.orm import PhotoORM
+from utils.db_utilities import dialect_insert
+from versions.orm import ResourceVersionORM
+
+# names of versioned collections
+PHOTOS = "photos"
+COMMENTS = "comments"
+TAGS = "tags"
+PROFILES = "profiles"
+
+
+async def bump_versions(db: AsyncSession, *names: str) -> None:
+    """
+    Increments versions of changed collections in the current transaction
+
+        Args:
+            db (AsyncSession): The database session.
+            *names: names of changed collections
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return
+    stmnt = dialect_insert(db, ResourceVersionORM).values(
+        [{"name": name, "version": 1} for name in names]
+    )
+    stmnt = stmnt.on_conflict_do_update(
+        index_elements=[ResourceVersionORM.name],
+        set_={"version": ResourceVersionORM.version + 1}
+    )
+    await db.execute(stmnt)
+
+
+async def get_versions(db: AsyncSession, *names: str) -> tuple[int, ...]:
+    """
+    Selects current versions of collections
+
+        Args:
+            db (AsyncSession): The database session.
+            *names: names of collections
+
+        Returns:
+            tuple[int, ...]: versions in order of names,
+                0 for collections that never changed
+    """
+    stmnt = select(ResourceVersionORM.name, ResourceVersionORM.version).where(
+        ResourceVersionORM.name.in_(names)
+    )
+    versions = dict((await db.execute(stmnt)).tuples().all())
+    return tuple(versions.get(name, 0) for name in names)
+
+
+async def touch_photos(db: AsyncSession, photo_ids: list[int]) -> None:
+    """
+    Increments versions of changed photos and of photo collection
+    in the current transaction
+
+        Args:
+            db (AsyncSession): The database session.
+            photo_ids (list[int]): ids of changed photos, may be empty
+                if photos were only added or removed
+    """
+    if photo_ids:
+        await db.execute(
+            update(PhotoORM)
+            .where(PhotoORM.id.in_(photo_ids))
+            .values(version=PhotoORM.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    await bump_versions(db, PHOTOS)
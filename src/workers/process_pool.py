@@ -0,0 +1,156 @@
+"""Module provides shared process pool for CPU-bound work like image rendering"""
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+from settings import settings
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the queue of process pool is full"""
+
+
+class PoolMetrics(BaseModel):
+    """
+    Model that holds snapshot of process pool metrics
+    """
+    workers: int
+    in_flight: int
+    queue_depth: int
+    submitted: int
+    completed: int
+    failed: int
+    timeouts: int
+    rejected: int
+    latency_p50_ms: float
+    latency_p99_ms: float
+
+
+def percentile(values: list[float], rank: float) -> float:
+    """Returns value of sorted values at rank between 0 and 1"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(rank * (len(values) - 1))))
+    return values[index]
+
+
+class ProcessPoolService:
+    """
+    Runs CPU-bound callables in worker processes and awaits their
+    results, so rendering does not block the event loop.
+
+    Number of jobs waiting for a free worker is limited by `max_queue`,
+    jobs over the limit are rejected with PoolSaturatedError. Jobs
+    that exceed timeout are reported as timed out to the caller, while
+    worker finishes them in background.
+    """
+
+    def __init__(self,
+                 max_workers: int,
+                 max_queue: int,
+                 timeout: float,
+                 latency_window: int = 1000):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+        self._counters = dict.fromkeys(
+            ("submitted", "completed", "failed", "timeouts", "rejected"), 0
+        )
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    async def submit(self,
+                     func: Callable,
+                     *args: Any,
+                     timeout: float | None = None) -> Any:
+        """
+        Runs func(*args) in a worker process
+
+            Args:
+                func (Callable): picklable module level function
+                *args: picklable arguments of func
+                timeout (float | None): seconds to wait for result,
+                    pool default is used if None
+
+            Returns:
+                Any: result of func
+
+            Raises:
+                PoolSaturatedError: if queue of pool is full
+                TimeoutError: if result is not ready in time
+        """
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._counters["rejected"] += 1
+            raise PoolSaturatedError("Process pool queue is full")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, partial(func, *args))
+        self._in_flight += 1
+        # slot is freed when worker finishes the job, not when caller
+        # stops waiting for it
+        future.add_done_callback(self._release)
+        self._counters["submitted"] += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future),
+                                            timeout=timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            raise
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        self._counters["completed"] += 1
+        self._latencies.append((time.perf_counter() - started) * 1000)
+        return result
+
+    def _release(self, future: asyncio.Future) -> None:
+        self._in_flight -= 1
+        # result of job that timed out is not retrieved by anyone
+        if not future.cancelled():
+            future.exception()
+
+    def metrics(self) -> PoolMetrics:
+        """
+        Returns snapshot of pool metrics
+
+            Returns:
+                PoolMetrics: queue depth, counters and latency percentiles
+        """
+        latencies = sorted(self._latencies)
+        return PoolMetrics(workers=self.max_workers,
+                           in_flight=self._in_flight,
+                           queue_depth=self.queue_depth,
+                           latency_p50_ms=percentile(latencies, 0.5),
+                           latency_p99_ms=percentile(latencies, 0.99),
+                           **self._counters)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+process_pool = ProcessPoolService(max_workers=settings.process_pool_workers,
+                                  max_queue=settings.process_pool_max_queue,
+                                  timeout=settings.process_pool_timeout)
@@ -0,0 +1,43 @@
+import pytest
+import pytest_asyncio
+
+from comment.orm import CommentORM
+from comment.service import change_comments_count, repair_comment_counts
+from photo.orm import PhotoORM
+
+
+@pytest_asyncio.fixture
+async def db(async_db, profile):
+    """
+    Seeds async session with one photo.
+
+    Returns:
+        AsyncSession: session for tests
+    """
+    async_db.add(PhotoORM(id=1, description="photo", url="/a.png",
+                          public_id="a.png", author_fk=profile.id))
+    await async_db.commit()
+    return async_db
+
+
+@pytest.mark.asyncio
+async def test_change_comments_count(db):
+    await change_comments_count(1, 1, db)
+    await change_comments_count(1, 1, db)
+    await change_comments_count(1, -1, db)
+    await db.commit()
+
+    photo = await db.get(PhotoORM, 1, populate_existing=True)
+    assert photo.comments_count == 1
+
+
+@pytest.mark.asyncio
+async def test_repair_comment_counts(db):
+    db.add_all(CommentORM(text=f"comment {index}", author_fk=1, photo_fk=1)
+               for index in range(3))
+    await db.commit()
+
+    assert await repair_comment_counts(db) == 1
+    assert await repair_comment_counts(db) == 0
+    photo = await db.get(PhotoORM, 1, populate_existing=True)
+    assert photo.comments_count == 3
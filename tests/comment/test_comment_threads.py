@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from fastapi import Response
+from sqlalchemy import select
+
+from comment.orm import CommentORM
+from photo.orm import PhotoORM
+from utils.pagination import NEXT_CURSOR_HEADER, chronological_page, split_page
+
+CREATED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def db(async_db, profile):
+    """
+    Seeds async session with one photo and comments created at the
+    same moment.
+
+    Returns:
+        AsyncSession: session for tests
+    """
+    async_db.add(PhotoORM(id=1, description="photo", url="/a.png",
+                          public_id="a.png", author_fk=profile.id))
+    async_db.add_all(CommentORM(text=f"comment {index}", author_fk=profile.id,
+                                photo_fk=1, created_at=CREATED_AT)
+                     for index in range(5))
+    async_db.add(CommentORM(text="latest", author_fk=profile.id, photo_fk=1))
+    await async_db.commit()
+    return async_db
+
+
+@pytest.mark.asyncio
+async def test_comment_thread_pages(db):
+    stmnt = select(CommentORM.id, CommentORM.created_at, CommentORM.text)\
+        .where(CommentORM.photo_fk == 1)
+    texts, cursor = [], None
+    while True:
+        response = Response()
+        page = chronological_page(stmnt, CommentORM.created_at, CommentORM.id,
+                                  2, cursor=cursor)
+        rows = split_page((await db.execute(page)).all(), 2, response,
+                          key=lambda row: {"created_at": row.created_at,
+                                           "id": row.id})
+        texts.extend(row.text for row in rows)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert texts == [f"comment {index}" for index in range(5)] + ["latest"]
@@ -1,15 +1,19 @@
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock
 
+import httpx
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 
 from sqlalchemy import create_engine, StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from main import app
 
 from database import Base, get_db
+from userprofile.orm import ProfileORM, UserORM
 from auth.service import auth as auth_service
 import logging
 
@@ -41,6 +45,65 @@ def session():
         db.close()
 
 
+@pytest_asyncio.fixture
+async def async_db(tmp_path):
+    """
+    Creates async session bound to a temporary sqlite database
+    with all tables. Modules seed it with their own fixtures.
+
+    Returns:
+        AsyncSession: session for tests
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.sqlite")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def profile(async_db):
+    """
+    Adds user `a` with profile to async session.
+
+    Returns:
+        ProfileORM: profile of the user
+    """
+    user = UserORM(email="a@example.com", username="a", password="-")
+    async_db.add(user)
+    await async_db.flush()
+    profile = ProfileORM(first_name="a", user_id=user.id)
+    async_db.add(profile)
+    await async_db.flush()
+    return profile
+
+
+@pytest_asyncio.fixture
+async def async_client(async_db, profile):
+    """
+    Creates client of the app using async session, requests are
+    authenticated as user `a`.
+
+    Returns:
+        httpx.AsyncClient: client for tests
+    """
+    user = await async_db.get(UserORM, profile.user_id)
+    await async_db.commit()
+
+    async def override_get_db():
+        yield async_db
+
+    overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[auth_service.get_access_user] = lambda: user
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport,
+                                 base_url="http://test") as client:
+        yield client
+    app.dependency_overrides = overrides
+
+
 @pytest.fixture(scope='module')
 def client(session):
     # Dependency override
@@ -0,0 +1,32 @@
+import re
+
+import pytest
+
+from photo.orm import PhotoORM
+from tags.orm import TagORM
+
+BROWSER = {"user-agent": "Mozilla/5.0"}
+
+
+@pytest.mark.asyncio
+async def test_photos_by_tag_page_links_next_page(async_client, async_db,
+                                                  profile):
+    tag = TagORM(tag="sea")
+    async_db.add_all(PhotoORM(description=f"photo {index}", url=f"/{index}.png",
+                              public_id=f"{index}.png", author_fk=profile.id,
+                              tags=[tag])
+                     for index in range(2))
+    await async_db.commit()
+
+    response = await async_client.get("/photos/tag/sea", params={"limit": 1},
+                                      headers=BROWSER)
+    assert response.status_code == 200
+    assert "photo 1" in response.text
+    next_url = re.search(r'href="([^"]+)"[^>]*>Next photos', response.text)
+    assert next_url is not None
+    assert "cursor=" in next_url.group(1)
+
+    response = await async_client.get(next_url.group(1).replace("&amp;", "&"),
+                                      headers=BROWSER)
+    assert "photo 0" in response.text
+    assert "Next photos" not in response.text
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import select
+
+from storage.assets import find_asset, register_asset, release_assets
+from storage.model import StoredAsset
+from storage.orm import StorageOutboxORM
+
+
+async def outbox(async_db):
+    stmnt = select(StorageOutboxORM.public_id)
+    return sorted((await async_db.execute(stmnt)).scalars())
+
+
+@pytest.mark.asyncio
+async def test_register_asset_counts_references(async_db):
+    asset = StoredAsset(public_id="photos/a.png", url="/media/photos/a.png")
+
+    await register_asset(async_db, "hash-a", asset)
+    await register_asset(async_db, "hash-a", asset, references=2)
+    await release_assets(async_db, ["photos/a.png", "photos/a.png"])
+    await async_db.flush()
+
+    assert await find_asset(async_db, "hash-a") == asset
+    assert await outbox(async_db) == []
+
+    await release_assets(async_db, ["photos/a.png"])
+    await async_db.flush()
+
+    assert await find_asset(async_db, "hash-a") is None
+    assert await outbox(async_db) == ["photos/a.png"]
+
+
+@pytest.mark.asyncio
+async def test_register_asset_keeps_first_upload(async_db):
+    first = StoredAsset(public_id="photos/a.png", url="/media/photos/a.png")
+    second = StoredAsset(public_id="photos/b.png", url="/media/photos/b.png")
+
+    await register_asset(async_db, "hash-a", first)
+    registered = await register_asset(async_db, "hash-a", second)
+    await async_db.flush()
+
+    assert registered == first
+    assert await outbox(async_db) == ["photos/b.png"]
+
+
+@pytest.mark.asyncio
+async def test_release_unregistered_asset(async_db):
+    await release_assets(async_db, ["photos/legacy.png", None])
+    await async_db.flush()
+
+    assert await outbox(async_db) == ["photos/legacy.png"]
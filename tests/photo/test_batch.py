@@ -0,0 +1,146 @@
+from functools import partial
+from itertools import count
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+import photo.routes as routes
+from photo.ingest import ingest_upload
+from photo.orm import PhotoORM
+from settings import settings
+from storage.model import StoredAsset
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """
+    Replaces storage backend with mocks, every upload is stored as a new
+    asset. Background tasks of photo routes are not run.
+
+    Returns:
+        storage backend with mocked `upload` and `delete`
+    """
+    ids = count(1)
+
+    async def upload(file, folder):
+        public_id = f"{folder}/{next(ids)}"
+        return StoredAsset(public_id=public_id, url=f"/media/{public_id}")
+
+    monkeypatch.setattr(routes.storage, "upload", AsyncMock(side_effect=upload))
+    monkeypatch.setattr(routes.storage, "delete", AsyncMock())
+    monkeypatch.setattr(routes, "pregenerate_photo_qr", AsyncMock())
+    monkeypatch.setattr(routes, "pregenerate_photo_variants", AsyncMock())
+    return routes.storage
+
+
+def batch(*contents: bytes) -> dict:
+    files = [("files", (f"{index}.png", content, "image/png"))
+             for index, content in enumerate(contents)]
+    descriptions = [f"photo {index}" for index in range(len(contents))]
+    return {"files": files, "data": {"descriptions": descriptions}}
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_oversized_file(async_client, storage,
+                                            monkeypatch):
+    monkeypatch.setattr(routes, "ingest_upload",
+                        partial(ingest_upload, max_size=100))
+
+    response = await async_client.post(
+        "/photos/add/batch", **batch(b"small", b"x" * 101, b"other")
+    )
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[1]["photo"] is None
+    assert "exceeds the limit" in results[1]["error"]
+    for index in (0, 2):
+        assert results[index]["error"] is None
+        assert results[index]["photo"]["description"] == f"photo {index}"
+    assert storage.upload.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_uploads_same_content_once(async_client, async_db,
+                                               storage):
+    response = await async_client.post("/photos/add/batch",
+                                       **batch(b"same", b"same"))
+
+    assert response.status_code == 200
+    photos = [result["photo"] for result in response.json()]
+    assert storage.upload.await_count == 1
+    assert photos[0]["id"] != photos[1]["id"]
+    assert photos[0]["public_id"] == photos[1]["public_id"]
+    stored = await async_db.scalars(select(PhotoORM.public_id))
+    assert stored.all() == [photos[0]["public_id"]] * 2
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_descriptions_mismatch(async_client, storage):
+    request = batch(b"one", b"two")
+    request["data"]["descriptions"].pop()
+
+    response = await async_client.post("/photos/add/batch", **request)
+
+    assert response.status_code == 422
+    storage.upload.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_deletes_uploads_on_db_failure(async_client, async_db,
+                                                   storage, monkeypatch):
+    monkeypatch.setattr(routes, "touch_photos",
+                        AsyncMock(side_effect=RuntimeError("db is down")))
+
+    response = await async_client.post("/photos/add/batch",
+                                       **batch(b"one", b"two"))
+
+    assert response.status_code == 400
+    deleted = {call.args[0] for call in storage.delete.await_args_list}
+    folder = settings.cloudinary_folder
+    assert deleted == {f"{folder}/1", f"{folder}/2"}
+    assert (await async_db.scalars(select(PhotoORM.id))).all() == []
+
+
+@pytest_asyncio.fixture
+async def photo_ids(async_client, async_db, profile):
+    """
+    Adds three photos of user `a`.
+
+    Returns:
+        list[int]: ids of photos
+    """
+    photos = [PhotoORM(description=f"photo {index}", url=f"/{index}.png",
+                       public_id=f"{index}.png", author_fk=profile.id)
+              for index in range(3)]
+    async_db.add_all(photos)
+    await async_db.commit()
+    return [photo.id for photo in photos]
+
+
+@pytest.mark.asyncio
+async def test_get_batch_keeps_order_of_ids(async_client, photo_ids):
+    first, second, third = photo_ids
+    response = await async_client.get(
+        "/photos/batch", params={"ids": [third, 404, first, third, 405, 404]}
+    )
+
+    assert response.status_code == 200
+    batch = response.json()
+    assert [photo["id"] for photo in batch["photos"]] == [third, first]
+    assert batch["photos"][0]["description"] == "photo 2"
+    assert batch["missing"] == [404, 405]
+
+
+@pytest.mark.asyncio
+async def test_get_batch_limits_number_of_ids(async_client, photo_ids):
+    ids = list(range(1, settings.batch_fetch_max_ids + 2))
+    response = await async_client.get("/photos/batch", params={"ids": ids})
+    assert response.status_code == 422
+
+    response = await async_client.get("/photos/batch",
+                                      params={"ids": ids[:-1]})
+    assert response.status_code == 200
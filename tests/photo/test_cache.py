@@ -0,0 +1,185 @@
+import pytest
+import pytest_asyncio
+
+import photo.routes as routes
+from photo.cache import PayloadCache, photo_cache
+from photo.orm import PhotoORM
+from userprofile.orm import ProfileORM, UserORM
+
+
+def test_lru_eviction():
+    cache = PayloadCache(max_size=2, ttl=60)
+    cache.put(1, b"1")
+    cache.put(2, b"2")
+    assert cache.get(1) == b"1"
+    cache.put(3, b"3")
+    assert cache.get(2) is None
+    assert cache.get(1) == b"1"
+    metrics = cache.metrics()
+    assert (metrics.size, metrics.hits, metrics.misses, metrics.evicted) == (2, 2, 1, 1)
+
+
+def test_ttl_expiration(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("photo.cache.time.monotonic", lambda: now[0])
+    cache = PayloadCache(max_size=2, ttl=10)
+    cache.put(1, b"1")
+    now[0] += 11
+    assert cache.get(1) is None
+    assert cache.metrics().expired == 1
+
+
+def test_invalidate():
+    cache = PayloadCache(max_size=2, ttl=60)
+    cache.put(1, b"1")
+    cache.invalidate(1, 2)
+    assert cache.get(1) is None
+    assert cache.metrics().invalidated == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_load():
+    cache = PayloadCache(max_size=2, ttl=60)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return b"payload"
+
+    assert await cache.get_or_load(1, load) == b"payload"
+    assert await cache.get_or_load(1, load) == b"payload"
+    assert len(calls) == 1
+    assert cache.metrics().hit_ratio == 0.5
+
+
+@pytest.mark.asyncio
+async def test_load_raced_by_invalidation_is_not_cached():
+    cache = PayloadCache(max_size=2, ttl=60)
+
+    async def load():
+        cache.invalidate(1)
+        return b"stale"
+
+    assert await cache.get_or_load(1, load) == b"stale"
+    assert cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_missing_is_not_cached():
+    cache = PayloadCache(max_size=2, ttl=60)
+
+    async def load():
+        return None
+
+    assert await cache.get_or_load(1, load) is None
+    assert cache.metrics().size == 0
+
+
+def test_other_version_is_not_served():
+    cache = PayloadCache(max_size=2, ttl=60)
+    cache.put(1, b"v1", version=1)
+    assert cache.get(1, version=2) is None
+    assert cache.get(1, version=1) is None
+    cache.put(1, b"v2", version=2)
+    assert cache.get(1, version=2) == b"v2"
+
+
+@pytest_asyncio.fixture
+async def photo(async_client, async_db, profile):
+    """
+    Adds photo of user `a` and empties cache of photo details.
+
+    Returns:
+        PhotoORM: photo of user `a`
+    """
+    photo_cache.clear()
+    photo = PhotoORM(description="before", url="/a.png", public_id="a.png",
+                     author_fk=profile.id)
+    async_db.add(photo)
+    await async_db.commit()
+    return photo
+
+
+async def cached_details(client, photo_id: int) -> dict:
+    """Reads photo details twice, the second read is served by cache"""
+    await client.get(f"/photos/detail/{photo_id}")
+    hits = photo_cache.metrics().hits
+    response = await client.get(f"/photos/detail/{photo_id}")
+    assert photo_cache.metrics().hits == hits + 1
+    return response.json()
+
+
+def invalidations() -> int:
+    return photo_cache.metrics().invalidated
+
+
+async def fresh_details(client, photo_id: int, invalidated: int) -> dict:
+    """Reads photo details after a write invalidated them"""
+    assert invalidations() == invalidated + 1
+    response = await client.get(f"/photos/detail/{photo_id}")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_update_photo_invalidates_details(async_client, photo):
+    assert (await cached_details(async_client, photo.id))["description"] == "before"
+    invalidated = invalidations()
+
+    response = await async_client.put(f"/photos/{photo.id}",
+                                      data={"description": "after"})
+    assert response.status_code == 200
+
+    details = await fresh_details(async_client, photo.id, invalidated)
+    assert details["description"] == "after"
+
+
+@pytest.mark.asyncio
+async def test_add_tags_invalidates_details(async_client, async_db, profile,
+                                            photo):
+    assert (await cached_details(async_client, photo.id))["tags"] == []
+    invalidated = invalidations()
+
+    # POST /photos/{tags} is matched by transform_photo route first
+    user = await async_db.get(UserORM, profile.user_id)
+    await routes.add_tags_to_photo(db=async_db, user=user,
+                                   photo_id=photo.id, tag_names=["sea"])
+
+    details = await fresh_details(async_client, photo.id, invalidated)
+    assert details["tags"] == ["sea"]
+
+
+@pytest.mark.asyncio
+async def test_add_comment_invalidates_details(async_client, async_db,
+                                               photo):
+    # author of photo can not comment it, user `a` comments photo of `b`
+    author = UserORM(email="b@example.com", username="b", password="-")
+    async_db.add(author)
+    await async_db.flush()
+    profile = ProfileORM(first_name="b", user_id=author.id)
+    async_db.add(profile)
+    await async_db.flush()
+    photo.author_fk = profile.id
+    await async_db.commit()
+    assert (await cached_details(async_client, photo.id))["comments_num"] == 0
+    invalidated = invalidations()
+
+    response = await async_client.post(f"/comments/add/{photo.id}",
+                                       data={"text": "nice"})
+    assert response.status_code == 200
+
+    details = await fresh_details(async_client, photo.id, invalidated)
+    assert details["comments_num"] == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_photo_invalidates_details(async_client, photo):
+    await cached_details(async_client, photo.id)
+    invalidated = invalidations()
+
+    response = await async_client.delete(f"/photos/{photo.id}")
+    assert response.status_code == 204
+
+    assert invalidations() == invalidated + 1
+    response = await async_client.get(f"/photos/detail/{photo.id}")
+    assert response.status_code == 404
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+import pytest_asyncio
+
+from photo.export import export_ndjson, export_rows
+from photo.orm import PhotoORM
+from userprofile.orm import ProfileORM, UserORM
+
+
+@pytest_asyncio.fixture
+async def db(async_db):
+    """
+    Seeds async session with photos of two authors.
+
+    Returns:
+        AsyncSession: session for tests
+    """
+    for name in ("a", "b"):
+        user = UserORM(email=f"{name}@example.com", username=name,
+                       password="-")
+        async_db.add(user)
+        await async_db.flush()
+        profile = ProfileORM(first_name=name, user_id=user.id)
+        async_db.add(profile)
+        await async_db.flush()
+        async_db.add_all(PhotoORM(description=f"{name} {index}",
+                                  url=f"/{name}{index}.png",
+                                  public_id=f"{name}{index}.png",
+                                  author_fk=profile.id)
+                         for index in range(3))
+    await async_db.commit()
+    return async_db
+
+
+async def exported(db, stmnt, chunk_size=2) -> list[dict]:
+    chunks = [chunk async for chunk in export_ndjson(db, stmnt, chunk_size)]
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_export_all(db):
+    photos = await exported(db, export_rows())
+    assert [photo["id"] for photo in photos] == [1, 2, 3, 4, 5, 6]
+    assert photos[0]["author"] == "a"
+    assert photos[0]["description"] == "a 0"
+
+
+@pytest.mark.asyncio
+async def test_export_filtered(db):
+    photos = await exported(db, export_rows(id_from=2, id_to=5, author="b"))
+    assert [photo["id"] for photo in photos] == [4, 5]
+    assert await exported(db, export_rows(author="c")) == []
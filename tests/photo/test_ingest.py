@@ -0,0 +1,45 @@
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from photo.ingest import ingest_upload
+
+
+def make_upload(content: bytes, size: int | None = None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="photo.jpg", size=size)
+
+
+@pytest.mark.asyncio
+async def test_ingest_hashes_content_in_chunks():
+    content = b"x" * 1000
+    upload = await ingest_upload(make_upload(content),
+                                 max_size=2000,
+                                 chunk_size=64)
+
+    assert upload.size == 1000
+    assert upload.content_hash == hashlib.sha256(content).hexdigest()
+    assert upload.filename == "photo.jpg"
+    assert upload.file.read() == content
+
+
+@pytest.mark.asyncio
+async def test_ingest_rejects_oversized_stream():
+    with pytest.raises(HTTPException) as exc:
+        await ingest_upload(make_upload(b"x" * 1000),
+                            max_size=100,
+                            chunk_size=64)
+
+    assert exc.value.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_ingest_rejects_by_declared_size():
+    file = make_upload(b"x", size=10_000)
+
+    with pytest.raises(HTTPException) as exc:
+        await ingest_upload(file, max_size=100)
+
+    assert exc.value.status_code == 413
+    assert file.file.tell() == 0
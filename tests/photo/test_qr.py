@@ -0,0 +1,129 @@
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
+
+import photo.qr as qr
+from photo.orm import PhotoORM
+from photo.qr import QR_FOLDER, ensure_photo_qr, qr_key, render_qr_svg
+from storage.assets import register_asset
+from storage.model import StoredAsset
+from storage.orm import StorageOutboxORM, StoredAssetORM
+
+URL = "https://example.com/a.jpg"
+
+
+def test_qr_key_is_stable():
+    assert qr_key("https://example.com/a.jpg") == qr_key("https://example.com/a.jpg")
+
+
+def test_qr_key_depends_on_data_and_params():
+    key = qr_key("https://example.com/a.jpg")
+
+    assert key != qr_key("https://example.com/b.jpg")
+    assert key != qr_key("https://example.com/a.jpg", border=5)
+    assert key != qr_key("https://example.com/a.jpg", box_size=8)
+
+
+def test_render_qr_svg():
+    svg = render_qr_svg("https://example.com/a.jpg")
+
+    assert svg.startswith(b"<?xml")
+    assert b"<svg" in svg
+
+
+@pytest_asyncio.fixture
+async def photo(async_db, profile, monkeypatch):
+    """
+    Adds photo without QR code, rendering and upload of QR codes
+    are mocked.
+
+    Returns:
+        PhotoORM: photo of user `a`
+    """
+    async def upload(source, folder, public_id):
+        return StoredAsset(public_id=f"{folder}/{public_id}",
+                           url=f"/media/{folder}/{public_id}.svg")
+
+    monkeypatch.setattr(qr.process_pool, "submit",
+                        AsyncMock(return_value=b"<svg/>"))
+    monkeypatch.setattr(qr.storage, "upload", AsyncMock(side_effect=upload))
+    photo = PhotoORM(description="photo", url=URL, public_id="a.jpg",
+                     author_fk=profile.id)
+    async_db.add(photo)
+    await async_db.commit()
+    return photo
+
+
+async def stored_asset(db) -> StoredAssetORM:
+    stmnt = (select(StoredAssetORM)
+             .where(StoredAssetORM.content_hash == qr_key(URL))
+             .execution_options(populate_existing=True))
+    return (await db.scalars(stmnt)).one()
+
+
+async def outbox(db) -> list[str]:
+    return (await db.scalars(select(StorageOutboxORM.public_id))).all()
+
+
+@pytest.mark.asyncio
+async def test_ensure_photo_qr_renders_once(async_db, photo):
+    await ensure_photo_qr(photo, async_db)
+
+    public_id = f"{QR_FOLDER}/{qr_key(URL)}"
+    assert photo.qrcode_public_id == public_id
+    qr.process_pool.submit.assert_awaited_once()
+    qr.storage.upload.assert_awaited_once()
+    assert (await stored_asset(async_db)).ref_count == 1
+
+    # photo with QR code is returned as is
+    await ensure_photo_qr(photo, async_db)
+    qr.storage.upload.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ensure_photo_qr_reuses_stored_qr(async_db, photo):
+    stored = StoredAsset(public_id="qrcode/stored", url="/media/stored.svg")
+    await register_asset(async_db, qr_key(URL), stored)
+    await async_db.commit()
+
+    await ensure_photo_qr(photo, async_db)
+
+    assert photo.qrcode_url == stored.url
+    qr.process_pool.submit.assert_not_awaited()
+    qr.storage.upload.assert_not_awaited()
+    assert (await stored_asset(async_db)).ref_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ensure_photo_qr_race_releases_reference(async_db, photo):
+    await ensure_photo_qr(photo, async_db)
+    winner = photo.qrcode_url
+    # the other request loaded photo before QR code was set
+    set_committed_value(photo, "qrcode_url", None)
+
+    await ensure_photo_qr(photo, async_db)
+
+    assert photo.qrcode_url == winner
+    assert (await stored_asset(async_db)).ref_count == 1
+    assert await outbox(async_db) == []
+    qr.storage.upload.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ensure_photo_qr_race_both_uploaded(async_db, photo,
+                                                 monkeypatch):
+    await ensure_photo_qr(photo, async_db)
+    winner = photo.qrcode_url
+    # the other request did not find stored QR code and uploaded it again
+    set_committed_value(photo, "qrcode_url", None)
+    monkeypatch.setattr(qr, "find_asset", AsyncMock(return_value=None))
+
+    await ensure_photo_qr(photo, async_db)
+
+    assert photo.qrcode_url == winner
+    assert qr.storage.upload.await_count == 2
+    assert (await stored_asset(async_db)).ref_count == 1
+    assert await outbox(async_db) == []
@@ -0,0 +1,133 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from photo.orm import PhotoORM
+from photo.queries import (SPEC_SEPARATOR, TAG_SEPARATOR, VARIANT_SEPARATOR,
+                           VariantUrl, get_photo_response, photo_rows,
+                           split_tags, split_variants, search_hits,
+                           search_words, tagged_photo_ids)
+from tags.orm import TagORM
+
+
+def test_split_tags():
+    assert split_tags(None) == []
+    assert split_tags(f"sea{TAG_SEPARATOR}sun") == ["sea", "sun"]
+
+
+def test_tag_aggregation_by_dialect():
+    sqlite_rows = str(photo_rows().compile(dialect=sqlite.dialect()))
+    postgresql_rows = str(photo_rows().compile(dialect=postgresql.dialect()))
+    assert "group_concat(anon_1.tag, ?)" in sqlite_rows
+    assert "ORDER BY tags.id" in sqlite_rows
+    assert "ORDER BY anon_1.id)" in postgresql_rows
+
+
+def test_split_variants():
+    value = (f"width=300{SPEC_SEPARATOR}http://x/w300.png"
+             f"{VARIANT_SEPARATOR}width=640{SPEC_SEPARATOR}http://x/w640.png")
+    assert split_variants(None) == []
+    assert split_variants(value) == [VariantUrl("width=300", "http://x/w300.png"),
+                                     VariantUrl("width=640", "http://x/w640.png")]
+
+
+@pytest_asyncio.fixture
+async def tagged(async_db, profile):
+    """
+    Adds photos tagged with overlapping tags: `sea sun`, `sea`, `sun city`.
+
+    Returns:
+        dict: ids of tags by name and ids of photos in order of adding
+    """
+    tags = {name: TagORM(tag=name) for name in ("sea", "sun", "city")}
+    photos = [PhotoORM(description=f"photo {index}", url=f"/{index}.png",
+                       public_id=f"{index}.png", author_fk=profile.id,
+                       tags=[tags[name] for name in names.split()])
+              for index, names in enumerate(("sea sun", "sea", "sun city"))]
+    async_db.add_all(photos)
+    await async_db.commit()
+    return {"tags": {name: tag.id for name, tag in tags.items()},
+            "photos": [photo.id for photo in photos]}
+
+
+@pytest.mark.asyncio
+async def test_tagged_photo_ids(async_db, tagged):
+    tags, photos = tagged["tags"], tagged["photos"]
+
+    async def matched(names, match_all):
+        stmnt = tagged_photo_ids([tags[name] for name in names], match_all)
+        return set((await async_db.scalars(stmnt)).all())
+
+    assert await matched(["sea", "sun"], match_all=True) == {photos[0]}
+    assert await matched(["sea", "sun"], match_all=False) == set(photos)
+    assert await matched(["sun", "city"], match_all=True) == {photos[2]}
+    assert await matched(["city"], match_all=False) == {photos[2]}
+
+
+@pytest.mark.asyncio
+async def test_search_by_unknown_tag(async_client, tagged):
+    photos = tagged["photos"]
+
+    response = await async_client.get("/photos/search/tags",
+                                      params={"tags": ["sea", "moon"]})
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = await async_client.get("/photos/search/tags",
+                                      params={"tags": ["sea", "moon"],
+                                              "match": "any"})
+    assert [photo["id"] for photo in response.json()] == [photos[1], photos[0]]
+
+
+@pytest.mark.asyncio
+async def test_photos_by_tag_pages_by_cursor(async_client, tagged):
+    photos = tagged["photos"]
+    params = {"limit": 1}
+    pages = []
+    while True:
+        response = await async_client.get("/photos/tag/sun", params=params)
+        assert response.status_code == 200
+        pages.append([photo["id"] for photo in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    assert pages == [[photos[2]], [photos[0]]]
+
+    response = await async_client.get("/photos/tag/moon")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_tag_list_in_order_of_tag_ids(async_db, profile, tagged):
+    tags = (await async_db.scalars(
+        select(TagORM).where(TagORM.tag.in_(["sea", "sun", "city"]))
+    )).all()
+    by_name = {tag.tag: tag for tag in tags}
+    photo = PhotoORM(description="photo", url="/x.png", public_id="x.png",
+                     author_fk=profile.id,
+                     tags=[by_name[name] for name in ("city", "sea", "sun")])
+    async_db.add(photo)
+    await async_db.commit()
+
+    response = await get_photo_response(async_db, photo.id)
+    assert response.tags == sorted(by_name, key=lambda name: by_name[name].id)
+    assert response.tags == ["sea", "sun", "city"]
+
+
+def test_search_words():
+    assert search_words('"sunset" OR -sea*') == ["sunset", "OR", "sea"]
+
+
+def test_search_hits_by_dialect():
+    assert "photos_fts MATCH" in str(search_hits("sqlite", ["sea"]).compile(dialect=sqlite.dialect()))
+    assert "@@ plainto_tsquery" in str(search_hits("postgresql", ["sea"]).compile(dialect=postgresql.dialect()))
+
+
+def test_photo_rows_of_fields():
+    sparse = str(photo_rows(("id", "description")).compile(dialect=sqlite.dialect()))
+    assert "JOIN" not in sparse
+    assert "group_concat" not in sparse
+    assert "users.username" in str(photo_rows(("author",)).compile(dialect=sqlite.dialect()))
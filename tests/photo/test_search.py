@@ -0,0 +1,79 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from photo.orm import PhotoORM
+from photo.queries import search_hits
+
+
+@pytest_asyncio.fixture
+async def photos(async_db, profile):
+    """
+    Adds photos with descriptions, indexed by FTS5 triggers.
+
+    Returns:
+        list[PhotoORM]: photos in order of adding
+    """
+    photos = [PhotoORM(description=description, url=f"/{index}.png",
+                       public_id=f"{index}.png", author_fk=profile.id)
+              for index, description in enumerate((
+                  "sea at sunset seen from the old lighthouse on the hill",
+                  "sea sea sea",
+                  "city at night",
+                  "calm sea"
+              ))]
+    async_db.add_all(photos)
+    await async_db.commit()
+    return photos
+
+
+async def ranked(db, *words: str) -> list[int]:
+    hits = search_hits("sqlite", words).subquery()
+    rows = await db.execute(select(hits.c.photo_id)
+                            .order_by(hits.c.score, hits.c.photo_id.desc()))
+    return list(rows.scalars())
+
+
+@pytest.mark.asyncio
+async def test_fulltext_index_follows_photos(async_db, photos):
+    sunset, sea, city, calm = (photo.id for photo in photos)
+    assert set(await ranked(async_db, "sea")) == {sunset, sea, calm}
+    assert await ranked(async_db, "night") == [city]
+
+    photos[2].description = "sea port at night"
+    await async_db.commit()
+    assert await ranked(async_db, "night") == [city]
+    assert city in await ranked(async_db, "sea")
+    assert await ranked(async_db, "city") == []
+
+    await async_db.delete(photos[1])
+    await async_db.commit()
+    assert sea not in await ranked(async_db, "sea")
+
+
+@pytest.mark.asyncio
+async def test_fulltext_ranks_by_bm25(async_db, photos):
+    sunset, sea, city, calm = (photo.id for photo in photos)
+    # more occurrences in shorter description rank first
+    assert await ranked(async_db, "sea") == [sea, calm, sunset]
+    # all words must match
+    assert await ranked(async_db, "sea", "sunset") == [sunset]
+
+
+@pytest.mark.asyncio
+async def test_search_pages_by_cursor(async_client, async_db, photos):
+    params = {"q": "sea", "limit": 1}
+    found = []
+    while True:
+        response = await async_client.get("/photos/search", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 1
+        found.extend(photo["id"] for photo in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    assert found == await ranked(async_db, "sea")
+    assert len(found) == 3
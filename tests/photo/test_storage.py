@@ -0,0 +1,115 @@
+import io
+from datetime import timedelta
+
+import pytest
+
+from storage.imaging import resize_to_width
+from storage.outbox import retry_delay
+import storage.service as service
+from storage.service import LocalStorage
+
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    """
+    Creates local storage backend in temporary directory.
+
+    Returns:
+        LocalStorage: storage backend for tests
+    """
+    return LocalStorage(root=tmp_path, base_url="/media/")
+
+
+@pytest.mark.asyncio
+async def test_local_upload_bytes(local_storage, tmp_path):
+    stored = await local_storage.upload(PNG_HEADER, folder="photos")
+
+    assert stored.public_id.startswith("photos/")
+    assert stored.public_id.endswith(".png")
+    assert stored.url == f"/media/{stored.public_id}"
+    assert (tmp_path / stored.public_id).read_bytes() == PNG_HEADER
+
+
+@pytest.mark.asyncio
+async def test_local_upload_file_object(local_storage, tmp_path):
+    stored = await local_storage.upload(io.BytesIO(PNG_HEADER),
+                                        public_id="qr.png")
+
+    assert stored.public_id == "qr.png"
+    assert (tmp_path / "qr.png").read_bytes() == PNG_HEADER
+
+
+@pytest.mark.asyncio
+async def test_local_reupload_from_url(local_storage):
+    original = await local_storage.upload(PNG_HEADER)
+    copy = await local_storage.upload(original.url, folder="copies")
+
+    assert copy.public_id != original.public_id
+    assert copy.public_id.startswith("copies/")
+
+
+@pytest.mark.asyncio
+async def test_local_delete(local_storage, tmp_path):
+    stored = await local_storage.upload(PNG_HEADER)
+    await local_storage.delete(stored.public_id)
+    await local_storage.delete(stored.public_id)
+
+    assert not (tmp_path / stored.public_id).exists()
+
+
+@pytest.mark.asyncio
+async def test_local_rejects_path_outside_root(local_storage):
+    with pytest.raises(ValueError):
+        await local_storage.upload(PNG_HEADER, public_id="../escape.png")
+
+
+def test_local_url_for_transformations(local_storage):
+    url = local_storage.url_for("photos/a.png", width=300, crop="fill")
+
+    assert url == "/media/photos/a.png?crop=fill&width=300"
+
+
+@pytest.mark.asyncio
+async def test_local_delete_many(local_storage, tmp_path):
+    first = await local_storage.upload(PNG_HEADER, public_id="a")
+    second = await local_storage.upload(PNG_HEADER, public_id="b")
+
+    await local_storage.delete_many([first.public_id, second.public_id, "c.png"])
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_outbox_retry_delay_backs_off_up_to_maximum():
+    assert retry_delay(1, base=2, maximum=60) == timedelta(seconds=2)
+    assert retry_delay(3, base=2, maximum=60) == timedelta(seconds=8)
+    assert retry_delay(10, base=2, maximum=60) == timedelta(seconds=60)
+
+
+@pytest.mark.asyncio
+async def test_local_derive_without_resize_keeps_transformations(local_storage):
+    url = await local_storage.derive("photos/a.png", width=300, crop="fill")
+
+    assert url == "/media/photos/a.png?crop=fill&width=300"
+
+
+@pytest.mark.asyncio
+async def test_local_derive_without_imaging_skips_width(local_storage,
+                                                        monkeypatch):
+    monkeypatch.setattr(service, "imaging_available", lambda: False)
+
+    assert await local_storage.derive("photos/a.png", width=300) is None
+
+
+def test_resize_to_width():
+    image_module = pytest.importorskip("PIL.Image")
+    original = io.BytesIO()
+    image_module.new("RGB", (800, 400)).save(original, format="PNG")
+
+    resized = resize_to_width(original.getvalue(), 200)
+
+    assert image_module.open(io.BytesIO(resized)).size == (200, 100)
+    assert resize_to_width(original.getvalue(), 1000) is None
+    assert resize_to_width(b"<svg></svg>", 200) is None
@@ -0,0 +1,155 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from comment.orm import CommentORM
+from photo.orm import (PhotoORM,
+                       TrendingCommentORM,
+                       TrendingScoreORM,
+                       TrendingStateORM)
+from photo.trending import ViewCounter, decay_weight, refresh_trending
+from settings import settings
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def db(async_db, profile):
+    """
+    Seeds async session with two photos.
+
+    Returns:
+        AsyncSession: session for tests
+    """
+    async_db.add_all(PhotoORM(id=photo_id, description="photo",
+                              url=f"/{photo_id}.png",
+                              public_id=f"{photo_id}.png",
+                              author_fk=profile.id)
+                     for photo_id in (1, 2))
+    await async_db.commit()
+    return async_db
+
+
+async def scores(db) -> dict[int, float]:
+    rows = await db.execute(select(TrendingScoreORM.photo_fk,
+                                   TrendingScoreORM.score)
+                            .execution_options(populate_existing=True))
+    return dict(rows.all())
+
+
+def test_decay_weight():
+    half_life = settings.trending_half_life
+    assert decay_weight(EPOCH, EPOCH) == 1
+    assert decay_weight(EPOCH + timedelta(seconds=half_life), EPOCH) == 2
+    # naive datetimes are UTC
+    assert decay_weight(EPOCH.replace(tzinfo=None), EPOCH) == 1
+
+
+def test_view_counter():
+    counter = ViewCounter()
+    counter.record(1)
+    counter.record(1)
+    counter.record(2)
+
+    views = counter.drain()
+    assert views == Counter({1: 2, 2: 1})
+    assert counter.drain() == Counter()
+
+    counter.record(2)
+    counter.restore(views)
+    assert counter.drain() == Counter({1: 2, 2: 2})
+
+
+@pytest.mark.asyncio
+async def test_refresh_trending(db):
+    assert await refresh_trending(db, now=EPOCH) == 0
+    db.add_all(CommentORM(text="comment", author_fk=1, photo_fk=1,
+                          created_at=EPOCH) for _ in range(2))
+    await db.commit()
+
+    assert await refresh_trending(db, Counter({2: 1, 3: 5}), now=EPOCH) == 2
+    assert await scores(db) == {1: 2 * settings.trending_comment_weight,
+                                2: settings.trending_view_weight}
+    state = await db.get(TrendingStateORM, 1, populate_existing=True)
+    assert state.version == 1
+
+    # comments are added once
+    assert await refresh_trending(db, now=EPOCH) == 0
+    assert await scores(db) == {1: 2 * settings.trending_comment_weight,
+                                2: settings.trending_view_weight}
+    state = await db.get(TrendingStateORM, 1, populate_existing=True)
+    assert state.version == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_trending_batches(db):
+    await refresh_trending(db, now=EPOCH)
+    db.add_all(CommentORM(text="comment", author_fk=1, photo_fk=2,
+                          created_at=EPOCH) for _ in range(3))
+    await db.commit()
+
+    assert await refresh_trending(db, now=EPOCH, batch_size=2) == 2
+    assert await refresh_trending(db, now=EPOCH, batch_size=2) == 1
+    assert await scores(db) == {2: 3 * settings.trending_comment_weight}
+
+
+@pytest.mark.asyncio
+async def test_refresh_trending_prunes_decayed(db):
+    await refresh_trending(db, Counter({1: 1}), now=EPOCH)
+    later = EPOCH + timedelta(seconds=10 * settings.trending_half_life)
+
+    await refresh_trending(db, Counter({2: 1}), now=later)
+    assert set(await scores(db)) == {2}
+    state = await db.get(TrendingStateORM, 1, populate_existing=True)
+    assert state.version == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_trending_rebases(db):
+    await refresh_trending(db, Counter({1: 1}), now=EPOCH)
+    later = EPOCH + timedelta(seconds=65 * settings.trending_half_life)
+
+    await refresh_trending(db, Counter({1: 2 ** 65, 2: 1}), now=later)
+    state = await db.get(TrendingStateORM, 1, populate_existing=True)
+    assert state.epoch.replace(tzinfo=timezone.utc) == later
+    assert await scores(db) == pytest.approx({1: 2 ** 65 + 2 ** -65, 2: 1})
+
+
+@pytest.mark.asyncio
+async def test_refresh_trending_counts_late_comments(db):
+    db.add(CommentORM(id=10, text="comment", author_fk=1, photo_fk=1,
+                      created_at=EPOCH + timedelta(seconds=10)))
+    await db.commit()
+    assert await refresh_trending(db, now=EPOCH) == 1
+
+    # comment created earlier is committed after the refresh
+    db.add(CommentORM(id=5, text="comment", author_fk=1, photo_fk=2,
+                      created_at=EPOCH))
+    await db.commit()
+    assert await refresh_trending(db, now=EPOCH) == 1
+    assert await refresh_trending(db, now=EPOCH) == 0
+    weight = settings.trending_comment_weight
+    assert await scores(db) == {
+        1: weight * decay_weight(EPOCH + timedelta(seconds=10), EPOCH),
+        2: weight
+    }
+
+    state = await db.get(TrendingStateORM, 1, populate_existing=True)
+    assert state.last_comment_id == 10
+
+
+@pytest.mark.asyncio
+async def test_refresh_trending_forgets_comments_out_of_grace(db):
+    grace = timedelta(seconds=settings.trending_comment_grace)
+    db.add_all(CommentORM(text="comment", author_fk=1, photo_fk=1,
+                          created_at=created_at)
+               for created_at in (EPOCH, EPOCH + 2 * grace))
+    await db.commit()
+    assert await refresh_trending(db, now=EPOCH) == 2
+
+    ids = await db.scalars(select(TrendingCommentORM.comment_id))
+    assert ids.all() == [2]
+    assert await refresh_trending(db, now=EPOCH) == 0
@@ -0,0 +1,135 @@
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+import photo.variants as variants
+from photo.orm import PhotoORM, PhotoVariantORM
+from photo.variants import (get_or_create_variant, normalize_spec,
+                            responsive_images)
+from settings import settings
+
+
+def test_normalize_spec_ignores_order():
+    assert (normalize_spec({"width": 300, "crop": "fill"})
+            == normalize_spec({"crop": "fill", "width": 300})
+            == "crop=fill,width=300")
+
+
+def test_normalize_spec_skips_empty_values():
+    assert normalize_spec({"width": 300, "effect": None}) == "width=300"
+
+
+def test_responsive_images(monkeypatch):
+    monkeypatch.setattr(settings, "thumbnail_width", 300)
+    monkeypatch.setattr(settings, "responsive_widths", [640, 1024])
+    variants = [PhotoVariantORM(spec="width=1024", url="/a.jpg"),
+                PhotoVariantORM(spec="width=300", url="/a_300.jpg"),
+                PhotoVariantORM(spec="width=640", url="/a.jpg"),
+                PhotoVariantORM(spec="effect=sepia", url="/a.jpg?sepia")]
+
+    thumbnail, srcset = responsive_images(variants)
+
+    assert thumbnail == "/a_300.jpg"
+    assert srcset == "/a_300.jpg 300w, /a.jpg 640w"
+
+
+def test_responsive_images_skip_narrow_original(monkeypatch):
+    monkeypatch.setattr(settings, "thumbnail_width", 300)
+    monkeypatch.setattr(settings, "responsive_widths", [640, 1024])
+    variants = [PhotoVariantORM(spec="width=300", url="/a_300.jpg"),
+                PhotoVariantORM(spec="width=640", url="/a_640.jpg"),
+                PhotoVariantORM(spec="width=1024", url="/a.jpg")]
+
+    thumbnail, srcset = responsive_images(variants, "/a.jpg")
+
+    assert thumbnail == "/a_300.jpg"
+    assert srcset == "/a_300.jpg 300w, /a_640.jpg 640w"
+    # original narrower than thumbnail is the thumbnail
+    variants = [PhotoVariantORM(spec=f"width={width}", url="/a.jpg")
+                for width in (300, 640, 1024)]
+    assert responsive_images(variants, "/a.jpg") == ("/a.jpg", None)
+
+
+def test_responsive_images_not_prepared():
+    assert responsive_images([]) == (None, None)
+
+
+@pytest_asyncio.fixture
+async def photo(async_db, profile, monkeypatch):
+    """
+    Adds photo of user `a`, storage derives variant urls from
+    transformations without uploading anything.
+
+    Returns:
+        PhotoORM: original photo
+    """
+    async def derive(public_id, **transformations):
+        return f"/{public_id}?{normalize_spec(transformations)}"
+
+    monkeypatch.setattr(variants.storage, "derive",
+                        AsyncMock(side_effect=derive))
+    monkeypatch.setattr(variants.storage, "upload", AsyncMock())
+    photo = PhotoORM(description="photo", url="/a.png", public_id="a.png",
+                     author_fk=profile.id)
+    async_db.add(photo)
+    await async_db.commit()
+    return photo
+
+
+@pytest.mark.asyncio
+async def test_variant_of_same_spec_is_shared(async_db, photo):
+    first = await get_or_create_variant(photo, {"width": 300, "crop": "fill"},
+                                        async_db)
+    await async_db.commit()
+    second = await get_or_create_variant(
+        photo, {"crop": "fill", "width": 300, "effect": None}, async_db
+    )
+    await async_db.commit()
+
+    assert second.id == first.id
+    assert first.spec == "crop=fill,width=300"
+    assert first.url == "/a.png?crop=fill,width=300"
+    variants.storage.derive.assert_awaited_once()
+    count = select(func.count(PhotoVariantORM.id))
+    assert await async_db.scalar(count) == 1
+
+    other = await get_or_create_variant(photo, {"width": 640}, async_db)
+    assert other.id != first.id
+
+
+@pytest.mark.asyncio
+async def test_variant_leaves_original_untouched(async_db, photo):
+    await get_or_create_variant(photo, {"effect": "sepia"}, async_db)
+    await async_db.commit()
+
+    original = await async_db.get(PhotoORM, photo.id, populate_existing=True)
+    assert (original.url, original.public_id) == ("/a.png", "a.png")
+    variants.storage.upload.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_transform_photo_returns_photo(async_client, photo):
+    response = await async_client.post("/photos/transform",
+                                       data={"photo_id": photo.id,
+                                             "effect": "sepia"})
+    assert response.status_code == 200
+    assert response.json()["id"] == photo.id
+    assert response.json()["url"] == "/a.png"
+
+    response = await async_client.get(f"/photos/variants/{photo.id}")
+    assert [(variant["spec"], variant["url"])
+            for variant in response.json()] == [("effect=sepia",
+                                                 "/a.png?effect=sepia")]
+
+
+@pytest.mark.asyncio
+async def test_variant_not_stored_when_storage_can_not_derive(async_db,
+                                                              photo):
+    variants.storage.derive.side_effect = None
+    variants.storage.derive.return_value = None
+
+    assert await get_or_create_variant(photo, {"width": 300}, async_db) is None
+    count = await async_db.scalar(select(func.count(PhotoVariantORM.id)))
+    assert count == 0
@@ -0,0 +1,116 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import select
+
+import storage.outbox as outbox
+from settings import settings
+from storage.orm import StorageOutboxORM, StoredAssetORM
+from storage.outbox import OutboxWorker, drain_outbox, enqueue_deletions
+
+PAST = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def backend(error: Exception | None = None) -> Mock:
+    return Mock(delete_many=AsyncMock(side_effect=error))
+
+
+async def pending(db) -> list[StorageOutboxORM]:
+    stmnt = (select(StorageOutboxORM).order_by(StorageOutboxORM.id)
+             .execution_options(populate_existing=True))
+    return (await db.scalars(stmnt)).all()
+
+
+async def schedule(db, *public_ids: str) -> None:
+    enqueue_deletions(db, public_ids)
+    await db.flush()
+    for record in await pending(db):
+        record.next_attempt_at = PAST
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_drain_deletes_batch_at_once(async_db):
+    await schedule(async_db, "a.png", "b.png", "c.png")
+    storage = backend()
+
+    assert await drain_outbox(async_db, storage, batch_size=2) == 2
+    storage.delete_many.assert_awaited_once_with(["a.png", "b.png"])
+    assert [record.public_id for record in await pending(async_db)] == ["c.png"]
+
+    assert await drain_outbox(async_db, storage, batch_size=2) == 1
+    assert await pending(async_db) == []
+    assert await drain_outbox(async_db, storage) == 0
+    assert storage.delete_many.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_drain_keeps_assets_in_use(async_db):
+    await schedule(async_db, "a.png", "b.png")
+    async_db.add(StoredAssetORM(content_hash="hash-b", public_id="b.png",
+                                url="/b.png", ref_count=1))
+    await async_db.commit()
+    storage = backend()
+
+    assert await drain_outbox(async_db, storage) == 2
+    storage.delete_many.assert_awaited_once_with(["a.png"])
+    assert await pending(async_db) == []
+
+
+@pytest.mark.asyncio
+async def test_drain_reschedules_failed_batch(async_db):
+    await schedule(async_db, "a.png", "b.png")
+    started = datetime.now(timezone.utc)
+
+    assert await drain_outbox(async_db, backend(RuntimeError("down"))) == 2
+    records = await pending(async_db)
+    assert len(records) == 2
+    for record in records:
+        assert record.attempts == 1
+        assert record.last_error == "down"
+        delay = (record.next_attempt_at.replace(tzinfo=timezone.utc)
+                 - started)
+        assert (timedelta(seconds=settings.outbox_retry_base) <= delay
+                < timedelta(seconds=settings.outbox_retry_base + 5))
+    # not due before backoff passes
+    storage = backend()
+    assert await drain_outbox(async_db, storage) == 0
+    storage.delete_many.assert_not_awaited()
+
+
+def test_retry_delay():
+    assert outbox.retry_delay(1, base=2, maximum=10) == timedelta(seconds=2)
+    assert outbox.retry_delay(3, base=2, maximum=10) == timedelta(seconds=8)
+    assert outbox.retry_delay(10, base=2, maximum=10) == timedelta(seconds=10)
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_full_batches_back_to_back(monkeypatch):
+    processed = [2, 2, 1]
+    drained = asyncio.Event()
+
+    async def drain(db, batch_size):
+        if not processed:
+            drained.set()
+            return 0
+        return processed.pop(0)
+
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    monkeypatch.setattr(outbox, "drain_outbox", AsyncMock(side_effect=drain))
+    monkeypatch.setattr(outbox.sessionmanager, "session", session)
+    worker = OutboxWorker(poll_interval=60, batch_size=2)
+    worker.start()
+    try:
+        # the third batch is not full, the worker waits to be woken up
+        await asyncio.sleep(0.05)
+        assert outbox.drain_outbox.await_count == 3
+        worker.wake_up()
+        await asyncio.wait_for(drained.wait(), timeout=1)
+    finally:
+        await worker.stop()
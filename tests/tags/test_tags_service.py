@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import func, select
+
+from tags.orm import TagORM
+from tags.service import resolve_tags
+
+
+@pytest.mark.asyncio
+async def test_resolve_tags(async_db):
+    async_db.add_all([TagORM(tag="sea"), TagORM(tag="sun")])
+    await async_db.commit()
+
+    names = ["sun", "city", "sea", "city", "night", "sun"]
+    tags_map = await resolve_tags(names, async_db)
+    await async_db.commit()
+
+    assert set(tags_map) == set(names)
+    assert all(tags_map[name].tag == name for name in names)
+    rows = await async_db.execute(select(TagORM.tag, func.count())
+                                  .group_by(TagORM.tag))
+    assert dict(rows.all()) == {name: 1 for name in names}
+    stored = await async_db.execute(select(TagORM.tag, TagORM.id))
+    assert dict(stored.all()) == {name: tag.id
+                                  for name, tag in tags_map.items()}
+
+    # resolved again, nothing is added
+    assert await resolve_tags(["city", "sea"], async_db) == {
+        "city": tags_map["city"], "sea": tags_map["sea"]
+    }
+    assert await async_db.scalar(select(func.count(TagORM.id))) == 4
+    assert await resolve_tags([], async_db) == {}
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from utils.etag import etag_matches, make_etag, not_modified
+
+
+def request(response_type="api", **headers):
+    return SimpleNamespace(state=SimpleNamespace(response_type=response_type),
+                           headers=headers)
+
+
+def test_make_etag():
+    etag = make_etag(request(), "photos", 1, 10)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(request(), "photos", 1, 10)
+    assert etag != make_etag(request(), "photos", 2, 10)
+
+
+def test_html_etag_depends_on_user():
+    alice = make_etag(request("html", authorization="bearer a"), "photos", 1)
+    bob = make_etag(request("html", authorization="bearer b"), "photos", 1)
+    assert alice != bob
+    assert alice != make_etag(request(), "photos", 1)
+
+
+def test_etag_matches():
+    assert not etag_matches(None, '"a"')
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('"b", W/"a"', '"a"')
+    assert etag_matches('*', '"a"')
+    assert not etag_matches('"b"', '"a"')
+
+
+def test_not_modified():
+    assert not_modified(request(**{"if-none-match": '"b"'}), '"a"') is None
+    response = not_modified(request(**{"if-none-match": '"a"'}), '"a"')
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"a"'
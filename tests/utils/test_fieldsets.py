@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel, computed_field
+
+from utils.fieldsets import fieldset, sparse_payload
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    size: int
+
+    @computed_field
+    @property
+    def label(self) -> str:
+        return f"{self.name} {self.size}"
+
+
+def request(response_type="api"):
+    return SimpleNamespace(state=SimpleNamespace(response_type=response_type))
+
+
+@pytest.mark.asyncio
+async def test_fieldset():
+    item_fields = fieldset(Item)
+    assert await item_fields(request(), None) is None
+    assert await item_fields(request(), "label, id") == ("id", "label")
+    # html is rendered from full responses
+    assert await item_fields(request("html"), "id") is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_fieldset():
+    item_fields = fieldset(Item)
+    for fields in ("id,color", ",", ""):
+        with pytest.raises(HTTPException) as error:
+            await item_fields(request(), fields)
+        assert error.value.status_code == 400
+
+
+def test_sparse_payload():
+    payload = b'{"id":1,"name":"a","size":2}'
+    assert sparse_payload(payload, None) == payload
+    assert sparse_payload(payload, ("id", "size")) == b'{"id":1,"size":2}'
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import column, select
+
+from utils.pagination import (NEXT_CURSOR_HEADER,
+                              chronological_page,
+                              decode_cursor,
+                              encode_cursor,
+                              ranked_page,
+                              split_page)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(id=42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "id") == {"id": 42}
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", encode_cursor(pk=1), "W10"])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "id")
+
+    assert error.value.status_code == 400
+
+
+def test_split_page_sets_next_cursor():
+    response = Response()
+
+    page = split_page([5, 4, 3], 2, response, key=lambda row: row)
+
+    assert page == [5, 4]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == {"id": 4}
+
+
+def test_split_last_page():
+    response = Response()
+
+    assert split_page([2, 1], 2, response, key=lambda row: row) == [2, 1]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_split_page_with_ranked_cursor():
+    response = Response()
+    split_page([(0.5, 3), (0.7, 2)], 1, response,
+               key=lambda row: {"score": row[0], "id": row[1]})
+
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    assert decode_cursor(cursor, "score", "id") == {"score": 0.5, "id": 3}
+
+
+def test_ranked_page_invalid_cursor():
+    with pytest.raises(HTTPException):
+        ranked_page(select(column("id")), column("score"), column("id"), 10,
+                    encode_cursor(score="high", id=1))
+
+
+def test_chronological_page_invalid_cursor():
+    with pytest.raises(HTTPException):
+        chronological_page(select(column("id")), column("created_at"),
+                           column("id"), 10,
+                           cursor=encode_cursor(created_at="yesterday", id=1))
@@ -0,0 +1,58 @@
+import json
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, TypeAdapter
+
+from settings import settings
+from utils.responses import FastJSONResponse, dumped_response
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+class SecretItem(Item):
+    secret: str
+
+
+def test_fast_json_response():
+    assert FastJSONResponse({"a": [1, None]}).body == b'{"a":[1,null]}'
+    assert FastJSONResponse([]).body == b'[]'
+
+
+def test_fast_json_response_matches_json_response():
+    content = {"name": "фото", "score": 1.5, "tags": ["a", "b"], "none": None}
+    assert (json.loads(FastJSONResponse(content).body)
+            == json.loads(json.dumps(content)))
+
+
+def test_response_model_is_rendered_by_fast_json_response():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/items", response_model=list[Item])
+    async def items():
+        return [SecretItem(id=1, name="a", secret="s")]
+
+    @app.get("/moment")
+    async def moment():
+        return {"at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+
+    client = TestClient(app)
+    assert client.get("/items").json() == [{"id": 1, "name": "a"}]
+    assert client.get("/moment").json() == {"at": "2024-01-01T00:00:00+00:00"}
+
+
+def test_dumped_response(monkeypatch):
+    items = [SecretItem(id=1, name="a", secret="s")]
+    headers = Response(headers={"ETag": '"1"'})
+
+    response = dumped_response(items, TypeAdapter(list[Item]), headers)
+    assert response.body == b'[{"id":1,"name":"a"}]'
+    assert response.headers["ETag"] == '"1"'
+    assert response.media_type == "application/json"
+
+    monkeypatch.setattr(settings, "dump_list_responses", False)
+    assert dumped_response(items, TypeAdapter(list[Item]), headers) is items
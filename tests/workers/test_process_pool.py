@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from workers.process_pool import (PoolSaturatedError,
+                                  ProcessPoolService,
+                                  percentile)
+
+
+@pytest.fixture
+def pool():
+    """
+    Creates process pool service with single worker.
+
+    Yields:
+        ProcessPoolService: pool that is shut down after test
+    """
+    service = ProcessPoolService(max_workers=1, max_queue=1, timeout=30)
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_result(pool):
+    assert await pool.submit(pow, 2, 10) == 1024
+
+    metrics = pool.metrics()
+    assert metrics.submitted == 1
+    assert metrics.completed == 1
+    assert metrics.in_flight == 0
+    assert metrics.latency_p99_ms > 0
+
+
+@pytest.mark.asyncio
+async def test_submit_reports_failures(pool):
+    with pytest.raises(ZeroDivisionError):
+        await pool.submit(divmod, 1, 0)
+
+    assert pool.metrics().failed == 1
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_when_queue_is_full(pool):
+    pool._in_flight = pool.max_workers + pool.max_queue
+
+    with pytest.raises(PoolSaturatedError):
+        await pool.submit(pow, 2, 2)
+
+    assert pool.metrics().rejected == 1
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.5) == 51.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.99) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_timed_out_job_holds_its_slot(pool):
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.submit(time.sleep, 2, timeout=0.1)
+
+    metrics = pool.metrics()
+    assert metrics.timeouts == 1
+    # worker is still running the job
+    assert metrics.in_flight == 1
+
+    for _ in range(100):
+        if pool.metrics().in_flight == 0:
+            break
+        await asyncio.sleep(0.1)
+    assert pool.metrics().in_flight == 0